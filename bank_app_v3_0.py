@@ -1,10 +1,41 @@
 from abc import ABC, abstractmethod
+from array import array
+from collections.abc import MutableMapping
+from contextlib import contextmanager
 from decimal import Decimal, InvalidOperation
-from datetime import datetime, timezone, date
+from datetime import datetime, timezone, date, timedelta
+from functools import wraps
+from itertools import accumulate
+import bisect
+import gc
 import os
 import re
 import json
+import mmap
 import shutil
+import sqlite3
+import struct
+import sys
+import tempfile
+import threading
+import time
+import zlib
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem trava entre processos, só entre threads
+    fcntl = None
+
+# codecs JSON compilados (opcionais): ver `Codec`
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
 
 
 # ========= Reuso do v2_2 =========
@@ -20,6 +51,37 @@ def tem_duas_casas(valor):
     return -valor.as_tuple().exponent <= 2
 
 
+def para_centavos(valor):
+    """Decimal com até duas casas → centavos inteiros (conversão exata)."""
+    return int(valor.scaleb(2))
+
+
+def de_centavos(centavos):
+    """Centavos inteiros → Decimal com duas casas, para exibir e persistir."""
+    return Decimal(centavos).scaleb(-2)
+
+
+def centavos_de_texto(texto):
+    """Valor persistido ("12.50") → centavos, sem passar por Decimal.
+    Outros formatos (dados antigos como "-1.5") caem na conversão exata."""
+    inteiro, ponto, fracao = texto.partition(".")
+    if (
+        ponto
+        and len(fracao) == 2
+        and fracao.isdigit()
+        and inteiro.lstrip("-").isdigit()
+    ):
+        return int(inteiro + fracao)
+    return para_centavos(Decimal(texto))
+
+
+def texto_de_centavos(centavos):
+    """Centavos → texto igual a `str(de_centavos(centavos))`, sem Decimal."""
+    sinal = "-" if centavos < 0 else ""
+    reais, resto = divmod(abs(centavos), 100)
+    return f"{sinal}{reais}.{resto:02d}"
+
+
 def limpar_cpf(cpf_raw):
     """
     Remove caracteres não numéricos do CPF.
@@ -50,6 +112,20 @@ def formatar_cpf(cpf):
     return f"{cpf[:3]}.{cpf[3:6]}.{cpf[6:9]}-{cpf[9:]}"
 
 
+def validar_cpf(cpf_digitado):
+    """
+    Versão não interativa de `checar_limpar_cpf`.
+    Retorna o CPF limpo (11 dígitos) ou None se for inválido.
+    """
+    cpf = limpar_cpf((cpf_digitado or "").strip())
+    if cpf.isdigit() and len(cpf) == 11:
+        return cpf
+    return None
+
+
+MSG_CPF_INVALIDO = "❌ CPF inválido! Deve conter exatamente 11 dígitos numéricos."
+
+
 def checar_limpar_cpf(cpf_digitado):
     """
     Valida e limpa o CPF informado.
@@ -60,114 +136,2678 @@ def checar_limpar_cpf(cpf_digitado):
     while True:
         if not cpf_digitado:
             cpf_digitado = input("Informe o CPF (somente números): ")
-        cpf_raw = cpf_digitado.strip()
-        cpf = limpar_cpf(cpf_raw)
+        cpf = validar_cpf(cpf_digitado)
 
-        if cpf.isdigit() and len(cpf) == 11:
+        if cpf:
             return cpf  # ✅ válido
 
-        print("❌ CPF inválido! Deve conter exatamente 11 dígitos numéricos.")
+        print(MSG_CPF_INVALIDO)
         cpf_digitado = None
 
 
+def sincronizado(metodo):
+    """Executa o método segurando o lock (`self._lock`) do próprio objeto."""
+
+    @wraps(metodo)
+    def envolvido(self, *args, **kwargs):
+        with self._lock:
+            return metodo(self, *args, **kwargs)
+
+    return envolvido
+
+
+def cronometrado(metodo):
+    """Registra a duração de cada chamada em `banco_persistencia_segundos`
+    (rótulo `chamada`), só com as métricas ligadas."""
+
+    @wraps(metodo)
+    def envolvido(*args, **kwargs):
+        metricas = ConfigBanco.metricas()
+        if not metricas.ativa:
+            return metodo(*args, **kwargs)
+        inicio = time.perf_counter()
+        try:
+            return metodo(*args, **kwargs)
+        finally:
+            metricas.observar(
+                "banco_persistencia_segundos",
+                time.perf_counter() - inicio,
+                chamada=metodo.__name__,
+            )
+
+    return envolvido
+
+
+def decidir(politica, *args):
+    """Política de uma oferta: bool fixo ou função que decide (ex.: a CLI)."""
+    return politica(*args) if callable(politica) else bool(politica)
+
+
+def fsync_diretorio(pasta):
+    """Torna durável a troca de nomes (os.replace) feita dentro da pasta."""
+    try:
+        fd = os.open(pasta, os.O_RDONLY)
+    except OSError:
+        return  # Windows não abre diretórios
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def gravar_json_atomico(arq, conteudo):
+    """
+    Commit por troca atômica: grava um temporário na mesma pasta, faz fsync e
+    o renomeia (os.replace) sobre `arq`. Uma queda no meio deixa o arquivo
+    anterior intacto e custa uma única escrita, sem cópia de backup.
+    Retorna o número de bytes gravados.
+    """
+    pasta = os.path.dirname(os.path.abspath(arq))
+    fd, temp = tempfile.mkstemp(
+        dir=pasta, prefix=os.path.basename(arq) + ".", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            codec = ConfigBanco.codec()
+            dados = codec.codificar(conteudo, ConfigBanco.json_compacto())
+            f.write(dados)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp cria com 0600; mantém as permissões do arquivo original
+        os.chmod(temp, os.stat(arq).st_mode if os.path.exists(arq) else 0o644)
+        os.replace(temp, arq)
+    except BaseException:
+        if os.path.exists(temp):
+            os.remove(temp)
+        raise
+    fsync_diretorio(pasta)
+    return len(dados)
+
+
 # ========= Melhoria do v2_2 =========
+# Ofertas Plus: perguntas feitas só pela CLI. O motor recebe a resposta como
+# política (`aceitar_saque_plus` / `aceitar_transacao_plus` em `Conta.operar`).
 def ofertar_saque_plus(conta, valor):
     limpar_tela()
     while True:
         print("\n=== Saque Plus ===")
         print(
-            f"Deseja sacar além do limite diário por {formatar_brl(ConfigBanco.valor_sacar_plus())}?"
+            f"Deseja sacar além do limite diário por {formatar_brl(conta._politica.valor_sacar_plus)}?"
         )
         opcao = input("[s] Sim | [n] Não: ").lower()
 
-        match opcao:
-            case "s":
-                saque_plus = SaquePlus(valor)
-                # return conta.registrar_transacao(saque_plus)
-                return saque_plus.executar(conta)
-            case "n":
-                limpar_tela()
-                return False, "❌ Operação cancelada pelo usuário."
-            case _:
-                print("Opção inválida, tente novamente.")
+        match opcao:
+            case "s":
+                return True
+            case "n":
+                limpar_tela()
+                return False
+            case _:
+                print("Opção inválida, tente novamente.")
+
+
+def ofertar_transacao_plus(conta):
+    limpar_tela()
+    while True:
+        print("\n=== Transação Plus ===")
+        print("Você atingiu o limite diário de operações.")
+        print(
+            f"Deseja ativar uma Transação Plus por {formatar_brl(conta._politica.valor_transacao_plus)}?"
+        )
+        opcao = input("[s] Sim | [n] Não: ").lower()
+
+        match opcao:
+            case "s":
+                return True
+            case "n":
+                return False
+            case _:
+                print("Opção inválida, tente novamente.")
+
+
+def ler_data(mensagem):
+    """Data dd/mm/aaaa digitada (vazio = sem limite) → date ou None."""
+    while True:
+        texto = input(mensagem).strip()
+        if not texto:
+            return None
+        try:
+            return datetime.strptime(texto, "%d/%m/%Y").date()
+        except ValueError:
+            print("Data inválida! Use o formato dd/mm/aaaa.")
+
+
+def ler_filtro_extrato():
+    """Período (dias inclusivos, horário local) e tipo para `exibir_extrato`."""
+    inicio = ler_data("Data inicial (dd/mm/aaaa, vazio = desde o início): ")
+    fim = ler_data("Data final (dd/mm/aaaa, vazio = até hoje): ")
+    tipo = input("Tipo (ex.: Depósito, Saque; vazio = todos): ").strip()
+    return {
+        "desde": datetime.combine(inicio, datetime.min.time()) if inicio else None,
+        "ate": (
+            datetime.combine(fim + timedelta(days=1), datetime.min.time())
+            if fim
+            else None
+        ),
+        "tipos": [tipo] if tipo else None,
+    }
+
+
+# ========= Novos v3_0 =========
+class Codec:
+    """
+    Serialização JSON dos arquivos de dados (biblioteca padrão).
+    - `codificar(obj, compacto)` → bytes UTF-8; indentado com 2 espaços, ou
+      sem espaços no modo compacto (produção e linhas do journal).
+    - `decodificar(dados)` → objeto; JSON inválido levanta ValueError.
+    As subclasses usam codecs compilados, quando instalados, e implementam
+    só `_decodificar`: a decodificação roda com o coletor de lixo pausado,
+    pois JSON não forma ciclos e os milhões de contêineres de um arquivo
+    grande disparariam varreduras completas a cada poucos milhares.
+    """
+
+    nome = "json"
+
+    def decodificar(self, dados):
+        pausar = gc.isenabled()
+        if pausar:
+            gc.disable()
+        try:
+            return self._decodificar(dados)
+        finally:
+            if pausar:
+                gc.enable()
+
+    def codificar(self, obj, compacto=False):
+        if compacto:
+            texto = json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+        else:
+            texto = json.dumps(obj, indent=2, ensure_ascii=False)
+        return texto.encode("utf-8")
+
+    def _decodificar(self, dados):
+        return json.loads(dados)
+
+
+class CodecOrjson(Codec):
+    nome = "orjson"
+
+    def codificar(self, obj, compacto=False):
+        return orjson.dumps(obj, option=0 if compacto else orjson.OPT_INDENT_2)
+
+    def _decodificar(self, dados):
+        return orjson.loads(dados)
+
+
+class CodecMsgspec(Codec):
+    nome = "msgspec"
+
+    def __init__(self):
+        self._codificador = msgspec.json.Encoder()
+        self._decodificador = msgspec.json.Decoder()
+
+    def codificar(self, obj, compacto=False):
+        dados = self._codificador.encode(obj)
+        return dados if compacto else msgspec.json.format(dados, indent=2)
+
+    def _decodificar(self, dados):
+        try:
+            return self._decodificador.decode(dados)
+        except msgspec.DecodeError as e:
+            raise ValueError(str(e)) from e
+
+
+CODECS = {
+    "orjson": CodecOrjson if orjson else None,
+    "msgspec": CodecMsgspec if msgspec else None,
+    "json": Codec,
+}
+
+
+class ConfigBanco:
+    _LIMITE_SAQUE = Decimal("500.00")
+    _VALOR_SACAR_PLUS = Decimal("0.50")
+    _VALOR_TRANSACAO_PLUS = Decimal("0.25")
+    _VALOR_IMPRIMIR_EXTRATO = Decimal("0.00")
+    _OPERACOES_DIARIAS = 10
+    _SAQUES_DIARIOS = 3
+    _AGENCIA_PADRAO = "0001"
+    # mesmos valores em centavos inteiros, usados no caminho quente
+    _LIMITE_SAQUE_CENTAVOS = para_centavos(_LIMITE_SAQUE)
+    _VALOR_SACAR_PLUS_CENTAVOS = para_centavos(_VALOR_SACAR_PLUS)
+    _VALOR_TRANSACAO_PLUS_CENTAVOS = para_centavos(_VALOR_TRANSACAO_PLUS)
+    _VALOR_IMPRIMIR_EXTRATO_CENTAVOS = para_centavos(_VALOR_IMPRIMIR_EXTRATO)
+    _ARQ_CONTAS = "contas_bancarias.json"
+    _ARQ_TRANSACOES = "transacoes_bancarias.json"
+    _ARQ_JOURNAL = "transacoes_bancarias.journal"
+    _ARQ_SQLITE = "banco.sqlite3"
+    _ARQ_TRAVA = "banco.lock"  # trava entre processos do backend JSON
+    _ARMAZENAMENTO = "json"  # "json" ou "sqlite"
+    _COMPACTAR_A_CADA = 1000  # registros no journal antes de compactar
+    _SHARDS_TRANSACOES = 1  # > 1: transações em N shards (pasta por hash do id)
+    _CODEC = "auto"  # "auto" (o mais rápido instalado), "orjson", "msgspec", "json"
+    _JSON_COMPACTO = False  # True: arquivos sem indentação (produção)
+    _FORMATO_SNAPSHOT = "json"  # "json" ou "binario" (mmap, contas sob demanda)
+    _FSYNC_EM_GRUPO = False  # threads que anexam juntas dividem um único fsync
+    _COMMIT_INTERVALO = 0.0  # segundos; > 0 liga o group commit (janela de perda)
+    _COMMIT_LOTE = 500  # contas pendentes que antecipam a gravação do grupo
+    _ARQ_POLITICAS = "politicas_banco.json"  # limites/tarifas por agência e faixa
+    _INTERVALO_POLITICAS = 1.0  # segundos entre verificações do arquivo
+    _METRICAS = False  # True: histogramas de latência/bytes (ver `Metricas`)
+
+    @classmethod
+    def limite_saque(cls):
+        return cls._LIMITE_SAQUE
+
+    @classmethod
+    def valor_sacar_plus(cls):
+        return cls._VALOR_SACAR_PLUS
+
+    @classmethod
+    def valor_transacao_plus(cls):
+        return cls._VALOR_TRANSACAO_PLUS
+
+    @classmethod
+    def limite_saque_centavos(cls):
+        return cls._LIMITE_SAQUE_CENTAVOS
+
+    @classmethod
+    def valor_sacar_plus_centavos(cls):
+        return cls._VALOR_SACAR_PLUS_CENTAVOS
+
+    @classmethod
+    def valor_transacao_plus_centavos(cls):
+        return cls._VALOR_TRANSACAO_PLUS_CENTAVOS
+
+    @classmethod
+    def valor_imprimir_extrato_centavos(cls):
+        return cls._VALOR_IMPRIMIR_EXTRATO_CENTAVOS
+
+    @classmethod
+    def operacoes_diarias(cls):
+        return cls._OPERACOES_DIARIAS
+
+    @classmethod
+    def saques_diarios(cls):
+        return cls._SAQUES_DIARIOS
+
+    @classmethod
+    def agencia_padrao(cls):
+        return cls._AGENCIA_PADRAO
+
+    @classmethod
+    def arquivo_contas(cls):
+        return cls._ARQ_CONTAS
+
+    @classmethod
+    def arquivo_transacoes(cls):
+        return cls._ARQ_TRANSACOES
+
+    @classmethod
+    def valor_imprimir_extrato(cls):
+        return cls._VALOR_IMPRIMIR_EXTRATO
+
+    @classmethod
+    def arquivo_journal(cls):
+        return cls._ARQ_JOURNAL
+
+    @classmethod
+    def compactar_a_cada(cls):
+        return cls._COMPACTAR_A_CADA
+
+    @classmethod
+    def shards_transacoes(cls):
+        return cls._SHARDS_TRANSACOES
+
+    @classmethod
+    def json_compacto(cls):
+        return cls._JSON_COMPACTO
+
+    @classmethod
+    def formato_snapshot(cls):
+        return cls._FORMATO_SNAPSHOT
+
+    @classmethod
+    def codec(cls):
+        """Codec configurado; sem ele instalado, o `json` da biblioteca padrão."""
+        escolhido = getattr(cls, "_codec", None)
+        if escolhido is None or escolhido[0] != cls._CODEC:
+            if cls._CODEC == "auto":
+                classe = next(c for c in CODECS.values() if c is not None)
+            else:
+                classe = CODECS.get(cls._CODEC) or Codec
+            escolhido = cls._codec = (cls._CODEC, classe())
+        return escolhido[1]
+
+    @classmethod
+    def fsync_em_grupo(cls):
+        return cls._FSYNC_EM_GRUPO
+
+    @classmethod
+    def commit_intervalo(cls):
+        return cls._COMMIT_INTERVALO
+
+    @classmethod
+    def commit_lote(cls):
+        return cls._COMMIT_LOTE
+
+    @classmethod
+    def arquivo_sqlite(cls):
+        return cls._ARQ_SQLITE
+
+    @classmethod
+    def arquivo_trava(cls):
+        return cls._ARQ_TRAVA
+
+    @classmethod
+    def arquivo_politicas(cls):
+        return cls._ARQ_POLITICAS
+
+    @classmethod
+    def intervalo_politicas(cls):
+        return cls._INTERVALO_POLITICAS
+
+    @classmethod
+    def politicas(cls):
+        """Motor de políticas, criado na primeira chamada."""
+        if getattr(cls, "_politicas", None) is None:
+            cls._politicas = MotorPoliticas(cls.arquivo_politicas())
+        return cls._politicas
+
+    @classmethod
+    def metricas(cls):
+        """Registro de métricas do processo, criado na primeira chamada."""
+        if getattr(cls, "_metricas", None) is None:
+            cls._metricas = Metricas(cls._METRICAS)
+        return cls._metricas
+
+    @classmethod
+    def armazenamento(cls):
+        """Backend de persistência configurado, criado na primeira chamada."""
+        if getattr(cls, "_armazenamento", None) is None:
+            if cls._ARMAZENAMENTO == "sqlite":
+                cls._armazenamento = ArmazenamentoSQLite(cls.arquivo_sqlite())
+            else:
+                cls._armazenamento = ArmazenamentoJSON(
+                    cls.arquivo_contas(),
+                    cls.arquivo_transacoes(),
+                    cls.arquivo_journal(),
+                    cls.arquivo_trava(),
+                    cls.shards_transacoes(),
+                )
+            if cls.commit_intervalo() > 0:
+                cls._armazenamento.ligar_group_commit(
+                    cls.commit_intervalo(), cls.commit_lote()
+                )
+        return cls._armazenamento
+
+
+class Histograma:
+    """Contagens por balde (limites superiores, mais o +Inf), soma e total."""
+
+    __slots__ = ("limites", "contagens", "soma", "quantidade")
+
+    def __init__(self, limites):
+        self.limites = limites
+        self.contagens = [0] * (len(limites) + 1)
+        self.soma = 0
+        self.quantidade = 0
+
+    def observar(self, valor):
+        self.contagens[bisect.bisect_left(self.limites, valor)] += 1
+        self.soma += valor
+        self.quantidade += 1
+
+    def percentil(self, p):
+        """Limite do balde que contém o percentil `p` (0-100), ou None."""
+        alvo = self.quantidade * p / 100
+        acumulado = 0
+        for limite, contagem in zip(self.limites, self.contagens):
+            acumulado += contagem
+            if acumulado >= alvo:
+                return limite
+        return None  # acima do maior limite (+Inf)
+
+
+class Metricas:
+    """
+    Métricas do processo (histogramas e contadores com rótulos), expostas
+    no formato texto do Prometheus ou em um dict JSON (menu `[m]` da CLI e
+    `GET /metricas` do servidor).
+    - `banco_transacao_segundos{transacao, resultado}`: `Conta.operar` por
+      subclasse de Transacao pedida.
+    - `banco_persistencia_segundos{chamada}`: carregar/salvar conta e
+      usuários (`@cronometrado`).
+    - `banco_io_segundos` / `banco_io_bytes{arquivo, operacao}`: cada
+      leitura ou gravação de arquivo (codificação incluída).
+    - `banco_reescritas_total{arquivo}`: arquivos regravados por inteiro;
+      `banco_copias_backup_total{arquivo}`: conversões/divisões que mantêm
+      o original como cópia.
+    Desligadas (`ConfigBanco._METRICAS = False`, padrão), cada ponto medido
+    custa só a leitura de `ativa`.
+    """
+
+    # 10 µs a 10 s (1; 2,5; 5 por década)
+    LIMITES_SEGUNDOS = tuple(
+        float(f"{m}e{e}") for e in range(-5, 2) for m in (1, 2.5, 5)
+    )[:-2]
+    LIMITES_BYTES = tuple(64 * 4**i for i in range(12))  # 64 B a 256 MB
+    AJUDA = {
+        "banco_transacao_segundos": "Latência de Conta.operar por transação.",
+        "banco_persistencia_segundos": "Duração das chamadas de persistência.",
+        "banco_io_segundos": "Duração de cada leitura/gravação de arquivo.",
+        "banco_io_bytes": "Bytes lidos/gravados por leitura/gravação de arquivo.",
+        "banco_reescritas_total": "Arquivos regravados por inteiro.",
+        "banco_copias_backup_total": "Cópias completas mantidas como backup.",
+    }
+
+    def __init__(self, ativa=False):
+        self.ativa = ativa
+        self._lock = threading.Lock()
+        self._histogramas = {}  # (nome, rótulos) → Histograma
+        self._contadores = {}  # (nome, rótulos) → int
+
+    def observar(self, nome, valor, **rotulos):
+        if not self.ativa:
+            return
+        chave = nome, tuple(rotulos.items())
+        with self._lock:
+            histograma = self._histogramas.get(chave)
+            if histograma is None:
+                limites = (
+                    self.LIMITES_BYTES
+                    if nome.endswith("_bytes")
+                    else self.LIMITES_SEGUNDOS
+                )
+                histograma = self._histogramas[chave] = Histograma(limites)
+            histograma.observar(valor)
+
+    def contar(self, nome, quantidade=1, **rotulos):
+        if not self.ativa:
+            return
+        chave = nome, tuple(rotulos.items())
+        with self._lock:
+            self._contadores[chave] = self._contadores.get(chave, 0) + quantidade
+
+    def observar_io(self, arquivo, operacao, nbytes, segundos):
+        """Uma leitura/gravação de `arquivo` (usuarios, journal, snapshot)."""
+        self.observar("banco_io_segundos", segundos, arquivo=arquivo, operacao=operacao)
+        self.observar("banco_io_bytes", nbytes, arquivo=arquivo, operacao=operacao)
+
+    def zerar(self):
+        with self._lock:
+            self._histogramas.clear()
+            self._contadores.clear()
+
+    def instantaneo(self):
+        """Cópia das métricas em um dict serializável em JSON."""
+        with self._lock:
+            histogramas = [
+                {
+                    "nome": nome,
+                    "rotulos": dict(rotulos),
+                    "quantidade": h.quantidade,
+                    "soma": h.soma,
+                    "p50": h.percentil(50),
+                    "p99": h.percentil(99),
+                    "baldes": dict(
+                        zip([*map(str, h.limites), "+Inf"], h.contagens)
+                    ),
+                }
+                for (nome, rotulos), h in sorted(self._histogramas.items())
+            ]
+            contadores = [
+                {"nome": nome, "rotulos": dict(rotulos), "valor": valor}
+                for (nome, rotulos), valor in sorted(self._contadores.items())
+            ]
+        return {
+            "ativa": self.ativa,
+            "histogramas": histogramas,
+            "contadores": contadores,
+        }
+
+    @staticmethod
+    def _rotulos(rotulos, **extra):
+        pares = [*rotulos, *extra.items()]
+        if not pares:
+            return ""
+        # aspas, barras e quebras de linha escapadas como em uma string JSON
+        texto = ",".join(
+            f"{nome}={json.dumps(str(valor), ensure_ascii=False)}"
+            for nome, valor in pares
+        )
+        return "{" + texto + "}"
+
+    def prometheus(self):
+        """Métricas no formato de exposição em texto do Prometheus."""
+        linhas = []
+        descritas = set()
+
+        def cabecalho(nome, tipo):
+            if nome not in descritas:
+                descritas.add(nome)
+                linhas.append(f"# HELP {nome} {self.AJUDA.get(nome, nome)}")
+                linhas.append(f"# TYPE {nome} {tipo}")
+
+        with self._lock:
+            for (nome, rotulos), h in sorted(self._histogramas.items()):
+                cabecalho(nome, "histogram")
+                acumulado = 0
+                for limite, contagem in zip((*h.limites, "+Inf"), h.contagens):
+                    acumulado += contagem
+                    le = self._rotulos(rotulos, le=limite)
+                    linhas.append(f"{nome}_bucket{le} {acumulado}")
+                linhas.append(f"{nome}_sum{self._rotulos(rotulos)} {h.soma}")
+                linhas.append(f"{nome}_count{self._rotulos(rotulos)} {h.quantidade}")
+            for (nome, rotulos), valor in sorted(self._contadores.items()):
+                cabecalho(nome, "counter")
+                linhas.append(f"{nome}{self._rotulos(rotulos)} {valor}")
+        return "\n".join(linhas) + "\n"
+
+
+class Politica:
+    """
+    Limites e tarifas de uma conta, compilados uma única vez: valores em
+    Decimal (exibição) e em centavos (caminho quente), lidos como atributos
+    simples. Imutável; quando as políticas mudam, a conta recebe outro
+    objeto (`geracao` diz de qual versão do arquivo ele veio).
+    """
+
+    CAMPOS = {
+        "limite_saque": Decimal,
+        "valor_sacar_plus": Decimal,
+        "valor_transacao_plus": Decimal,
+        "valor_imprimir_extrato": Decimal,
+        "operacoes_diarias": int,
+        "saques_diarios": int,
+    }
+    __slots__ = (
+        *CAMPOS,
+        *(campo + "_centavos" for campo, tipo in CAMPOS.items() if tipo is Decimal),
+        "faixa",
+        "geracao",
+    )
+
+    def __init__(self, valores, faixa=None, geracao=0):
+        for campo, tipo in self.CAMPOS.items():
+            object.__setattr__(self, campo, valores[campo])
+            if tipo is Decimal:
+                centavos = para_centavos(valores[campo])
+                object.__setattr__(self, campo + "_centavos", centavos)
+        object.__setattr__(self, "faixa", faixa)
+        object.__setattr__(self, "geracao", geracao)
+
+    def __setattr__(self, nome, valor):
+        raise AttributeError("Politica é imutável")
+
+    def __delattr__(self, nome):
+        raise AttributeError("Politica é imutável")
+
+    def __repr__(self):
+        campos = ", ".join(f"{campo}={getattr(self, campo)}" for campo in self.CAMPOS)
+        return f"Politica({self.faixa or 'padrão'}: {campos})"
+
+
+class MotorPoliticas:
+    """
+    Políticas de limites e tarifas lidas de `politicas_banco.json`:
+        {
+          "padrao": {"limite_saque": "500.00", "operacoes_diarias": 10},
+          "agencias": {"0002": {"saques_diarios": 5}},
+          "faixas": {"premium": {"limite_saque": "2000.00",
+                                 "valor_sacar_plus": "0.00"}},
+          "contas": {"<cpf>-<agência>-<número>": "premium"}
+        }
+    Cada nível informa só o que muda: ConfigBanco < padrao < agência <
+    faixa da conta. Sem o arquivo, valem os valores de ConfigBanco.
+    Cada combinação (agência, faixa) é compilada uma vez em uma `Politica`.
+    O arquivo é verificado no máximo a cada `_INTERVALO_POLITICAS` segundos
+    (`atualizar`); se mudou, é relido e as contas pegam a política nova na
+    próxima sessão, sem reiniciar. Arquivo inválido mantém a política
+    anterior.
+    """
+
+    SECOES = ("padrao", "agencias", "faixas", "contas")
+
+    def __init__(self, arq):
+        self._arq = arq
+        self._lock = threading.Lock()
+        self._identidade = None
+        self._verificado = 0.0  # time.monotonic() da última verificação
+        # (geração, configuração, (agência, faixa) → Politica), trocado
+        # inteiro a cada releitura
+        self._estado = (0, {secao: {} for secao in self.SECOES}, {})
+        self.atualizar(forcar=True)
+
+    @classmethod
+    def _validar_nivel(cls, nome, nivel):
+        if not isinstance(nivel, dict):
+            raise ValueError(f"{nome}: esperado um objeto")
+        valores = {}
+        for campo, valor in nivel.items():
+            tipo = Politica.CAMPOS.get(campo)
+            if tipo is None:
+                raise ValueError(f"{nome}: campo desconhecido {campo!r}")
+            if tipo is Decimal:
+                try:
+                    valor = Decimal(str(valor))
+                except InvalidOperation:
+                    valor = None
+                # NaN e Infinity viram Decimal, mas não comparam nem convertem
+                if (
+                    valor is None
+                    or not valor.is_finite()
+                    or valor < 0
+                    or not tem_duas_casas(valor)
+                ):
+                    raise ValueError(f"{nome}.{campo}: valor inválido")
+            elif type(valor) is not int or valor < 0:
+                raise ValueError(f"{nome}.{campo}: inteiro não negativo esperado")
+            valores[campo] = valor
+        return valores
+
+    def _ler(self):
+        with open(self._arq, "rb") as f:
+            dados = ConfigBanco.codec().decodificar(f.read())
+        if not isinstance(dados, dict) or set(dados) - set(self.SECOES):
+            raise ValueError(f"seções válidas: {', '.join(self.SECOES)}")
+        for secao in self.SECOES:
+            if not isinstance(dados.get(secao, {}), dict):
+                raise ValueError(f"{secao}: esperado um objeto")
+        config = {
+            "padrao": self._validar_nivel("padrao", dados.get("padrao", {})),
+            "agencias": {},
+            "faixas": {},
+            "contas": dict(dados.get("contas", {})),
+        }
+        for secao in ("agencias", "faixas"):
+            for nome, nivel in dados.get(secao, {}).items():
+                config[secao][nome] = self._validar_nivel(f"{secao}.{nome}", nivel)
+        for id_conta, faixa in config["contas"].items():
+            if not isinstance(faixa, str) or faixa not in config["faixas"]:
+                raise ValueError(f"contas.{id_conta}: faixa {faixa!r} inexistente")
+        return config
+
+    def atualizar(self, forcar=False):
+        """Relê o arquivo se ele mudou desde a última leitura → geração atual."""
+        agora = time.monotonic()
+        if not forcar and agora - self._verificado < ConfigBanco.intervalo_politicas():
+            return self._estado[0]
+        with self._lock:
+            self._verificado = agora
+            geracao = self._estado[0]
+            identidade = JournalTransacoes._identidade(self._arq)
+            if identidade == self._identidade and not forcar:
+                return geracao
+            if identidade is None:
+                config = {secao: {} for secao in self.SECOES}
+            else:
+                try:
+                    config = self._ler()
+                except (OSError, ValueError) as e:
+                    # identidade não registrada: a próxima verificação relê
+                    print("❌ Erro ao carregar políticas:", e)
+                    return geracao
+            self._identidade = identidade
+            self._estado = (geracao + 1, config, {})
+            return geracao + 1
+
+    def politica(self, agencia, id_conta):
+        """Política compilada da conta (cache por agência e faixa)."""
+        geracao, config, compiladas = self._estado
+        faixa = config["contas"].get(id_conta)
+        chave = (agencia, faixa)
+        politica = compiladas.get(chave)
+        if politica is None:
+            valores = {
+                "limite_saque": ConfigBanco.limite_saque(),
+                "valor_sacar_plus": ConfigBanco.valor_sacar_plus(),
+                "valor_transacao_plus": ConfigBanco.valor_transacao_plus(),
+                "valor_imprimir_extrato": ConfigBanco.valor_imprimir_extrato(),
+                "operacoes_diarias": ConfigBanco.operacoes_diarias(),
+                "saques_diarios": ConfigBanco.saques_diarios(),
+            }
+            valores.update(config["padrao"])
+            valores.update(config["agencias"].get(agencia, {}))
+            valores.update(config["faixas"].get(faixa, {}))
+            politica = compiladas[chave] = Politica(valores, faixa, geracao)
+        return politica
+
+
+class TravaArquivo:
+    """
+    Trava consultiva entre processos (`fcntl.lockf`) sobre bytes de um arquivo:
+    cada chave (usuários, journal e compactação de cada shard, uma conta) é
+    um byte.
+    - Threads do mesmo processo que pedem a mesma chave só somam referência;
+      a exclusão entre threads continua com os `threading.Lock` de cada objeto.
+    - Sem fcntl (Windows) não faz nada.
+    """
+
+    USUARIOS = 0
+    _INICIO_CONTAS = 1 << 16  # abaixo disso: 2 chaves por shard do journal
+    _FAIXA_CONTAS = 1 << 20
+
+    def __init__(self, arq):
+        self._arq = arq
+        self._fd = None
+        self._lock = threading.Lock()
+        self._referencias = {}  # chave → threads deste processo com a trava
+
+    @staticmethod
+    def chave_journal(shard):
+        return 1 + 2 * shard
+
+    @staticmethod
+    def chave_compactacao(shard):
+        return 2 + 2 * shard
+
+    @classmethod
+    def chave_conta(cls, id_conta):
+        return cls._INICIO_CONTAS + zlib.crc32(id_conta.encode("utf-8")) % (
+            cls._FAIXA_CONTAS
+        )
+
+    @contextmanager
+    def travar(self, chave):
+        self.adquirir(chave)
+        try:
+            yield
+        finally:
+            self.liberar(chave)
+
+    def adquirir(self, chave):
+        if fcntl is None:
+            return
+        while True:
+            with self._lock:
+                if self._fd is None:
+                    self._fd = os.open(self._arq, os.O_RDWR | os.O_CREAT, 0o644)
+                if chave in self._referencias:
+                    self._referencias[chave] += 1
+                    return
+                try:
+                    fcntl.lockf(self._fd, fcntl.LOCK_EX | fcntl.LOCK_NB, 1, chave)
+                    self._referencias[chave] = 1
+                    return
+                except OSError:
+                    pass  # outro processo segura a chave
+            time.sleep(0.001)
+
+    def liberar(self, chave):
+        if fcntl is None:
+            return
+        with self._lock:
+            self._referencias[chave] -= 1
+            if not self._referencias[chave]:
+                del self._referencias[chave]
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, 1, chave)
+
+
+class SnapshotBinario:
+    """
+    Snapshot binário versionado das contas, lido via mmap: abrir custa o
+    mesmo para 1 MB ou vários GB, e cada conta é decodificada só quando
+    acessada. Layout (little-endian):
+    - cabeçalho: mágico, versão, fuso local de quem gravou, nº de contas,
+      posição do índice e da tabela de tipos;
+    - colunas do extrato de cada conta, alinhadas em 8 bytes: centavos
+      (int64), micros desde a época em UTC (int64), saldo acumulado (int64,
+      desde a v2) e código do tipo (uint8), seguidas dos agregados diários
+      (dia, tipo, quantidade, créditos, débitos; desde a v2);
+    - índice: um registro de largura fixa por conta, ordenado pelo id (busca
+      binária), com versão, saldo em centavos, último dia (ordinal), os
+      contadores e a posição das colunas e dos agregados;
+    - tabela de tipos (JSON), traduzida para os códigos do processo ao abrir.
+    Arquivos da v1 continuam legíveis; a gravação é sempre na versão atual.
+    """
+
+    MAGICO = b"DIOSNAP\0"
+    VERSAO = 2
+    TAMANHO_ID = 32
+    # mágico, versão, fuso (time.timezone), nº de contas, índice, tabela de
+    # tipos (posição, tamanho); na v1 o fuso não existia (bytes zerados)
+    _CABECALHO = struct.Struct("<8sH2xiQQQQ")
+    # id, versão, saldo, nº de movimentos, posição das colunas, último dia,
+    # transação plus, nº de operações, nº de saques
+    _REGISTRO_V1 = struct.Struct("<32sqqqqiiii")
+    # v2: + posição e quantidade dos agregados diários, antes do último dia
+    _REGISTRO = struct.Struct("<32sqqqqqqiiii")
+    # dia (ordinal local), código do tipo, quantidade, créditos, débitos
+    AGREGADO = struct.Struct("<iiiqq")
+
+    def __init__(self, arq):
+        with open(arq, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._bytes = memoryview(self._mm)
+        magico, self._versao, fuso, self._qtd, self._indice, pos_tipos, tam_tipos = (
+            self._CABECALHO.unpack_from(self._mm)
+        )
+        if magico != self.MAGICO:
+            raise ValueError(f"{arq} não é um snapshot binário")
+        if self._versao not in (1, self.VERSAO):
+            raise ValueError(
+                f"versão {self._versao} do snapshot binário não suportada"
+            )
+        self._registro = self._REGISTRO if self._versao > 1 else self._REGISTRO_V1
+        # agregados diários gravados em outro fuso não servem: são recalculados
+        self._agregados_validos = self._versao > 1 and fuso == time.timezone
+        tipos = json.loads(self._mm[pos_tipos : pos_tipos + tam_tipos])
+        traducao = bytearray(range(256))
+        for codigo, tipo in enumerate(tipos):
+            traducao[codigo] = Extrato._codigo(tipo)
+        self._traducao = bytes(traducao)
+
+    def __len__(self):
+        return self._qtd
+
+    def _chave(self, i):
+        inicio = self._indice + i * self._registro.size
+        return self._mm[inicio : inicio + self.TAMANHO_ID]
+
+    @classmethod
+    def _codificar_id(cls, id_conta):
+        chave = id_conta.encode("utf-8")
+        if len(chave) > cls.TAMANHO_ID:
+            raise ValueError(f"id de conta longo demais: {id_conta}")
+        return chave.ljust(cls.TAMANHO_ID, b"\0")
+
+    def posicao(self, id_conta):
+        """Posição da conta no índice (busca binária), ou None."""
+        chave = self._codificar_id(id_conta)
+        baixo, alto = 0, self._qtd
+        while baixo < alto:
+            meio = (baixo + alto) // 2
+            if self._chave(meio) < chave:
+                baixo = meio + 1
+            else:
+                alto = meio
+        if baixo < self._qtd and self._chave(baixo) == chave:
+            return baixo
+        return None
+
+    def ids(self):
+        for i in range(self._qtd):
+            yield self._chave(i).rstrip(b"\0").decode("utf-8")
+
+    def _colunas(self, i):
+        """
+        (campos, tipos, centavos, micros, acumulados, agregados) da conta
+        `i`, como memoryviews sobre o mmap (sem cópia). `campos` é (versão,
+        saldo, último dia, transação plus, operações, saques); acumulados e
+        agregados são None quando o arquivo não os tem (ou não servem).
+        """
+        campos = self._registro.unpack_from(
+            self._mm, self._indice + i * self._registro.size
+        )
+        movimentos, inicio = campos[3], campos[4]
+        micros = inicio + 8 * movimentos
+        if self._versao == 1:
+            acumulados = agregados = None
+            tipos = micros + 8 * movimentos
+        else:
+            acumulados = self._bytes[micros + 8 * movimentos : micros + 16 * movimentos]
+            tipos = micros + 16 * movimentos
+            agregados = None
+            if self._agregados_validos:
+                pos_agregados, qtd_agregados = campos[5], campos[6]
+                agregados = self._bytes[
+                    pos_agregados : pos_agregados + qtd_agregados * self.AGREGADO.size
+                ]
+            campos = campos[:5] + campos[7:]
+        return (
+            campos[1:3] + campos[5:],
+            self._bytes[tipos : tipos + movimentos],
+            self._bytes[inicio:micros],
+            self._bytes[micros : micros + 8 * movimentos],
+            acumulados,
+            agregados,
+        )
+
+    def colunas(self, i):
+        """
+        Colunas da conta `i` em bytes, com tipos nos códigos deste processo,
+        para copiá-las a outro snapshot sem decodificar a conta; None quando
+        faltam acumulados ou agregados (a conta precisa ser materializada).
+        """
+        campos, tipos, centavos, micros, acumulados, agregados = self._colunas(i)
+        if acumulados is None or agregados is None:
+            return None
+        agregados = [
+            (dia, self._traducao[codigo], qtd, creditos, debitos)
+            for dia, codigo, qtd, creditos, debitos in self.AGREGADO.iter_unpack(
+                agregados
+            )
+        ]
+        return (
+            campos,
+            bytes(tipos).translate(self._traducao),
+            bytes(centavos),
+            bytes(micros),
+            bytes(acumulados),
+            agregados,
+        )
+
+    def conta(self, i):
+        """Dados da conta `i` no formato do estado do journal; o extrato fica
+        mapeado sobre o arquivo."""
+        campos, tipos, centavos, micros, acumulados, agregados = self._colunas(i)
+        versao, saldo, dia, plus, operacoes, saques = campos
+        return {
+            "ultimo_dia": date.fromordinal(dia).isoformat(),
+            "saldo": texto_de_centavos(saldo),
+            "transacao_plus": plus,
+            "numero_operacoes": operacoes,
+            "numero_saques": saques,
+            "versao": versao,
+            "extrato": Extrato.mapeado(
+                tipos, centavos, micros, self._traducao, acumulados, agregados
+            ),
+        }
+
+    @classmethod
+    def gravar(cls, arq, contas):
+        """
+        Grava `contas` (id → dados, em linhas JSON ou já em colunas) em `arq`,
+        com fsync. Contas de um `EstadoBinario` que não foram materializadas
+        têm as colunas copiadas do snapshot de origem, sem decodificar.
+        """
+        with cls.escritor(arq) as escrever:
+            for id_conta in sorted(contas):
+                brutas = None
+                if isinstance(contas, EstadoBinario):
+                    brutas = contas.colunas(id_conta)
+                escrever(id_conta, contas[id_conta] if brutas is None else brutas)
+
+    @classmethod
+    @contextmanager
+    def escritor(cls, arq):
+        """
+        Grava contas uma a uma, em ordem crescente de id, com a função
+        `escrever(id, dados)` (linhas JSON, Extrato ou o retorno de
+        `colunas`); índice, cabeçalho e fsync saem ao fim do bloco. Só uma conta fica em memória por vez e o
+        índice vai para um temporário em disco quando cresce (cargas de
+        milhões de contas).
+        """
+        posicao = cls._CABECALHO.size
+        qtd = 0
+        anterior = b""
+        with open(arq, "wb") as f, tempfile.SpooledTemporaryFile(
+            max_size=1 << 23, dir=os.path.dirname(os.path.abspath(arq))
+        ) as indice:
+            f.write(bytes(cls._CABECALHO.size))
+
+            def escrever(id_conta, conta):
+                nonlocal posicao, qtd, anterior
+                chave = cls._codificar_id(id_conta)
+                if chave <= anterior:
+                    raise ValueError(f"contas fora de ordem em {id_conta}")
+                anterior = chave
+                if isinstance(conta, tuple):  # colunas copiadas de um snapshot
+                    campos, tipos, centavos, micros, acumulados, agregados = conta
+                else:
+                    extrato = conta["extrato"]
+                    if not isinstance(extrato, Extrato):
+                        extrato = Extrato.de_linhas(extrato)
+                    tipos, centavos, micros = extrato.colunas()
+                    acumulados = extrato.coluna_acumulados()
+                    agregados = extrato.agregados_diarios()
+                    campos = (
+                        conta.get("versao", 0),
+                        centavos_de_texto(conta["saldo"]),
+                        date.fromisoformat(conta["ultimo_dia"]).toordinal(),
+                        conta["transacao_plus"],
+                        conta["numero_operacoes"],
+                        conta["numero_saques"],
+                    )
+                alinhamento = -len(tipos) % 8
+                pos_agregados = (
+                    posicao + len(centavos) + len(micros) + len(acumulados)
+                    + len(tipos) + alinhamento
+                )
+                bloco = b"".join(cls.AGREGADO.pack(*agregado) for agregado in agregados)
+                versao, saldo, *contadores = campos
+                indice.write(
+                    cls._REGISTRO.pack(
+                        chave,
+                        versao,
+                        saldo,
+                        len(tipos),
+                        posicao,
+                        pos_agregados,
+                        len(agregados),
+                        *contadores,
+                    )
+                )
+                qtd += 1
+                f.write(centavos)
+                f.write(micros)
+                f.write(acumulados)
+                f.write(tipos + bytes(alinhamento))
+                f.write(bloco + bytes(-len(bloco) % 8))
+                posicao = pos_agregados + len(bloco) + (-len(bloco) % 8)
+
+            yield escrever
+
+            tabela = json.dumps(Extrato._TIPOS, ensure_ascii=False).encode("utf-8")
+            indice.seek(0)
+            shutil.copyfileobj(indice, f)
+            f.write(tabela)
+            f.seek(0)
+            f.write(
+                cls._CABECALHO.pack(
+                    cls.MAGICO,
+                    cls.VERSAO,
+                    time.timezone,
+                    qtd,
+                    posicao,
+                    posicao + qtd * cls._REGISTRO.size,
+                    len(tabela),
+                )
+            )
+            f.flush()
+            os.fsync(f.fileno())
+
+
+class EstadoBinario(MutableMapping):
+    """
+    Estado do journal sobre um `SnapshotBinario`: id → dados, como o dict
+    do snapshot JSON, mas cada conta só é decodificada no primeiro acesso.
+    As contas acessadas, criadas ou alteradas pelo journal ficam em memória.
+    """
+
+    def __init__(self, snapshot):
+        self._snapshot = snapshot
+        self._contas = {}  # materializadas ou alteradas
+        self._novas = set()  # ausentes do snapshot
+        self._removidas = set()
+
+    def _posicao(self, id_conta):
+        if id_conta in self._removidas:
+            return None
+        return self._snapshot.posicao(id_conta)
+
+    def __getitem__(self, id_conta):
+        conta = self._contas.get(id_conta)
+        if conta is None:
+            i = self._posicao(id_conta)
+            if i is None:
+                raise KeyError(id_conta)
+            conta = self._contas[id_conta] = self._snapshot.conta(i)
+        return conta
+
+    def __setitem__(self, id_conta, conta):
+        self._removidas.discard(id_conta)
+        if self._snapshot.posicao(id_conta) is None:
+            self._novas.add(id_conta)
+        self._contas[id_conta] = conta
+
+    def __delitem__(self, id_conta):
+        if id_conta not in self:
+            raise KeyError(id_conta)
+        self._contas.pop(id_conta, None)
+        self._novas.discard(id_conta)
+        if self._snapshot.posicao(id_conta) is not None:
+            self._removidas.add(id_conta)
+
+    def __contains__(self, id_conta):
+        return id_conta in self._contas or self._posicao(id_conta) is not None
+
+    def __iter__(self):
+        for id_conta in self._snapshot.ids():
+            if id_conta not in self._removidas:
+                yield id_conta
+        yield from list(self._novas)
+
+    def __len__(self):
+        return len(self._snapshot) - len(self._removidas) + len(self._novas)
+
+    def consultar(self, id_conta):
+        """Como `self[id_conta]`, mas sem guardar a conta em memória
+        (varreduras de todas as contas)."""
+        conta = self._contas.get(id_conta)
+        if conta is None:
+            i = self._posicao(id_conta)
+            if i is None:
+                raise KeyError(id_conta)
+            conta = self._snapshot.conta(i)
+        return conta
+
+    def colunas(self, id_conta):
+        """Colunas brutas de uma conta ainda não materializada, ou None."""
+        if id_conta in self._contas:
+            return None
+        i = self._posicao(id_conta)
+        return None if i is None else self._snapshot.colunas(i)
+
+
+class JournalTransacoes:
+    """
+    Journal append-only (write-ahead) das transações das contas.
+    - Cada salvamento anexa UMA linha JSON compacta e faz fsync, então o custo
+      depende só do tamanho do registro, não do tamanho do banco. Com
+      `_FSYNC_EM_GRUPO`, o fsync sai da trava e um único fsync cobre todas
+      as linhas anexadas até ali (as threads que esperavam só conferem).
+    - O registro guarda os contadores da conta, sua versão e apenas as linhas
+      novas do extrato, a partir da posição `inicio`. Reaplicar é idempotente.
+    - A compactação roda em background: o journal é rotacionado para
+      `.compactando`, incorporado ao snapshot (`transacoes_bancarias.json`)
+      e removido.
+    - Na carga, snapshot + `.compactando` + journal são lidos em ordem
+      (recuperação após queda). Uma cauda sem fim de linha é ignorada.
+    - O estado lido fica em memória e é a fonte única de onde as contas são
+      hidratadas sob demanda; cada `anexar` também o atualiza.
+    - Vários processos podem usar os mesmos arquivos: anexar, rotacionar e
+      trocar o snapshot acontecem sob a trava do journal, e cada processo
+      relê só o que mudou: a cauda nova do journal a partir da posição já
+      lida, ou tudo, se outro processo trocou o snapshot ao compactar.
+    - Com `_FORMATO_SNAPSHOT = "binario"`, o snapshot é um `SnapshotBinario`
+      (`.bin` ao lado do `.json`) aberto via mmap, e o estado em memória
+      guarda só as contas acessadas. Na primeira abertura o snapshot JSON
+      existente é convertido (e mantido como estava).
+    """
+
+    def __init__(self, arq_snapshot, arq_journal, trava, shard=0):
+        self._arq_snapshot = self.caminho_snapshot(arq_snapshot)
+        self._arq_journal = arq_journal
+        self._arq_compactando = arq_journal + ".compactando"
+        self._trava = trava
+        self._chave_journal = TravaArquivo.chave_journal(shard)
+        self._chave_compactacao = TravaArquivo.chave_compactacao(shard)
+        self._lock = threading.Lock()
+        self._registros = 0  # registros no journal desde a última rotação
+        self._compactacao = None
+        self._estado = None  # snapshot + journal já reaplicados
+        self._snapshot_lido = None  # identidade do snapshot em `_estado`
+        self._journal_lido = (None, 0)  # (inode, posição) já lidos do journal
+        self._compactando_lido = None  # inode do `.compactando` já lido
+        # fsync em grupo: nº de linhas escritas / já duráveis por este processo
+        self._lock_fsync = threading.Lock()
+        self._escritas = 0
+        self._duraveis = 0
+        self._inode_escrita = None
+        self._primeira_do_arquivo = 0  # 1ª escrita no arquivo atual do journal
+        if self._arq_snapshot != arq_snapshot:
+            self._converter_snapshot(arq_snapshot)
+
+    # ---- formato do snapshot ----
+    @staticmethod
+    def caminho_snapshot(arq_json):
+        """Arquivo do snapshot no formato configurado."""
+        if ConfigBanco.formato_snapshot() == "binario":
+            return os.path.splitext(arq_json)[0] + ".bin"
+        return arq_json
+
+    @staticmethod
+    def gravar_snapshot(arq, contas):
+        """Grava o snapshot no formato configurado em `arq`, com fsync."""
+        metricas = ConfigBanco.metricas()
+        inicio = time.perf_counter()
+        if ConfigBanco.formato_snapshot() == "binario":
+            SnapshotBinario.gravar(arq, contas)
+            tamanho = os.path.getsize(arq) if metricas.ativa else 0
+        else:
+            with open(arq, "wb") as f:
+                dados = ConfigBanco.codec().codificar(
+                    contas, ConfigBanco.json_compacto()
+                )
+                f.write(dados)
+                f.flush()
+                os.fsync(f.fileno())
+            tamanho = len(dados)
+        if metricas.ativa:
+            segundos = time.perf_counter() - inicio
+            metricas.observar_io("snapshot", "gravar", tamanho, segundos)
+            metricas.contar("banco_reescritas_total", arquivo="snapshot")
+
+    def _converter_snapshot(self, arq_json):
+        """Primeira abertura no formato binário: snapshot JSON → `.bin`."""
+        if os.path.exists(self._arq_snapshot) or not os.path.exists(arq_json):
+            return
+        with self._trava.travar(self._chave_compactacao), self._trava.travar(
+            self._chave_journal
+        ):
+            if os.path.exists(self._arq_snapshot):
+                return  # convertido por outro processo
+            with open(arq_json, "rb") as f:
+                contas = ConfigBanco.codec().decodificar(f.read())
+            temp = self._arq_snapshot + ".tmp"
+            self.gravar_snapshot(temp, contas)
+            os.replace(temp, self._arq_snapshot)
+            fsync_diretorio(os.path.dirname(os.path.abspath(temp)))
+            ConfigBanco.metricas().contar(
+                "banco_copias_backup_total", arquivo="snapshot"
+            )
+
+    # ---- leitura ----
+    @staticmethod
+    def _identidade(arq):
+        try:
+            info = os.stat(arq)
+        except FileNotFoundError:
+            return None
+        return info.st_ino, info.st_mtime_ns, info.st_size
+
+    @staticmethod
+    def _inode(arq):
+        try:
+            return os.stat(arq).st_ino
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def _ler_registros(arq, posicao=0):
+        """Registros completos a partir de `posicao` → (registros, nova posição)."""
+        try:
+            f = open(arq, "rb")
+        except FileNotFoundError:
+            return [], posicao
+        registros = []
+        codec = ConfigBanco.codec()
+        inicio = time.perf_counter()
+        lidos = posicao
+        with f:
+            f.seek(posicao)
+            for linha in f:
+                if not linha.endswith(b"\n"):
+                    break  # cauda truncada por queda no meio da escrita
+                posicao += len(linha)
+                try:
+                    registros.append(codec.decodificar(linha))
+                except ValueError:
+                    continue  # linha corrompida: as seguintes continuam válidas
+        metricas = ConfigBanco.metricas()
+        if metricas.ativa:
+            segundos = time.perf_counter() - inicio
+            metricas.observar_io("journal", "ler", posicao - lidos, segundos)
+        return registros, posicao
+
+    @staticmethod
+    def _aplicar(contas, registro):
+        conta = contas.setdefault(registro["id"], {"extrato": []})
+        extrato = conta["extrato"]
+        if isinstance(extrato, Extrato):  # conta vinda do snapshot binário
+            extrato.truncar(registro["inicio"])
+            extrato.estender_linhas(registro["extrato"])
+        else:
+            del extrato[registro["inicio"] :]
+            extrato.extend(registro["extrato"])
+        for campo in (
+            "ultimo_dia",
+            "saldo",
+            "transacao_plus",
+            "numero_operacoes",
+            "numero_saques",
+        ):
+            conta[campo] = registro[campo]
+        conta["versao"] = registro.get("versao", 0)
+
+    def _ler_snapshot(self):
+        if not os.path.exists(self._arq_snapshot):
+            return {}
+        metricas = ConfigBanco.metricas()
+        inicio = time.perf_counter()
+        if ConfigBanco.formato_snapshot() == "binario":
+            snapshot = SnapshotBinario(self._arq_snapshot)
+            if metricas.ativa:
+                # mapeado, não lido: as páginas vêm do disco sob demanda
+                tamanho = os.path.getsize(self._arq_snapshot)
+                segundos = time.perf_counter() - inicio
+                metricas.observar_io("snapshot", "mapear", tamanho, segundos)
+            return EstadoBinario(snapshot)
+        try:
+            with open(self._arq_snapshot, "rb") as f:
+                dados = f.read()
+            contas = ConfigBanco.codec().decodificar(dados)
+        except ValueError:
+            return {}
+        if metricas.ativa:
+            segundos = time.perf_counter() - inicio
+            metricas.observar_io("snapshot", "ler", len(dados), segundos)
+        return contas
+
+    def _sincronizar(self):
+        """Traz para a memória o que foi gravado (por qualquer processo).
+        Chamado com `_lock` e a trava do journal."""
+        snapshot = self._identidade(self._arq_snapshot)
+        if self._estado is None or snapshot != self._snapshot_lido:
+            self._estado = self._ler_snapshot()
+            self._snapshot_lido = snapshot
+            self._journal_lido = (None, 0)
+            self._compactando_lido = None
+
+        inode, posicao = self._journal_lido
+        compactando = self._inode(self._arq_compactando)
+        if compactando is not None and compactando != self._compactando_lido:
+            # `.compactando` ainda não lido: o nosso journal rotacionado (segue
+            # da posição lida) ou um journal inteiro criado e rotacionado por
+            # outro processo desde a última leitura (lido do início)
+            inicio = posicao if compactando == inode else 0
+            for registro in self._ler_registros(self._arq_compactando, inicio)[0]:
+                self._aplicar(self._estado, registro)
+            self._compactando_lido = compactando
+        atual = self._inode(self._arq_journal)
+        if atual != inode:
+            posicao = 0
+        registros, posicao = self._ler_registros(self._arq_journal, posicao)
+        for registro in registros:
+            self._aplicar(self._estado, registro)
+        self._journal_lido = (atual, posicao)
+
+    def carregar(self):
+        """Estado completo: snapshot com a cauda do journal reaplicada."""
+        with self._lock, self._trava.travar(self._chave_journal):
+            if self._estado is None:
+                self._sincronizar()
+                self._registros = len(self._ler_registros(self._arq_journal)[0])
+            else:
+                self._sincronizar()
+            return self._estado
+
+    def conta(self, id_conta):
+        """Dados persistidos de uma conta (ou None), lidos do estado em memória."""
+        return self.carregar().get(id_conta)
+
+    def versao(self, id_conta):
+        conta = self.conta(id_conta)
+        return conta.get("versao", 0) if conta else 0
+
+    # ---- escrita ----
+    def anexar(self, registro):
+        self.anexar_lote([registro])
+
+    def anexar_lote(self, registros):
+        """Várias linhas em uma única escrita e um único fsync."""
+        inicio = time.perf_counter()
+        codec = ConfigBanco.codec()
+        dados = b"".join(
+            codec.codificar(registro, compacto=True) + b"\n" for registro in registros
+        )
+        em_grupo = ConfigBanco.fsync_em_grupo()
+        with self._lock, self._trava.travar(self._chave_journal):
+            f = open(self._arq_journal, "a+b")
+            try:
+                # cauda sem fim de linha (queda anterior) não pode colar no registro
+                if f.seek(0, os.SEEK_END):
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        f.write(b"\n")
+                f.write(dados)
+                f.flush()
+                if not em_grupo:
+                    os.fsync(f.fileno())
+            except BaseException:
+                f.close()
+                raise
+            self._escritas += 1
+            minha = self._escritas
+            inode = os.fstat(f.fileno()).st_ino
+            if inode != self._inode_escrita:  # journal novo (rotacionado)
+                self._inode_escrita = inode
+                self._primeira_do_arquivo = minha
+            if self._estado is not None:
+                for registro in registros:
+                    self._aplicar(self._estado, registro)
+            self._registros += len(registros)
+            precisa_compactar = self._registros >= ConfigBanco.compactar_a_cada()
+        try:
+            if em_grupo:
+                self._fsync_em_grupo(f, minha)
+        finally:
+            f.close()
+        metricas = ConfigBanco.metricas()
+        if metricas.ativa:
+            segundos = time.perf_counter() - inicio
+            metricas.observar_io("journal", "anexar", len(dados), segundos)
+        if precisa_compactar:
+            self.compactar()
+
+    def _fsync_em_grupo(self, f, minha):
+        """Um fsync torna duráveis todas as escritas feitas até ele começar."""
+        with self._lock_fsync:
+            ate = self._escritas  # lido antes de conferir a rotação
+            if self._duraveis >= minha or minha < self._primeira_do_arquivo:
+                return  # outro fsync (ou a rotação) já cobriu esta linha
+            os.fsync(f.fileno())
+            self._duraveis = max(self._duraveis, ate)
+
+    def compactar(self, esperar=False):
+        """Dispara a compactação em background (ou aguarda, se `esperar`)."""
+        with self._lock:
+            thread = self._compactacao
+            em_andamento = thread is not None and thread.is_alive()
+            if not em_andamento:
+                with self._trava.travar(self._chave_journal):
+                    # lê o journal inteiro antes de rotacioná-lo
+                    self._sincronizar()
+                    # um `.compactando` pendente (queda ou outro processo) vai antes
+                    if not os.path.exists(self._arq_compactando):
+                        if os.path.exists(self._arq_journal):
+                            if ConfigBanco.fsync_em_grupo():
+                                # linhas ainda à espera do fsync do grupo
+                                with open(self._arq_journal, "rb") as f:
+                                    os.fsync(f.fileno())
+                            os.replace(self._arq_journal, self._arq_compactando)
+                        self._registros = 0
+                self._compactacao = threading.Thread(
+                    target=self._incorporar, daemon=True
+                )
+                self._compactacao.start()
+            thread = self._compactacao
+        if esperar:
+            thread.join()
+            if em_andamento:
+                # a compactação anterior não incluía a cauda atual do journal
+                self.compactar(esperar=True)
+
+    def _incorporar(self):
+        try:
+            # um processo compacta por vez; os demais seguem anexando
+            with self._trava.travar(self._chave_compactacao):
+                if not os.path.exists(self._arq_compactando):
+                    return
+                contas = self._ler_snapshot()
+                for registro in self._ler_registros(self._arq_compactando)[0]:
+                    self._aplicar(contas, registro)
+
+                # grava em arquivo temporário e troca de forma atômica (o
+                # replace fica sob a trava do journal, junto com a remoção)
+                temp = self._arq_snapshot + ".tmp"
+                self.gravar_snapshot(temp, contas)
+                with self._lock, self._trava.travar(self._chave_journal):
+                    self._sincronizar()
+                    os.replace(temp, self._arq_snapshot)
+                    fsync_diretorio(os.path.dirname(os.path.abspath(temp)))
+                    os.remove(self._arq_compactando)
+                    # o estado em memória já contém tudo o que foi incorporado
+                    self._snapshot_lido = self._identidade(self._arq_snapshot)
+        except Exception as e:
+            # o `.compactando` continua no disco e é reaplicado na próxima carga
+            print("❌ Erro ao compactar journal:", e)
+
+
+class Armazenamento(ABC):
+    """
+    Interface de persistência usada por Conta e DadosBanco.
+    - Usuários: dict CPF → {cpf, nome, data_nascimento, endereco, contas}.
+    - Contas: registro no formato do journal (id, contadores, versão, `inicio`
+      e as linhas novas do extrato a partir dessa posição).
+    - Várias instâncias (processos) podem usar os mesmos dados: as travas
+      serializam as alterações e as versões mostram o que outro processo
+      gravou desde a última leitura.
+    """
+
+    _trava = None  # TravaArquivo do backend
+    _agendador = None  # AgendadorCommits, se o group commit estiver ligado
+
+    def travar_usuarios(self):
+        return self._trava.travar(TravaArquivo.USUARIOS)
+
+    def travar_conta(self, id_conta):
+        return self._trava.travar(TravaArquivo.chave_conta(id_conta))
+
+    def reservar_conta(self, id_conta):
+        """Trava da conta sem contexto (liberada por outra thread)."""
+        self._trava.adquirir(TravaArquivo.chave_conta(id_conta))
+
+    def liberar_conta(self, id_conta):
+        self._trava.liberar(TravaArquivo.chave_conta(id_conta))
+
+    def ligar_group_commit(self, intervalo, lote):
+        self._agendador = AgendadorCommits(self, intervalo, lote)
+
+    def particao(self, id_conta):
+        """
+        Partição da conta: lotes de partições diferentes não disputam os
+        mesmos arquivos e podem rodar em processos paralelos (sem partições,
+        tudo fica na 0).
+        """
+        return 0
+
+    def agendador(self):
+        return self._agendador
+
+    @abstractmethod
+    def carregar_usuarios(self):
+        pass
+
+    @abstractmethod
+    def salvar_usuarios(self, dados):
+        """Insere/atualiza os usuários informados (os demais são mantidos)."""
+
+    @abstractmethod
+    def carregar_conta(self, id_conta):
+        pass
+
+    @abstractmethod
+    def salvar_conta(self, registro):
+        pass
+
+    def carregar_lote(self, ids):
+        """Várias contas (id → dados ou None) de uma vez, para lotes."""
+        return {id_conta: self.carregar_conta(id_conta) for id_conta in ids}
+
+    def salvar_contas(self, registros):
+        """Grupo de registros em uma única gravação durável."""
+        for registro in registros:
+            self.salvar_conta(registro)
+
+    @abstractmethod
+    def versao_usuarios(self):
+        """Valor que muda sempre que os usuários/contas cadastrados mudam."""
+
+    @abstractmethod
+    def versao_conta(self, id_conta):
+        """Versão gravada da conta (0 se nunca movimentada)."""
+
+    def fechar(self):
+        if self._agendador is not None:
+            self._agendador.fechar()
+
+
+class ArmazenamentoJSON(Armazenamento):
+    """
+    Usuários em `contas_bancarias.json` e contas via JournalTransacoes.
+    Com `shards` > 1, as contas ficam em N pares snapshot/journal na pasta
+    `transacoes_bancarias/`, escolhidos por hash do id da conta: cada
+    carga, gravação e compactação toca só o shard da conta, e lotes podem
+    processar shards em paralelo. Na primeira abertura com shards, os
+    arquivos únicos existentes são divididos (e mantidos como estavam).
+    A quantidade de shards fica gravada na pasta (`shards.json`): abrir com
+    outra quantidade mandaria contas para o shard errado (carregadas vazias
+    e depois gravadas por cima), então a abertura é recusada.
+    """
+
+    MANIFESTO = "shards.json"
+    _NOME_SHARD = re.compile(r"shard_(\d{3,})\.(?:json|bin|journal)$")
+
+    def __init__(self, arq_contas, arq_transacoes, arq_journal, arq_trava, shards=1):
+        self._arq_contas = arq_contas
+        self._trava = TravaArquivo(arq_trava)
+        self._lock = threading.RLock()  # leitura-alteração-escrita dos usuários
+        with self.travar_usuarios():
+            self._remover_temporarios()
+            pasta = os.path.splitext(arq_transacoes)[0]
+            if os.path.isdir(pasta):
+                self._conferir_shards(pasta, shards)
+            if shards == 1:
+                self._journals = [
+                    JournalTransacoes(arq_transacoes, arq_journal, self._trava)
+                ]
+            else:
+                if not os.path.isdir(pasta):
+                    self._dividir_em_shards(
+                        pasta, shards, arq_transacoes, arq_journal
+                    )
+                self._journals = [
+                    JournalTransacoes(
+                        os.path.join(pasta, f"shard_{i:03d}.json"),
+                        os.path.join(pasta, f"shard_{i:03d}.journal"),
+                        self._trava,
+                        shard=i,
+                    )
+                    for i in range(shards)
+                ]
+
+    def _dividir_em_shards(self, pasta, shards, arq_transacoes, arq_journal):
+        """Cria a pasta de shards a partir dos arquivos únicos (se houver)."""
+        contas = JournalTransacoes(arq_transacoes, arq_journal, self._trava).carregar()
+        partes = [{} for _ in range(shards)]
+        for id_conta, conta in contas.items():
+            partes[self._indice_shard(id_conta, shards)][id_conta] = conta
+        # monta em uma pasta temporária e publica com um único rename
+        temp = pasta + ".tmp"
+        shutil.rmtree(temp, ignore_errors=True)
+        os.makedirs(temp)
+        for i, parte in enumerate(partes):
+            arq = os.path.join(temp, f"shard_{i:03d}.json")
+            JournalTransacoes.gravar_snapshot(
+                JournalTransacoes.caminho_snapshot(arq), parte
+            )
+        self.gravar_manifesto(temp, shards)
+        os.replace(temp, pasta)
+        fsync_diretorio(os.path.dirname(os.path.abspath(pasta)))
+        ConfigBanco.metricas().contar("banco_copias_backup_total", arquivo="snapshot")
+
+    @classmethod
+    def gravar_manifesto(cls, pasta, shards):
+        """Registra na pasta com quantos shards as contas foram distribuídas."""
+        gravar_json_atomico(os.path.join(pasta, cls.MANIFESTO), {"shards": shards})
+
+    @classmethod
+    def _conferir_shards(cls, pasta, shards):
+        """Recusa abrir a pasta de shards com outra quantidade de shards."""
+        arq = os.path.join(pasta, cls.MANIFESTO)
+        if os.path.exists(arq):
+            with open(arq, "rb") as f:
+                gravados = ConfigBanco.codec().decodificar(f.read())["shards"]
+        else:
+            # pasta anterior ao manifesto: os shards são os arquivos presentes
+            indices = {
+                int(nome.group(1))
+                for nome in map(cls._NOME_SHARD.match, os.listdir(pasta))
+                if nome
+            }
+            if not indices:
+                return
+            gravados = max(indices) + 1
+            if gravados == shards:
+                cls.gravar_manifesto(pasta, shards)
+                return
+        if gravados != shards:
+            raise ValueError(
+                f"{pasta}: contas gravadas em {gravados} shards, mas "
+                f"ConfigBanco._SHARDS_TRANSACOES = {shards}; abra com "
+                f"{gravados} shards"
+            )
+
+    @staticmethod
+    def _indice_shard(id_conta, shards):
+        return zlib.crc32(id_conta.encode("utf-8")) % shards
+
+    def _shard(self, id_conta):
+        return self._journals[self._indice_shard(id_conta, len(self._journals))]
+
+    def particao(self, id_conta):
+        return self._indice_shard(id_conta, len(self._journals))
+
+    def quantidade_shards(self):
+        return len(self._journals)
+
+    def carregar_shard(self, indice):
+        """Contas (id → dados) de um único shard, para lotes em paralelo."""
+        return self._journals[indice].carregar()
+
+    def carregar_contas(self):
+        """Todas as contas persistidas (id → dados), shard a shard."""
+        contas = {}
+        for journal in self._journals:
+            contas.update(journal.carregar())
+        return contas
+
+    def _remover_temporarios(self):
+        """Temporários de gravações interrompidas (sob a trava, ninguém grava)."""
+        pasta = os.path.dirname(os.path.abspath(self._arq_contas))
+        prefixo = os.path.basename(self._arq_contas) + "."
+        for nome in os.listdir(pasta):
+            if nome.startswith(prefixo) and nome.endswith(".tmp"):
+                os.remove(os.path.join(pasta, nome))
+
+    @sincronizado
+    def carregar_usuarios(self):
+        if not os.path.exists(self._arq_contas):
+            return {}
+        inicio = time.perf_counter()
+        try:
+            with self.travar_usuarios(), open(self._arq_contas, "rb") as f:
+                dados = f.read()
+            usuarios = ConfigBanco.codec().decodificar(dados)
+        except ValueError:
+            return {}
+        metricas = ConfigBanco.metricas()
+        if metricas.ativa:
+            segundos = time.perf_counter() - inicio
+            metricas.observar_io("usuarios", "ler", len(dados), segundos)
+        return usuarios
+
+    def versao_usuarios(self):
+        return JournalTransacoes._identidade(self._arq_contas)
+
+    @sincronizado
+    def salvar_usuarios(self, dados):
+        with self.travar_usuarios():
+            conteudo = self.carregar_usuarios()
+            conteudo.update(dados)
+            inicio = time.perf_counter()
+            try:
+                # em caso de erro o arquivo anterior continua intacto
+                tamanho = gravar_json_atomico(self._arq_contas, conteudo)
+            except Exception as e:
+                print("❌ Erro ao salvar contas:", e)
+                return
+            metricas = ConfigBanco.metricas()
+            if metricas.ativa:
+                segundos = time.perf_counter() - inicio
+                metricas.observar_io("usuarios", "gravar", tamanho, segundos)
+                metricas.contar("banco_reescritas_total", arquivo="usuarios")
+
+    def carregar_conta(self, id_conta):
+        return self._shard(id_conta).conta(id_conta)
+
+    def versao_conta(self, id_conta):
+        return self._shard(id_conta).versao(id_conta)
+
+    def carregar_lote(self, ids):
+        # uma sincronização por shard, não por conta
+        estados = {}
+        lote = {}
+        for id_conta in ids:
+            journal = self._shard(id_conta)
+            if journal not in estados:
+                estados[journal] = journal.carregar()
+            lote[id_conta] = estados[journal].get(id_conta)
+        return lote
+
+    def salvar_conta(self, registro):
+        self._shard(registro["id"]).anexar(registro)
+
+    def salvar_contas(self, registros):
+        # um anexo (e um fsync) por shard tocado
+        por_shard = {}
+        for registro in registros:
+            por_shard.setdefault(self._shard(registro["id"]), []).append(registro)
+        for journal, lote in por_shard.items():
+            journal.anexar_lote(lote)
+
+    def compactar(self, esperar=False, shards=None):
+        """Compacta todos os shards, ou só os índices em `shards`."""
+        journals = [
+            journal
+            for indice, journal in enumerate(self._journals)
+            if shards is None or indice in shards
+        ]
+        for journal in journals:
+            journal.compactar()
+        if esperar:
+            for journal in journals:
+                journal.compactar(esperar=True)
+
+    def fechar(self):
+        super().fechar()
+        self.compactar(esperar=True)
+
+
+class ArmazenamentoSQLite(Armazenamento):
+    """
+    Backend SQLite (modo WAL) com tabelas indexadas de usuários, contas e
+    linhas de extrato. Um depósito vira um UPDATE da conta e um INSERT da
+    linha nova, na mesma transação. As instruções SQL são constantes, então
+    o cache de statements do sqlite3 reaproveita as preparadas.
+    """
+
+    _ESQUEMA = """
+        CREATE TABLE IF NOT EXISTS usuarios (
+            cpf TEXT PRIMARY KEY,
+            nome TEXT NOT NULL,
+            data_nascimento TEXT,
+            endereco TEXT
+        );
+        CREATE TABLE IF NOT EXISTS contas (
+            id TEXT PRIMARY KEY,
+            cpf TEXT NOT NULL REFERENCES usuarios (cpf),
+            agencia TEXT NOT NULL,
+            numero_conta INTEGER NOT NULL,
+            ultimo_dia TEXT,
+            saldo TEXT NOT NULL DEFAULT '0.00',
+            transacao_plus INTEGER NOT NULL DEFAULT 0,
+            numero_operacoes INTEGER NOT NULL DEFAULT 0,
+            numero_saques INTEGER NOT NULL DEFAULT 0,
+            versao INTEGER NOT NULL DEFAULT 0,
+            UNIQUE (agencia, numero_conta)
+        );
+        CREATE INDEX IF NOT EXISTS idx_contas_cpf ON contas (cpf);
+        CREATE TABLE IF NOT EXISTS extrato (
+            id_conta TEXT NOT NULL REFERENCES contas (id),
+            posicao INTEGER NOT NULL,
+            tipo TEXT NOT NULL,
+            valor TEXT NOT NULL,
+            data TEXT NOT NULL,
+            PRIMARY KEY (id_conta, posicao)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS meta (
+            chave TEXT PRIMARY KEY,
+            valor INTEGER NOT NULL
+        );
+        INSERT OR IGNORE INTO meta (chave, valor) VALUES ('usuarios', 0);
+    """
+    _SQL_USUARIO = """
+        INSERT INTO usuarios (cpf, nome, data_nascimento, endereco)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT (cpf) DO UPDATE SET
+            nome = excluded.nome,
+            data_nascimento = excluded.data_nascimento,
+            endereco = excluded.endereco
+    """
+    _SQL_CONTA_NOVA = """
+        INSERT OR IGNORE INTO contas (id, cpf, agencia, numero_conta)
+        VALUES (?, ?, ?, ?)
+    """
+    _SQL_CONTA = """
+        INSERT INTO contas (
+            id, cpf, agencia, numero_conta, ultimo_dia, saldo,
+            transacao_plus, numero_operacoes, numero_saques, versao
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (id) DO UPDATE SET
+            ultimo_dia = excluded.ultimo_dia,
+            saldo = excluded.saldo,
+            transacao_plus = excluded.transacao_plus,
+            numero_operacoes = excluded.numero_operacoes,
+            numero_saques = excluded.numero_saques,
+            versao = excluded.versao
+    """
+    _SQL_EXTRATO = """
+        INSERT OR REPLACE INTO extrato (id_conta, posicao, tipo, valor, data)
+        VALUES (?, ?, ?, ?, ?)
+    """
+    _SQL_TRUNCAR_EXTRATO = "DELETE FROM extrato WHERE id_conta = ? AND posicao >= ?"
+
+    _SQL_VERSAO_USUARIOS = (
+        "UPDATE meta SET valor = valor + 1 WHERE chave = 'usuarios'"
+    )
+
+    def __init__(self, arq):
+        self._conexao = sqlite3.connect(arq, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._trava = TravaArquivo(arq + ".lock")
+        with self._lock, self._conexao:
+            self._conexao.execute("PRAGMA journal_mode=WAL")
+            colunas = [
+                coluna[1]
+                for coluna in self._conexao.execute("PRAGMA table_info(contas)")
+            ]
+            if colunas and "versao" not in colunas:  # banco anterior às versões
+                self._conexao.execute(
+                    "ALTER TABLE contas ADD COLUMN versao INTEGER NOT NULL DEFAULT 0"
+                )
+            self._conexao.executescript(self._ESQUEMA)
+
+    def carregar_usuarios(self):
+        with self._lock:
+            usuarios = self._conexao.execute(
+                "SELECT cpf, nome, data_nascimento, endereco FROM usuarios"
+            ).fetchall()
+            contas = self._conexao.execute(
+                "SELECT cpf, agencia, numero_conta FROM contas"
+                " JOIN usuarios USING (cpf) ORDER BY numero_conta"
+            ).fetchall()
+        dados = {
+            cpf: {
+                "cpf": cpf,
+                "nome": nome,
+                "data_nascimento": data_nascimento,
+                "endereco": endereco,
+                "contas": [],
+            }
+            for cpf, nome, data_nascimento, endereco in usuarios
+        }
+        for cpf, agencia, numero_conta in contas:
+            dados[cpf]["contas"].append(
+                {"agencia": agencia, "numero_conta": numero_conta}
+            )
+        return dados
+
+    def salvar_usuarios(self, dados):
+        try:
+            with self._lock, self._conexao:
+                self._gravar_usuarios(dados)
+        except sqlite3.Error as e:
+            print("❌ Erro ao salvar contas:", e)
+
+    def versao_usuarios(self):
+        with self._lock:
+            return self._conexao.execute(
+                "SELECT valor FROM meta WHERE chave = 'usuarios'"
+            ).fetchone()[0]
+
+    def _gravar_usuarios(self, dados):
+        self._conexao.execute(self._SQL_VERSAO_USUARIOS)
+        self._conexao.executemany(
+            self._SQL_USUARIO,
+            [
+                (u["cpf"], u["nome"], u["data_nascimento"], u["endereco"])
+                for u in dados.values()
+            ],
+        )
+        self._conexao.executemany(
+            self._SQL_CONTA_NOVA,
+            [
+                (
+                    f"{u['cpf']}-{c['agencia']}-{c['numero_conta']}",
+                    u["cpf"],
+                    c["agencia"],
+                    c["numero_conta"],
+                )
+                for u in dados.values()
+                for c in u["contas"]
+            ],
+        )
+
+    def carregar_conta(self, id_conta):
+        with self._lock:
+            linha = self._conexao.execute(
+                "SELECT ultimo_dia, saldo, transacao_plus, numero_operacoes,"
+                " numero_saques, versao FROM contas WHERE id = ?",
+                (id_conta,),
+            ).fetchone()
+            if not linha or linha[0] is None:
+                return None  # conta cadastrada, mas nunca movimentada
+            extrato = self._conexao.execute(
+                "SELECT tipo, valor, data FROM extrato"
+                " WHERE id_conta = ? ORDER BY posicao",
+                (id_conta,),
+            ).fetchall()
+        ultimo_dia, saldo, transacao_plus, numero_operacoes, numero_saques, versao = (
+            linha
+        )
+        return {
+            "ultimo_dia": ultimo_dia,
+            "saldo": saldo,
+            "transacao_plus": transacao_plus,
+            "numero_operacoes": numero_operacoes,
+            "numero_saques": numero_saques,
+            "versao": versao,
+            "extrato": [list(movimento) for movimento in extrato],
+        }
+
+    def versao_conta(self, id_conta):
+        with self._lock:
+            linha = self._conexao.execute(
+                "SELECT versao FROM contas WHERE id = ?", (id_conta,)
+            ).fetchone()
+        return linha[0] if linha else 0
+
+    def salvar_conta(self, registro):
+        with self._lock, self._conexao:
+            self._gravar_conta(registro)
+
+    def salvar_contas(self, registros):
+        with self._lock, self._conexao:
+            for registro in registros:
+                self._gravar_conta(registro)
+
+    def _gravar_conta(self, registro):
+        id_conta = registro["id"]
+        cpf, agencia, numero_conta = id_conta.split("-")
+        self._conexao.execute(
+            self._SQL_CONTA,
+            (
+                id_conta,
+                cpf,
+                agencia,
+                int(numero_conta),
+                registro["ultimo_dia"],
+                registro["saldo"],
+                registro["transacao_plus"],
+                registro["numero_operacoes"],
+                registro["numero_saques"],
+                registro.get("versao", 0),
+            ),
+        )
+        inicio = registro["inicio"]
+        self._conexao.executemany(
+            self._SQL_EXTRATO,
+            [
+                (id_conta, inicio + i, tipo, valor, data)
+                for i, (tipo, valor, data) in enumerate(registro["extrato"])
+            ],
+        )
+
+    def importar(self, usuarios, contas):
+        """Carga em massa (migração): tudo em uma única transação."""
+        with self._lock, self._conexao:
+            self._gravar_usuarios(usuarios)
+            for id_conta, conta in contas.items():
+                if isinstance(conta["extrato"], Extrato):  # snapshot binário
+                    conta = {**conta, "extrato": conta["extrato"].linhas()}
+                self._conexao.execute(self._SQL_TRUNCAR_EXTRATO, (id_conta, 0))
+                self._gravar_conta({"id": id_conta, "inicio": 0, **conta})
+
+    def fechar(self):
+        super().fechar()
+        with self._lock:
+            self._conexao.close()
 
 
-def ofertar_transacao_plus(conta):
-    limpar_tela()
-    while True:
-        print("\n=== Transação Plus ===")
-        print("Você atingiu o limite diário de operações.")
-        print(
-            f"Deseja ativar uma Transação Plus por {formatar_brl(ConfigBanco.valor_transacao_plus())}?"
-        )
-        opcao = input("[s] Sim | [n] Não: ").lower()
+class AgendadorCommits:
+    """
+    Group commit: contas alteradas entram em um conjunto de pendentes e são
+    gravadas juntas, em uma única gravação durável (um fsync no journal, uma
+    transação no SQLite), a cada `intervalo` segundos ou assim que houver
+    `lote` contas pendentes.
+    - Uma queda perde no máximo o que foi agendado no último intervalo.
+    - `aguardar` bloqueia até a rodada informada estar em disco e antecipa a
+      gravação (quem precisa de durabilidade não espera o intervalo).
+    - Enquanto pendente, a conta segura a trava entre processos: outro
+      processo só a lê depois de gravada.
+    - O registro é montado em `agendar`, por quem salva: a thread de gravação
+      nunca pede a trava de uma conta (que uma sessão pode segurar por todo
+      o menu) e só confirma a gravação no objeto.
+    """
 
-        match opcao:
-            case "s":
-                trans_plus = TransacaoPlus()
-                return trans_plus.executar(conta)
-            case "n":
-                return (
-                    False,
-                    "❌ Operação cancelada! Limite diário de operações atingido.",
+    def __init__(self, armazenamento, intervalo, lote):
+        self._armazenamento = armazenamento
+        self._intervalo = intervalo
+        self._lote = lote
+        self._cond = threading.Condition()
+        self._pendentes = {}  # id da conta → (Conta, registro, marca)
+        self._gravando = {}  # id sendo gravado agora → versão do registro
+        self._rodada = 1  # rodada que recebe os novos agendamentos
+        self._gravada = 0  # todas as rodadas até esta estão em disco
+        self._urgente = False
+        self._fechando = False
+        self._thread = threading.Thread(target=self._laco, daemon=True)
+        self._thread.start()
+
+    def agendar(self, conta):
+        """
+        Monta o registro da conta agora (na thread de quem salva, que pode
+        estar com a conta em uma sessão) e o inclui na próxima gravação;
+        retorna a rodada para `aguardar`, ou None se não há o que gravar.
+        """
+        id_conta = conta._id()
+        with conta._lock:
+            pendente = conta._registro_pendente()
+            if pendente is None:
+                return None
+            with self._cond:
+                if id_conta in self._pendentes:
+                    # já reservada: o registro novo substitui o anterior
+                    return self._incluir(conta, *pendente)
+            # a trava é pedida fora da condição: pode esperar outro processo
+            self._armazenamento.reservar_conta(id_conta)
+            with self._cond:
+                if id_conta in self._pendentes:
+                    self._armazenamento.liberar_conta(id_conta)
+                return self._incluir(conta, *pendente)
+
+    def _incluir(self, conta, registro, marca):
+        # com a condição: versão acima da gravada e da que está em gravação,
+        # já que o registro parte do último estado confirmado
+        id_conta = conta._id()
+        registro["versao"] = (
+            max(conta._persistido[2], self._gravando.get(id_conta, 0)) + 1
+        )
+        self._pendentes[id_conta] = (conta, registro, marca)
+        if len(self._pendentes) >= self._lote:
+            self._cond.notify_all()
+        return self._rodada
+
+    def reservada(self, id_conta):
+        """Pendente ou sendo gravada: a versão em disco pode estar à frente."""
+        with self._cond:
+            return id_conta in self._pendentes or id_conta in self._gravando
+
+    def aguardar(self, rodada=None):
+        """Espera a rodada (padrão: tudo o que já foi agendado) ficar durável."""
+        with self._cond:
+            if rodada is None:
+                rodada = self._rodada if self._pendentes else self._rodada - 1
+            if self._gravada < rodada:
+                self._urgente = True
+                self._cond.notify_all()
+                self._cond.wait_for(lambda: self._gravada >= rodada)
+        return True
+
+    def fechar(self):
+        """Grava o que estiver pendente e encerra a thread."""
+        with self._cond:
+            self._fechando = True
+            self._cond.notify_all()
+        self._thread.join()
+
+    def _laco(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: self._fechando
+                    or self._urgente
+                    or len(self._pendentes) >= self._lote,
+                    timeout=self._intervalo,
                 )
-            case _:
-                print("Opção inválida, tente novamente.")
+                if not self._pendentes:
+                    if self._fechando:
+                        return
+                    continue
+                lote, self._pendentes = self._pendentes, {}
+                self._gravando = {
+                    id_conta: registro["versao"]
+                    for id_conta, (_, registro, _) in lote.items()
+                }
+                rodada = self._rodada
+                self._rodada += 1
+                self._urgente = False
+            if not self._gravar(lote, rodada):
+                time.sleep(self._intervalo)  # nova tentativa no próximo ciclo
+
+    def _gravar(self, lote, rodada):
+        # os registros já vêm prontos: nenhuma trava de conta é pedida aqui
+        try:
+            self._armazenamento.salvar_contas(
+                [registro for _, registro, _ in lote.values()]
+            )
+        except Exception as e:
+            print("❌ Erro ao salvar transações:", e)
+            with self._cond:
+                # as contas seguem reservadas e voltam para a próxima rodada;
+                # um registro agendado depois já cobre o que falhou
+                for id_conta, pendente in lote.items():
+                    if id_conta in self._pendentes:
+                        self._armazenamento.liberar_conta(id_conta)
+                    else:
+                        self._pendentes[id_conta] = pendente
+                self._gravando = {}
+            return False
+        with self._cond:
+            for conta, registro, marca in lote.values():
+                conta._confirmar_gravacao(registro, marca)
+            self._gravando = {}
+            self._gravada = rodada
+            self._cond.notify_all()
+        for id_conta in lote:
+            self._armazenamento.liberar_conta(id_conta)
+        return True
 
 
-# ========= Novos v3_0 =========
-class ConfigBanco:
-    _LIMITE_SAQUE = Decimal("500.00")
-    _VALOR_SACAR_PLUS = Decimal("0.50")
-    _VALOR_TRANSACAO_PLUS = Decimal("0.25")
-    _VALOR_IMPRIMIR_EXTRATO = Decimal("0.00")
-    _OPERACOES_DIARIAS = 10
-    _SAQUES_DIARIOS = 3
-    _AGENCIA_PADRAO = "0001"
-    _ARQ_CONTAS = "contas_bancarias.json"
-    _ARQ_TRANSACOES = "transacoes_bancarias.json"
+class Transacao(ABC):
+    @abstractmethod
+    def executar(self, conta):
+        pass
 
-    @classmethod
-    def limite_saque(cls):
-        return cls._LIMITE_SAQUE
 
-    @classmethod
-    def valor_sacar_plus(cls):
-        return cls._VALOR_SACAR_PLUS
+class Extrato:
+    """
+    Extrato em colunas compactas, no lugar de uma lista de tuplas.
+    - tipo: código interno (`array('B')`) de uma tabela de tipos compartilhada.
+    - valor: centavos inteiros (`array('q')`).
+    - data: microssegundos desde a época, em UTC (`array('q')`).
+    Continua se comportando como sequência de (tipo, Decimal, datetime), então
+    `exibir_extrato` e a persistência iteram e fatiam como antes.
+    Vindo de um snapshot binário, o histórico persistido fica mapeado
+    (`mapeado`): as colunas são memoryviews somente leitura sobre o mmap,
+    sem cópia, e só os movimentos novos vão para os arrays. `recorte` e
+    `periodo` fatiam por posição ou por data (busca binária nas datas, que
+    crescem na ordem de registro) também sem copiar a parte mapeada.
+    Para consultas sem replay do histórico:
+    - acumulado: soma dos valores até cada movimento (`array('q')`), base do
+      saldo em qualquer data (`Conta.saldo_em`);
+    - agregados por dia e por mês (dias no fuso local) e tipo: quantidade,
+      créditos e débitos, montados na primeira consulta (a partir dos
+      diários gravados no snapshot binário, quando há) e mantidos a cada
+      movimento; base de `resumo`.
+    """
 
-    @classmethod
-    def valor_transacao_plus(cls):
-        return cls._VALOR_TRANSACAO_PLUS
+    # registro de tipos do processo (compartilhado por todos os extratos):
+    # leitura sem lock, inclusão sob `_lock_tipos` (o tipo entra em _TIPOS
+    # antes de _CODIGOS, então um código visto já tem o seu tipo)
+    _TIPOS = []  # código → tipo
+    _CODIGOS = {}  # tipo → código
+    _lock_tipos = threading.Lock()
+    _EPOCA = datetime(1970, 1, 1, tzinfo=timezone.utc)
+    _MICROSSEGUNDO = timedelta(microseconds=1)
+    # tarifas cobradas pelo banco (inclui nomes antigos do v2_2)
+    TIPOS_TARIFA = frozenset(
+        {"Taxa Saque Plus", "Transação Plus", "Imprimir Extrato", "Exibir Extrato"}
+    )
+    # parte mapeada (padrão da classe: nenhuma): colunas, tamanho e a tradução
+    # dos códigos de tipo do arquivo para os deste processo
+    _base = None
+    _n_base = 0
+    _traducao = None
+    _base_agregados = None  # agregados diários gravados com a parte mapeada
+    # agregados: dia (ordinal) / mês (ano * 12 + mês - 1) → código → [qtd,
+    # créditos, débitos]; None até a primeira consulta
+    _dias = None
+    _meses = None
+    _cache_dia = (0, 0, 0, 0)  # (início, fim) em micros do último dia, dia, mês
+
+    def __init__(self, movimentos=()):
+        self._tipos = array("B")
+        self._centavos = array("q")
+        self._micros = array("q")
+        self._acumulados = array("q")
+        self.extend(movimentos)
 
     @classmethod
-    def operacoes_diarias(cls):
-        return cls._OPERACOES_DIARIAS
+    def _codigo(cls, tipo):
+        codigo = cls._CODIGOS.get(tipo)
+        if codigo is None:
+            with cls._lock_tipos:
+                codigo = cls._CODIGOS.get(tipo)
+                if codigo is None:
+                    codigo = len(cls._TIPOS)
+                    cls._TIPOS.append(tipo)
+                    cls._CODIGOS[tipo] = codigo
+        return codigo
+
+    @staticmethod
+    def agora():
+        """Instante atual em microssegundos desde a época (UTC)."""
+        return time.time_ns() // 1000
+
+    def registrar(self, tipo, centavos, micros):
+        """Caminho rápido das transações: valores já em centavos/micros."""
+        codigo = self._codigo(tipo)
+        self._acumulados.append(self.total() + centavos)
+        self._tipos.append(codigo)
+        self._centavos.append(centavos)
+        self._micros.append(micros)
+        if self._dias is not None:
+            self._somar(codigo, centavos, micros, 1)
+
+    def total(self):
+        """Soma de todos os valores do extrato."""
+        if self._acumulados:
+            return self._acumulados[-1]
+        if self._n_base:
+            return self._base[3][self._n_base - 1]
+        return 0
+
+    def acumulado(self, i):
+        """Soma dos valores até o movimento `i` (inclusive)."""
+        if i < self._n_base:
+            return self._base[3][i]
+        return self._acumulados[i - self._n_base]
 
     @classmethod
-    def saques_diarios(cls):
-        return cls._SAQUES_DIARIOS
+    def para_micros(cls, data):
+        """datetime (sem fuso = horário local) → micros desde a época."""
+        if data.tzinfo is None:
+            data = data.astimezone()
+        return (data - cls._EPOCA) // cls._MICROSSEGUNDO
+
+    def append(self, movimento):
+        tipo, valor, data = movimento
+        self.registrar(tipo, para_centavos(valor), self.para_micros(data))
+
+    def extend(self, movimentos):
+        for movimento in movimentos:
+            self.append(movimento)
 
     @classmethod
-    def agencia_padrao(cls):
-        return cls._AGENCIA_PADRAO
+    def de_linhas(cls, linhas):
+        """
+        Extrato a partir das linhas persistidas (tipo, "valor", "data ISO"),
+        convertendo direto para centavos/micros, sem Decimal intermediário.
+        Um Extrato já em colunas (snapshot binário) é apenas copiado.
+        """
+        if isinstance(linhas, Extrato):
+            return linhas.copia()
+        extrato = cls()
+        extrato.estender_linhas(linhas)
+        return extrato
+
+    def estender_linhas(self, linhas):
+        """Acrescenta linhas no formato persistido."""
+        for tipo, valor, data in linhas:
+            self.registrar(
+                tipo,
+                centavos_de_texto(valor),
+                self.para_micros(datetime.fromisoformat(data)),
+            )
 
     @classmethod
-    def arquivo_contas(cls):
-        return cls._ARQ_CONTAS
+    def de_colunas(cls, tipos, centavos, micros, acumulados=None):
+        """Extrato a partir das colunas em bytes (little-endian), sem laço."""
+        extrato = cls()
+        extrato._tipos.frombytes(tipos)
+        extrato._centavos.frombytes(centavos)
+        extrato._micros.frombytes(micros)
+        if sys.byteorder != "little":
+            extrato._centavos.byteswap()
+            extrato._micros.byteswap()
+        if acumulados is None:
+            extrato._acumulados = array("q", accumulate(extrato._centavos))
+        else:
+            extrato._acumulados.frombytes(acumulados)
+            if sys.byteorder != "little":
+                extrato._acumulados.byteswap()
+        return extrato
 
     @classmethod
-    def arquivo_transacoes(cls):
-        return cls._ARQ_TRANSACOES
+    def mapeado(
+        cls, tipos, centavos, micros, traducao, acumulados=None, agregados=None
+    ):
+        """
+        Extrato sobre colunas mapeadas (memoryviews de bytes little-endian de
+        um snapshot binário), sem copiá-las. `traducao` leva os códigos de
+        tipo do arquivo aos deste processo. Sem a coluna de acumulados
+        (snapshot v1), ela é calculada aqui.
+        """
+        if sys.byteorder != "little":
+            return cls.de_colunas(
+                bytes(tipos).translate(traducao), centavos, micros, acumulados
+            )
+        centavos = centavos.cast("q")
+        if acumulados is None:
+            acumulados = array("q", accumulate(centavos))
+        else:
+            acumulados = acumulados.cast("q")
+        extrato = cls()
+        extrato._base = (tipos, centavos, micros.cast("q"), acumulados)
+        extrato._n_base = len(tipos)
+        extrato._traducao = traducao
+        if agregados is not None:
+            extrato._base_agregados = agregados
+        return extrato
+
+    def copia(self):
+        """Cópia independente; a parte mapeada (imutável) é compartilhada."""
+        extrato = Extrato()
+        extrato._base, extrato._n_base = self._base, self._n_base
+        extrato._traducao = self._traducao
+        extrato._base_agregados = self._base_agregados
+        extrato._tipos.extend(self._tipos)
+        extrato._centavos.extend(self._centavos)
+        extrato._micros.extend(self._micros)
+        extrato._acumulados.extend(self._acumulados)
+        return extrato
+
+    def _materializar(self):
+        """Copia a parte mapeada para os arrays (antes de truncá-la)."""
+        if self._base is None:
+            return
+        tipos, centavos, micros, acumulados = self._base
+        self._tipos[:0] = array("B", bytes(tipos).translate(self._traducao))
+        self._centavos[:0] = array("q", centavos)
+        self._micros[:0] = array("q", micros)
+        self._acumulados[:0] = array("q", acumulados)
+        # volta aos padrões da classe (os agregados já montados continuam)
+        self._base, self._n_base, self._traducao = None, 0, None
+        self._base_agregados = None
+
+    def colunas(self):
+        """(tipos, centavos, micros) em bytes little-endian; tipos nos códigos
+        deste processo."""
+        centavos, micros = self._centavos, self._micros
+        if sys.byteorder != "little":
+            centavos, micros = array("q", centavos), array("q", micros)
+            centavos.byteswap()
+            micros.byteswap()
+        colunas = self._tipos.tobytes(), centavos.tobytes(), micros.tobytes()
+        if self._base is None:
+            return colunas
+        tipos, centavos, micros, _ = self._base
+        return (
+            bytes(tipos).translate(self._traducao) + colunas[0],
+            centavos.tobytes() + colunas[1],
+            micros.tobytes() + colunas[2],
+        )
+
+    def coluna_acumulados(self):
+        """Coluna de acumulados em bytes little-endian."""
+        acumulados = self._acumulados
+        if sys.byteorder != "little":
+            acumulados = array("q", acumulados)
+            acumulados.byteswap()
+        if self._base is None:
+            return acumulados.tobytes()
+        return self._base[3].tobytes() + acumulados.tobytes()
+
+    def _campos(self, i):
+        """(código do tipo, centavos, micros) do movimento `i` (não negativo)."""
+        if i < self._n_base:
+            tipos, centavos, micros, _ = self._base
+            return self._traducao[tipos[i]], centavos[i], micros[i]
+        i -= self._n_base
+        return self._tipos[i], self._centavos[i], self._micros[i]
+
+    def linhas(self, inicio=0):
+        """Movimentos a partir de `inicio` no formato persistido."""
+        linhas = []
+        for i in range(inicio, len(self)):
+            codigo, centavos, micros = self._campos(i)
+            linhas.append(
+                (
+                    self._TIPOS[codigo],
+                    texto_de_centavos(centavos),
+                    (self._EPOCA + timedelta(microseconds=micros)).isoformat(),
+                )
+            )
+        return linhas
+
+    def _movimento(self, i):
+        codigo, centavos, micros = self._campos(i)
+        return (
+            self._TIPOS[codigo],
+            de_centavos(centavos),
+            self._EPOCA + timedelta(microseconds=micros),
+        )
 
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return [self._movimento(i) for i in range(*indice.indices(len(self)))]
+        if indice < 0:
+            indice += len(self)
+        if not 0 <= indice < len(self):
+            raise IndexError("índice fora do extrato")
+        return self._movimento(indice)
+
+    def __len__(self):
+        return self._n_base + len(self._tipos)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self._movimento(i)
+
+    def recorte(self, inicio=0, fim=None):
+        """
+        Extrato com os movimentos [inicio, fim) — como `self[inicio:fim]`,
+        mas sem materializar tuplas: a parte mapeada é fatiada sem cópia e
+        só os movimentos em memória do intervalo são copiados. Os acumulados
+        continuam os do histórico completo.
+        """
+        inicio, fim, _ = slice(inicio, fim).indices(len(self))
+        fim = max(inicio, fim)
+        extrato = Extrato()
+        n = self._n_base
+        if inicio < n:
+            ate = min(fim, n)
+            extrato._base = tuple(coluna[inicio:ate] for coluna in self._base)
+            extrato._n_base = ate - inicio
+            extrato._traducao = self._traducao
+        de, ate = max(inicio - n, 0), max(fim - n, 0)
+        extrato._tipos = self._tipos[de:ate]
+        extrato._centavos = self._centavos[de:ate]
+        extrato._micros = self._micros[de:ate]
+        extrato._acumulados = self._acumulados[de:ate]
+        return extrato
+
+    def posicao_data(self, data):
+        """Primeira posição com data >= `data` (busca binária nas datas)."""
+        micros = self.para_micros(data)
+        n = self._n_base
+        if n:
+            posicao = bisect.bisect_left(self._base[2], micros)
+            if posicao < n:
+                return posicao
+        return n + bisect.bisect_left(self._micros, micros)
+
+    def periodo(self, desde=None, ate=None):
+        """Recorte dos movimentos com `desde` <= data < `ate` (None = aberto)."""
+        inicio = 0 if desde is None else self.posicao_data(desde)
+        fim = len(self) if ate is None else self.posicao_data(ate)
+        return self.recorte(inicio, fim)
+
+    def consultar(
+        self,
+        desde=None,
+        ate=None,
+        tipos=None,
+        cursor=None,
+        limite=None,
+        decrescente=False,
+    ):
+        """
+        Gerador preguiçoso de (posição, tipo, centavos, micros) dos movimentos
+        com `desde` <= data < `ate` e tipo em `tipos` (None = sem filtro), no
+        máximo `limite`. O período é achado por busca binária e nada é
+        formatado aqui: quem consome formata só as linhas que usar.
+        `cursor` continua uma página: posição seguinte à última recebida
+        (ou a própria última, em ordem `decrescente`). O extrato só cresce,
+        então as posições (e os cursores) não mudam.
+        """
+        inicio = 0 if desde is None else self.posicao_data(desde)
+        fim = len(self) if ate is None else self.posicao_data(ate)
+        if cursor is not None:
+            if decrescente:
+                fim = min(fim, cursor)
+            else:
+                inicio = max(inicio, cursor)
+        codigos = None
+        if tipos is not None:
+            codigos = {self._CODIGOS[t] for t in tipos if t in self._CODIGOS}
+        if decrescente:
+            posicoes = range(fim - 1, inicio - 1, -1)
+        else:
+            posicoes = range(inicio, fim)
+        entregues = 0
+        for i in posicoes:
+            if limite is not None and entregues >= limite:
+                return
+            codigo, centavos, micros = self._campos(i)
+            if codigos is None or codigo in codigos:
+                entregues += 1
+                yield i, self._TIPOS[codigo], centavos, micros
+
+    def truncar(self, tamanho):
+        """Descarta os movimentos a partir de `tamanho` (rollback de lote)."""
+        if self._dias is not None:
+            for i in range(tamanho, len(self)):
+                self._somar(*self._campos(i), -1)
+        if tamanho < self._n_base:
+            self._materializar()
+        tamanho -= self._n_base
+        for coluna in (self._tipos, self._centavos, self._micros, self._acumulados):
+            del coluna[tamanho:]
+
+    # ---- agregados por período ----
     @classmethod
-    def valor_imprimir_extrato(cls):
-        return cls._VALOR_IMPRIMIR_EXTRATO
+    def dia_local(cls, micros):
+        """(dia, mês) locais de um instante, com cache do último dia visto."""
+        return cls._dia_local(micros)[2:]
 
+    @classmethod
+    def _dia_local(cls, micros):
+        """
+        (início, fim, dia, mês) do dia local de `micros`. O cache é de toda
+        a classe (threads de contas diferentes): é lido e trocado como uma
+        tupla inteira e quem chama usa só o que recebeu, nunca o cache.
+        """
+        cache = cls._cache_dia
+        if cache[0] <= micros < cache[1]:
+            return cache
+        data = (cls._EPOCA + timedelta(microseconds=micros)).astimezone().date()
+        meia_noite = datetime.min.time()
+        inicio = cls.para_micros(datetime.combine(data, meia_noite))
+        fim = cls.para_micros(datetime.combine(data + timedelta(days=1), meia_noite))
+        dia, mes = data.toordinal(), data.year * 12 + data.month - 1
+        cls._cache_dia = cache = (inicio, fim, dia, mes)
+        return cache
+
+    def _acumular(self, dia, mes, codigo, qtd, creditos, debitos):
+        for tabela, chave in ((self._dias, dia), (self._meses, mes)):
+            por_tipo = tabela.get(chave)
+            if por_tipo is None:
+                por_tipo = tabela[chave] = {}
+            soma = por_tipo.get(codigo)
+            if soma is None:
+                por_tipo[codigo] = [qtd, creditos, debitos]
+            else:
+                soma[0] += qtd
+                soma[1] += creditos
+                soma[2] += debitos
+
+    def _somar(self, codigo, centavos, micros, sinal):
+        dia, mes = self.dia_local(micros)
+        if centavos >= 0:
+            self._acumular(dia, mes, codigo, sinal, sinal * centavos, 0)
+        else:
+            self._acumular(dia, mes, codigo, sinal, 0, -sinal * centavos)
 
-class Transacao(ABC):
-    @abstractmethod
-    def executar(self, conta):
-        pass
+    def _montar_agregados(self):
+        """Na primeira consulta: diários gravados (se há) + o restante."""
+        if self._dias is not None:
+            return
+        self._dias, self._meses = {}, {}
+        if self._base_agregados is not None:
+            gravados = SnapshotBinario.AGREGADO.iter_unpack(self._base_agregados)
+            for dia, codigo, qtd, creditos, debitos in gravados:
+                data = date.fromordinal(dia)
+                self._acumular(
+                    dia,
+                    data.year * 12 + data.month - 1,
+                    self._traducao[codigo],
+                    qtd,
+                    creditos,
+                    debitos,
+                )
+        elif self._n_base:
+            tipos, centavos, micros, _ = self._base
+            self._varrer(bytes(tipos).translate(self._traducao), centavos, micros)
+        self._varrer(self._tipos, self._centavos, self._micros)
+
+    def _varrer(self, tipos, centavos, micros):
+        """Soma colunas aos agregados, um dia por vez (as datas crescem)."""
+        inicio, fim = 0, len(tipos)
+        while inicio < fim:
+            _, fim_dia, dia, mes = self._dia_local(micros[inicio])
+            ate = bisect.bisect_left(micros, fim_dia, inicio, fim)
+            ate = max(ate, inicio + 1)  # relógio que voltou: anda ao menos um
+            somas = {}
+            for codigo, valor in zip(tipos[inicio:ate], centavos[inicio:ate]):
+                soma = somas.get(codigo)
+                if soma is None:
+                    soma = somas[codigo] = [0, 0, 0]
+                soma[0] += 1
+                if valor >= 0:
+                    soma[1] += valor
+                else:
+                    soma[2] -= valor
+            for codigo, soma in somas.items():
+                self._acumular(dia, mes, codigo, *soma)
+            inicio = ate
+
+    def agregados_diarios(self):
+        """[(dia, código, quantidade, créditos, débitos)] para gravação."""
+        self._montar_agregados()
+        return [
+            (dia, codigo, *soma)
+            for dia, por_tipo in self._dias.items()
+            for codigo, soma in por_tipo.items()
+        ]
+
+    def resumo(self, desde=None, ate=None):
+        """
+        Totais em centavos dos dias `desde` a `ate` (datas locais, inclusive;
+        None = aberto): {"creditos", "debitos", "tarifas", "quantidades"
+        por tipo}. Soma meses inteiros e só os dias das pontas, então o
+        custo não depende do tamanho do histórico.
+        """
+        self._montar_agregados()
+        resumo = {"creditos": 0, "debitos": 0, "tarifas": 0, "quantidades": {}}
+        if not len(self):
+            return resumo
+        primeiro = self.dia_local(self._campos(0)[2])[0]
+        ultimo = self.dia_local(self._campos(len(self) - 1)[2])[0]
+        dia = max(primeiro, desde.toordinal() if desde else primeiro)
+        fim = min(ultimo, ate.toordinal() if ate else ultimo)
+        while dia <= fim:
+            data = date.fromordinal(dia)
+            proximo_mes = date(
+                data.year + data.month // 12, data.month % 12 + 1, 1
+            ).toordinal()
+            if data.day == 1 and proximo_mes - 1 <= fim:
+                por_tipo = self._meses.get(data.year * 12 + data.month - 1)
+                dia = proximo_mes
+            else:
+                por_tipo = self._dias.get(dia)
+                dia += 1
+            for codigo, (qtd, creditos, debitos) in (por_tipo or {}).items():
+                tipo = self._TIPOS[codigo]
+                quantidades = resumo["quantidades"]
+                quantidades[tipo] = quantidades.get(tipo, 0) + qtd
+                resumo["creditos"] += creditos
+                if tipo in self.TIPOS_TARIFA:
+                    resumo["tarifas"] += debitos
+                else:
+                    resumo["debitos"] += debitos
+        resumo["quantidades"] = {
+            tipo: qtd for tipo, qtd in resumo["quantidades"].items() if qtd
+        }
+        return resumo
 
 
 class Conta:
@@ -179,94 +2819,273 @@ class Conta:
 
         # Variáveis Dinâmicas da Conta
         self._ultimo_dia = date.today()
-        self._saldo = Decimal("0.00")
+        self._saldo = 0  # em centavos
         self._transacao_plus = 0
         self._nro_operacoes = 0
         self._nro_saques = 0
-        self._extrato = []
+        self._extrato = Extrato()
+        # (linhas do extrato, contadores, versão) já em disco, em uma tupla:
+        # o group commit confirma a gravação sem pedir a trava da conta
+        self._persistido = (0, None, 0)
+        self._carregada = False  # estado lido do disco só no primeiro acesso
+        # limites e tarifas, resolvidos uma vez (trocados só se o arquivo de
+        # políticas mudar)
+        self._politica = ConfigBanco.politicas().politica(agencia, self._id())
+        # lock por conta: operações em contas diferentes rodam em paralelo
+        self._lock = threading.RLock()
 
     def _id(self):
         return f"{self._cpf}-{self._agencia}-{self._nro_conta}"
 
-    def carregar_bd_conta(self):
-        arq = ConfigBanco.arquivo_transacoes()
-        if not os.path.exists(arq):
-            return
+    def atualizar_politica(self):
+        """Pega a política nova se o arquivo de políticas mudou."""
+        politicas = ConfigBanco.politicas()
+        if politicas.atualizar() != self._politica.geracao:
+            self._politica = politicas.politica(self._agencia, self._id())
+
+    def _contadores(self):
+        return (
+            self._ultimo_dia,
+            self._saldo,
+            self._transacao_plus,
+            self._nro_operacoes,
+            self._nro_saques,
+        )
+
+    @sincronizado
+    def possui_alteracoes(self):
+        """Há linhas novas no extrato ou contadores diferentes do persistido?"""
+        extrato_salvo, contadores_salvos, _ = self._persistido
+        return (
+            len(self._extrato) > extrato_salvo
+            or self._contadores() != contadores_salvos
+        )
+
+    def esta_desatualizada(self):
+        """Ainda não lida, ou outro processo gravou uma versão mais nova."""
+        if not self._carregada:
+            return True
+        armazenamento = ConfigBanco.armazenamento()
+        agendador = armazenamento.agendador()
+        if agendador is not None and agendador.reservada(self._id()):
+            # reservada por este processo: a versão à frente é a nossa gravação
+            return False
         try:
-            with open(arq, "r", encoding="utf-8") as f:
-                dados = json.load(f)
-            conta = dados.get(self._id())
-            if conta:
-                self._ultimo_dia = date.fromisoformat(conta["ultimo_dia"])
-                self._saldo = Decimal(conta["saldo"])
-                self._transacao_plus = conta["transacao_plus"]
-                self._nro_operacoes = conta["numero_operacoes"]
-                self._nro_saques = conta["numero_saques"]
-                self._extrato = [
-                    (tipo, Decimal(valor), datetime.fromisoformat(data))
-                    for tipo, valor, data in conta["extrato"]
-                ]
-        except json.JSONDecodeError:
-            pass
+            versao = armazenamento.versao_conta(self._id())
+        except (OSError, sqlite3.Error):
+            return False
+        return versao != self._persistido[2]
 
-    def salvar_bd_conta(self):
-        arq = ConfigBanco.arquivo_transacoes()
-        backup = None
+    @cronometrado
+    @sincronizado
+    def carregar_bd_conta(self):
         try:
-            if os.path.exists(arq):
-                backup = arq + ".bkp"
-                shutil.copy(arq, backup)
+            conta = ConfigBanco.armazenamento().carregar_conta(self._id())
+        except (OSError, sqlite3.Error):
+            return
+        self._carregada = True
+        self.atualizar_politica()
+        if conta:
+            self._ultimo_dia = date.fromisoformat(conta["ultimo_dia"])
+            self._saldo = centavos_de_texto(conta["saldo"])
+            self._transacao_plus = conta["transacao_plus"]
+            self._nro_operacoes = conta["numero_operacoes"]
+            self._nro_saques = conta["numero_saques"]
+            self._extrato = Extrato.de_linhas(conta["extrato"])
+            self._persistido = (
+                len(self._extrato),
+                self._contadores(),
+                conta.get("versao", 0),
+            )
 
+    @cronometrado
+    def salvar_bd_conta(self, duravel=False):
+        """
+        Grava os contadores e somente as linhas novas do extrato.
+        O custo é proporcional às movimentações desde o último salvamento;
+        sem alterações, nada é gravado.
+        Com o group commit ligado, o registro é montado agora e agendado para
+        a próxima gravação do grupo; `duravel=True` espera ele chegar ao
+        disco (também dentro de `sessao_conta`: a gravação do grupo não pede
+        a trava da conta).
+        """
+        agendador = ConfigBanco.armazenamento().agendador()
+        if agendador is not None:
+            rodada = agendador.agendar(self)
+            return agendador.aguardar(rodada) if duravel else True
+
+        with self._lock:
+            pendente = self._registro_pendente()
+            if not pendente:
+                return True
+            registro, marca = pendente
             try:
-                with open(arq, "r", encoding="utf-8") as f:
-                    conteudo = json.load(f)
-            except (FileNotFoundError, json.JSONDecodeError):
-                conteudo = {}
-
-            conteudo[self._id()] = {
-                "ultimo_dia": self._ultimo_dia.isoformat(),
-                "saldo": str(self._saldo),
-                "transacao_plus": self._transacao_plus,
-                "numero_operacoes": self._nro_operacoes,
-                "numero_saques": self._nro_saques,
-                "extrato": [
-                    (tipo, str(valor), data.isoformat())
-                    for tipo, valor, data in self._extrato
-                ],
-            }
+                ConfigBanco.armazenamento().salvar_conta(registro)
+            except Exception as e:
+                print("❌ Erro ao salvar transações:", e)
+                return False
+            self._confirmar_gravacao(registro, marca)
+            return True
 
-            with open(arq, "w", encoding="utf-8") as f:
-                json.dump(conteudo, f, indent=2, ensure_ascii=False)
+    @sincronizado
+    def _registro_pendente(self):
+        """(registro, marca) do que mudou desde a última gravação, ou None."""
+        if not self.possui_alteracoes():
+            return None
+        inicio, _, versao = self._persistido
+        registro = {
+            "id": self._id(),
+            "ultimo_dia": self._ultimo_dia.isoformat(),
+            "saldo": texto_de_centavos(self._saldo),
+            "transacao_plus": self._transacao_plus,
+            "numero_operacoes": self._nro_operacoes,
+            "numero_saques": self._nro_saques,
+            "versao": versao + 1,
+            "inicio": inicio,
+            "extrato": self._extrato.linhas(inicio),
+        }
+        return registro, (len(self._extrato), self._contadores())
 
-            if backup:
-                os.remove(backup)
-            return True
-        except Exception as e:
-            print("❌ Erro ao salvar transações:", e)
-            if backup and os.path.exists(backup):
-                shutil.move(backup, arq)
-            return False
+    def _confirmar_gravacao(self, registro, marca):
+        """
+        O registro de `_registro_pendente` chegou ao disco. Sem a trava da
+        conta: o agendador confirma enquanto outra thread pode estar com a
+        conta em uma sessão, e a troca da tupla é atômica.
+        """
+        self._persistido = (*marca, registro["versao"])
 
     def saldo_atual(self):
-        return self._saldo
+        return de_centavos(self._saldo)
 
     def pode_operar(self):
-        limite_total = ConfigBanco.operacoes_diarias() + self._transacao_plus
+        limite_total = self._politica.operacoes_diarias + self._transacao_plus
         return self._nro_operacoes < limite_total
 
-    def registrar_transacao(self, transacao: Transacao):
+    def registrar_transacao(
+        self,
+        transacao: Transacao,
+        aceitar_saque_plus=False,
+        aceitar_transacao_plus=False,
+    ):
+        """Igual a `operar`, mas retorna só a mensagem (uso da CLI)."""
+        _, msg = self.operar(transacao, aceitar_saque_plus, aceitar_transacao_plus)
+        return msg
+
+    @sincronizado
+    def operar(
+        self,
+        transacao: Transacao,
+        aceitar_saque_plus=False,
+        aceitar_transacao_plus=False,
+    ):
+        """
+        Executa uma transação sem interação e retorna (ok, mensagem).
+        As ofertas Plus são decididas pelas políticas: um bool ou uma função
+        chamada só quando a oferta é necessária (a CLI passa as perguntas).
+        Com as métricas ligadas, a duração entra em `banco_transacao_segundos`
+        pela classe da transação pedida (um Saque que vira Saque Plus conta
+        como Saque).
+        """
+        metricas = ConfigBanco.metricas()
+        if not metricas.ativa:
+            return self._operar(transacao, aceitar_saque_plus, aceitar_transacao_plus)
+        inicio = time.perf_counter()
+        ok, msg = self._operar(transacao, aceitar_saque_plus, aceitar_transacao_plus)
+        metricas.observar(
+            "banco_transacao_segundos",
+            time.perf_counter() - inicio,
+            transacao=type(transacao).__name__,
+            resultado="ok" if ok else "recusada",
+        )
+        return ok, msg
+
+    def _operar(self, transacao, aceitar_saque_plus, aceitar_transacao_plus):
         # verifica limite de operações
         if not self.pode_operar():
-            return ofertar_transacao_plus(self)
+            if not decidir(aceitar_transacao_plus, self):
+                return (
+                    False,
+                    "❌ Operação cancelada! Limite diário de operações atingido.",
+                )
+            # a Transação Plus só fica se a operação for realizada: recusada,
+            # a taxa é devolvida (nada é cobrado sem aparecer na resposta)
+            estado_anterior = self._contadores(), len(self._extrato)
+            ok, msg_plus = TransacaoPlus().executar(self)
+            if not ok:
+                return False, msg_plus
+            ok, msg = self._operar_transacao(transacao, aceitar_saque_plus)
+            if not ok:
+                self._restaurar(*estado_anterior)
+                return False, msg
+            return True, f"{msg_plus}\n{msg}"
+        return self._operar_transacao(transacao, aceitar_saque_plus)
+
+    def _operar_transacao(self, transacao, aceitar_saque_plus):
+        # limite de saques → Saque Plus
+        saques_esgotados = self._nro_saques >= self._politica.saques_diarios
+        if type(transacao) is Saque and saques_esgotados:
+            ok, msg = transacao.validar_limites(self)
+            if not ok:
+                return False, msg
+            if not decidir(aceitar_saque_plus, self, transacao.valor):
+                return (
+                    False,
+                    "❌ Operação cancelada! Limite diário de saques atingido.",
+                )
+            transacao = SaquePlus(transacao.valor)
 
         ok, msg = transacao.executar(self)
         # só incrementa contador se a operação realmente ocorreu
-
         if ok:
             self._nro_operacoes += 1
+        return ok, msg
 
-        return msg
-
+    @sincronizado
+    def registrar_lote(
+        self, transacoes, aceitar_saque_plus=False, aceitar_transacao_plus=False
+    ):
+        """
+        Aplica um lote de transações de forma atômica e persiste uma única vez.
+        - Todos os valores são validados antes de qualquer movimentação.
+        - Cada item conta como operação: `pode_operar`, limite de saques e
+          taxas Plus são aplicados na ordem do lote, via `operar`; as ofertas
+          Plus são aceitas conforme as políticas.
+        - Se qualquer item (ou a gravação) falhar, nada é aplicado.
+        """
+        transacoes = list(transacoes)
+        for i, transacao in enumerate(transacoes, start=1):
+            erro = getattr(transacao, "_erro", None)
+            if erro:
+                erro = erro.removeprefix("❌ ")
+                return False, f"❌ Item {i} do lote inválido: {erro}"
+
+        estado_anterior = self._contadores(), len(self._extrato)
+        for i, transacao in enumerate(transacoes, start=1):
+            ok, msg = self.operar(
+                transacao, aceitar_saque_plus, aceitar_transacao_plus
+            )
+            if not ok:
+                self._restaurar(*estado_anterior)
+                msg = msg.removeprefix("❌ ")
+                return False, f"❌ Item {i} do lote recusado: {msg}"
+
+        if not self.salvar_bd_conta():
+            self._restaurar(*estado_anterior)
+            return False, "❌ Erro ao salvar o lote. Nenhuma transação foi aplicada."
+
+        return True, f"✔️ Lote de {len(transacoes)} transações registrado."
+
+    def _restaurar(self, contadores, tamanho_extrato):
+        (
+            self._ultimo_dia,
+            self._saldo,
+            self._transacao_plus,
+            self._nro_operacoes,
+            self._nro_saques,
+        ) = contadores
+        self._extrato.truncar(tamanho_extrato)
+
+    @sincronizado
     def resetar_contadores(self):
         hoje = date.today()
         if hoje != self._ultimo_dia:
@@ -276,42 +3095,112 @@ class Conta:
             self._nro_saques = 0
             return True, (
                 f"✔️ Contadores diários resetados. "
-                f"Você possui {ConfigBanco.operacoes_diarias()} operações e "
-                f"{ConfigBanco.saques_diarios()} saques hoje."
+                f"Você possui {self._politica.operacoes_diarias} operações e "
+                f"{self._politica.saques_diarios} saques hoje."
             )
         return False, "❌ Ainda no mesmo dia, nada a resetar."
 
-    def exibir_extrato(self):
+    def linhas_extrato(self, **filtros):
+        """
+        Linhas formatadas do extrato, geradas uma a uma (memória constante e
+        a primeira linha sai sem percorrer o histórico). `filtros` são os de
+        `Extrato.consultar`: desde, ate, tipos, cursor, limite, decrescente.
+        O extrato é recortado sob o lock da conta (a parte mapeada sem cópia)
+        e o lock é solto antes da primeira linha: quem consome devagar não
+        trava as operações da conta nem vê um rollback no meio.
+        """
+        with self._lock:
+            extrato = self._extrato.recorte()
+        for _, tipo, centavos, micros in extrato.consultar(**filtros):
+            valor = de_centavos(centavos)
+            data = Extrato._EPOCA + timedelta(microseconds=micros)
+            data_formatada = data.astimezone().strftime("%d/%m/%Y %H:%M:%S")
+            sinal = "+" if valor > 0 else "-"
+            valor_fmt = f"{sinal}{formatar_brl(abs(valor))}"
+            # coluna tipo = 18 caracteres, valor = 15 caracteres
+            yield f"{tipo:<18}| {valor_fmt:<15}|  {data_formatada}"
+
+    def exibir_extrato(self, **filtros):
         if not self._extrato:
             print("❌ Não foram realizadas movimentações.")
         else:
             print("\n=== EXTRATO ===")
-            for tipo, valor, data in self._extrato:
-                data_local = data.astimezone()
-                data_formatada = data_local.strftime("%d/%m/%Y %H:%M:%S")
-                sinal = "+" if valor > 0 else "-"
-                # print(f"{tipo}: {sinal}{formatar_brl(abs(valor))} | {data_formatada}")
-                valor_fmt = f"{sinal}{formatar_brl(abs(valor))}"
-                # coluna tipo = 18 caracteres, valor = 15 caracteres
-                print(f"{tipo:<18}| {valor_fmt:<15}|  {data_formatada}")
-
-            print(f"\nSaldo atual: {formatar_brl(self._saldo)}")
+            vazio = True
+            for linha in self.linhas_extrato(**filtros):
+                print(linha)
+                vazio = False
+            if vazio:
+                print("❌ Nenhuma movimentação no filtro informado.")
+
+            print(f"\nSaldo atual: {formatar_brl(self.saldo_atual())}")
             print(
-                f"\nOperações hoje: {self._nro_operacoes}/{ConfigBanco.operacoes_diarias() + self._transacao_plus}"
+                f"\nOperações hoje: {self._nro_operacoes}/{self._politica.operacoes_diarias + self._transacao_plus}"
             )
-            print(f"Saques hoje: {self._nro_saques}/{ConfigBanco.saques_diarios()}")
+            print(f"Saques hoje: {self._nro_saques}/{self._politica.saques_diarios}")
             print("=== FIM DO EXTRATO ===")
 
+    @sincronizado
+    def saldo_em(self, momento):
+        """
+        Saldo logo antes de `momento` (datetime; sem fuso = horário local),
+        por busca binária nas datas + coluna de acumulados. Ancorado no saldo
+        atual: dados antigos com saldo inicial fora do extrato ficam certos.
+        """
+        extrato = self._extrato
+        saldo_inicial = self._saldo - extrato.total()
+        posicao = extrato.posicao_data(momento)
+        return de_centavos(
+            saldo_inicial + (extrato.acumulado(posicao - 1) if posicao else 0)
+        )
+
+    @sincronizado
+    def resumo_periodo(self, desde=None, ate=None):
+        """
+        Créditos, débitos, tarifas e quantidade por tipo dos dias `desde` a
+        `ate` (date, inclusive; None = aberto), pelos agregados do extrato.
+        """
+        resumo = self._extrato.resumo(desde, ate)
+        meia_noite = datetime.min.time()
+        return {
+            "saldo_inicial": (
+                self.saldo_em(datetime.combine(desde, meia_noite))
+                if desde
+                else de_centavos(self._saldo - self._extrato.total())
+            ),
+            "creditos": de_centavos(resumo["creditos"]),
+            "debitos": de_centavos(resumo["debitos"]),
+            "tarifas": de_centavos(resumo["tarifas"]),
+            "saldo_final": (
+                self.saldo_em(datetime.combine(ate + timedelta(days=1), meia_noite))
+                if ate
+                else self.saldo_atual()
+            ),
+            "quantidades": resumo["quantidades"],
+        }
+
+    def exibir_resumo(self, desde=None, ate=None):
+        resumo = self.resumo_periodo(desde, ate)
+        inicio = desde.strftime("%d/%m/%Y") if desde else "início"
+        fim = ate.strftime("%d/%m/%Y") if ate else "hoje"
+        print(f"\n=== RESUMO {inicio} a {fim} ===")
+        print(f"Saldo inicial: {formatar_brl(resumo['saldo_inicial'])}")
+        print(f"Créditos:      {formatar_brl(resumo['creditos'])}")
+        print(f"Débitos:       {formatar_brl(resumo['debitos'])}")
+        print(f"Tarifas:       {formatar_brl(resumo['tarifas'])}")
+        print(f"Saldo final:   {formatar_brl(resumo['saldo_final'])}")
+        for tipo, qtd in sorted(resumo["quantidades"].items()):
+            print(f"{tipo:<18}| {qtd}")
+        print("=== FIM DO RESUMO ===")
+
+    @sincronizado
     def imprimir_extrato(self):
         if not self._extrato:
             print("❌ Não foram realizadas movimentações.")
         else:
-            taxa_imp = ConfigBanco.valor_imprimir_extrato()
+            taxa_imp = self._politica.valor_imprimir_extrato_centavos
             self._nro_operacoes += 1
             self._saldo -= taxa_imp
-            self._extrato.append(
-                ("Imprimir Extrato", -taxa_imp, datetime.now(timezone.utc))
-            )
+            self._extrato.registrar("Imprimir Extrato", -taxa_imp, Extrato.agora())
             self.exibir_extrato()
 
     def __str__(self):
@@ -343,6 +3232,17 @@ class ValidadorValor:
                     "Entrada inválida! Digite apenas números positivos, com até duas casas decimais."
                 )
 
+    @staticmethod
+    def centavos(valor):
+        """
+        Valida e converte para centavos na fronteira de entrada.
+        Retorna (centavos, "") ou (None, mensagem de erro).
+        """
+        ok, msg = ValidadorValor.validar(valor)
+        if not ok:
+            return None, msg
+        return para_centavos(valor), ""
+
     @staticmethod
     def validar(valor):
         """Valida regra de negócio em qualquer Decimal"""
@@ -358,85 +3258,107 @@ class ValidadorValor:
 class SaquePlus(Transacao):
     def __init__(self, valor):
         self.valor = valor
+        self._centavos, self._erro = ValidadorValor.centavos(valor)
 
     def executar(self, conta):
+        if self._erro:
+            return False, self._erro
+
+        # o limite de valor por saque também vale para o Saque Plus
+        politica = conta._politica
+        if self._centavos > politica.limite_saque_centavos:
+            return (
+                False,
+                f"❌ Saque acima do limite de {formatar_brl(politica.limite_saque)}",
+            )
+
         # valida saldo suficiente para o valor + taxa extra
-        taxa = ConfigBanco.valor_sacar_plus()
-        valor_total = self.valor + taxa
+        taxa = politica.valor_sacar_plus_centavos
+        valor_total = self._centavos + taxa
 
         if valor_total > conta._saldo:
             return False, "❌ Saldo insuficiente para Saque Plus."
 
+        agora = Extrato.agora()
         conta._saldo -= valor_total
         conta._nro_saques += 1
-        conta._extrato.append(("Saque Plus", -self.valor, datetime.now(timezone.utc)))
-        conta._extrato.append(("Taxa Saque Plus", -taxa, datetime.now(timezone.utc)))
+        conta._extrato.registrar("Saque Plus", -self._centavos, agora)
+        conta._extrato.registrar("Taxa Saque Plus", -taxa, agora)
 
         return (
             True,
-            f"✔️ Saque Plus de {formatar_brl(self.valor)} realizado com taxa de {formatar_brl(taxa)}.",
+            f"✔️ Saque Plus de {formatar_brl(self.valor)} realizado com taxa de {formatar_brl(de_centavos(taxa))}.",
         )
 
 
 class TransacaoPlus(Transacao):
     def executar(self, conta):
-        taxa = ConfigBanco.valor_transacao_plus()
+        taxa = conta._politica.valor_transacao_plus_centavos
 
         if taxa > conta._saldo:
             return False, "❌ Saldo insuficiente para ativar Transação Plus."
 
         conta._saldo -= taxa
         conta._transacao_plus += 1
-        conta._extrato.append(("Transação Plus", -taxa, datetime.now(timezone.utc)))
+        conta._extrato.registrar("Transação Plus", -taxa, Extrato.agora())
 
         return (
             True,
-            f"✔️ Transação Plus ativada por {formatar_brl(taxa)}.\n Você ativou +1 operação extra para hoje.",
+            f"✔️ Transação Plus ativada por {formatar_brl(de_centavos(taxa))}.\n Você ativou +1 operação extra para hoje.",
         )
 
 
 class Deposito(Transacao):
     def __init__(self, valor):
         self.valor = valor  # público, informação do usuário
+        # validado e convertido uma única vez, na entrada
+        self._centavos, self._erro = ValidadorValor.centavos(valor)
 
     def executar(self, conta):
-        ok, msg = ValidadorValor.validar(self.valor)
-        if not ok:
-            return False, msg
+        if self._erro:
+            return False, self._erro
 
-        conta._saldo += self.valor
-        conta._extrato.append(("Depósito", self.valor, datetime.now(timezone.utc)))
+        conta._saldo += self._centavos
+        conta._extrato.registrar("Depósito", self._centavos, Extrato.agora())
         return True, f"✔️ Depósito de {formatar_brl(self.valor)} realizado."
 
 
 class Saque(Transacao):
     def __init__(self, valor):
         self.valor = valor
+        self._centavos, self._erro = ValidadorValor.centavos(valor)
 
-    def executar(self, conta):
-        ok, msg = ValidadorValor.validar(self.valor)
-        if not ok:
-            return False, msg
+    def validar_limites(self, conta):
+        if self._erro:
+            return False, self._erro
 
         # 1. Limite de valor por saque (segurança)
-        if self.valor > ConfigBanco.limite_saque():
+        politica = conta._politica
+        if self._centavos > politica.limite_saque_centavos:
             return (
                 False,
-                f"❌ Saque acima do limite de {formatar_brl(ConfigBanco.limite_saque())}",
+                f"❌ Saque acima do limite de {formatar_brl(politica.limite_saque)}",
             )
 
         # 2. Saldo insuficiente
-        if self.valor > conta._saldo:
+        if self._centavos > conta._saldo:
             return False, "❌ Saldo insuficiente."
 
-        # 3. Limite de número de saques → oferta Saque Plus
-        if conta._nro_saques >= ConfigBanco.saques_diarios():
-            return ofertar_saque_plus(conta, self.valor)
+        return True, ""
+
+    def executar(self, conta):
+        ok, msg = self.validar_limites(conta)
+        if not ok:
+            return False, msg
+
+        # 3. Limite de número de saques (Saque Plus é decidido em Conta.operar)
+        if conta._nro_saques >= conta._politica.saques_diarios:
+            return False, "❌ Limite diário de saques atingido."
 
         # 4. Saque normal
-        conta._saldo -= self.valor
+        conta._saldo -= self._centavos
         conta._nro_saques += 1
-        conta._extrato.append(("Saque", -self.valor, datetime.now(timezone.utc)))
+        conta._extrato.registrar("Saque", -self._centavos, Extrato.agora())
         return True, f"✔️ Saque de {formatar_brl(self.valor)} realizado."
 
 
@@ -460,85 +3382,125 @@ class Usuario:
 class DadosBanco:
     def __init__(self):
         self.usuarios = []
-        dados = self.carregar_bd_usuario()
-
-        for cpf, dados_user in dados.items():
-            usuario = Usuario(
-                cpf,
-                dados_user["nome"],
-                dados_user["data_nascimento"],
-                dados_user["endereco"],
-            )
-            for conta in dados_user["contas"]:
-                c = Conta(conta["agencia"], conta["numero_conta"], cpf)
-                c.carregar_bd_conta()
-                usuario.adicionar_conta(c)
+        # índices: CPF → Usuario e (agencia, numero_conta) → Conta
+        self._usuarios_por_cpf = {}
+        self._contas_por_numero = {}
+        self._proximo_numero = 1
+        self._lock = threading.RLock()  # cadastro de usuários e contas
+        self._versao_usuarios = None  # versão do cadastro já incorporada
+        self.atualizar_usuarios()
+
+    def atualizar_usuarios(self):
+        """
+        Incorpora usuários e contas cadastrados (inclusive por outros
+        processos). Só relê quando a versão do cadastro mudou.
+        """
+        armazenamento = ConfigBanco.armazenamento()
+        with self._lock:
+            versao = armazenamento.versao_usuarios()
+            if versao == self._versao_usuarios:
+                return
+            for cpf, dados_user in self.carregar_bd_usuario().items():
+                usuario = self._usuarios_por_cpf.get(cpf)
+                if usuario is None:
+                    usuario = Usuario(
+                        cpf,
+                        dados_user["nome"],
+                        dados_user["data_nascimento"],
+                        dados_user["endereco"],
+                    )
+                    self._indexar_usuario(usuario)
+                for conta in dados_user["contas"]:
+                    chave = (conta["agencia"], conta["numero_conta"])
+                    if chave not in self._contas_por_numero:
+                        # saldo e extrato são carregados no primeiro acesso
+                        c = Conta(conta["agencia"], conta["numero_conta"], cpf)
+                        usuario.adicionar_conta(c)
+                        self._indexar_conta(c)
+            self._versao_usuarios = versao
+
+    @contextmanager
+    def sessao_conta(self, conta):
+        """
+        Uso exclusivo da conta entre threads e processos, do carregamento ao
+        salvamento (menu da conta ou uma operação do serviço). Se outro
+        processo gravou a conta, ela é recarregada na entrada.
+        """
+        with conta._lock, ConfigBanco.armazenamento().travar_conta(conta._id()):
+            if conta.esta_desatualizada():
+                conta.carregar_bd_conta()
+            conta.atualizar_politica()
+            yield conta
+
+    def _indexar_usuario(self, usuario):
+        self.usuarios.append(usuario)
+        self._usuarios_por_cpf[usuario.cpf] = usuario
+        for conta in usuario.contas:
+            self._indexar_conta(conta)
 
-            self.usuarios.append(usuario)
+    def _indexar_conta(self, conta):
+        self._contas_por_numero[(conta._agencia, conta._nro_conta)] = conta
+        # número sequencial global, sempre acima do maior já existente
+        self._proximo_numero = max(self._proximo_numero, conta._nro_conta + 1)
 
     # métodos públicos de usuários
+    @cronometrado
     def carregar_bd_usuario(self):
-        arq = ConfigBanco.arquivo_contas()
-        if not os.path.exists(arq):
-            return {}
-        try:
-            with open(arq, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except json.JSONDecodeError:
-            return {}
+        return ConfigBanco.armazenamento().carregar_usuarios()
 
+    @cronometrado
     def salvar_bd_usuario(self, dados):
-        arq = ConfigBanco.arquivo_contas()
-        backup = None
-        try:
-            if os.path.exists(arq):
-                backup = arq + ".bkp"
-                shutil.copy(arq, backup)
+        ConfigBanco.armazenamento().salvar_usuarios(dados)
 
-            with open(arq, "w", encoding="utf-8") as f:
-                json.dump(dados, f, indent=2, ensure_ascii=False)
-
-            if backup:
-                os.remove(backup)
-        except Exception as e:
-            print("❌ Erro ao salvar contas:", e)
-            if backup and os.path.exists(backup):
-                shutil.move(backup, arq)
+    @staticmethod
+    def _dados_usuario(usuario):
+        return {
+            "cpf": usuario.cpf,
+            "nome": usuario.nome,
+            "data_nascimento": usuario.data_nascimento,
+            "endereco": usuario.endereco,
+            "contas": [
+                {"agencia": c._agencia, "numero_conta": c._nro_conta}
+                for c in usuario.contas
+            ],
+        }
 
     # métodos da contas
     def buscar_usuario(self, cpf):
-        return next((user for user in self.usuarios if user.cpf == cpf), None)
+        usuario = self._usuarios_por_cpf.get(cpf)
+        if usuario is None:
+            # pode ter sido cadastrado por outro processo
+            self.atualizar_usuarios()
+            usuario = self._usuarios_por_cpf.get(cpf)
+        return usuario
 
     def criar_usuario(
         self, cpf_digitado, nome=None, data_nascimento=None, endereco=None
     ):
-        cpf = checar_limpar_cpf(cpf_digitado)
-
-        # já existe?
-        if self.buscar_usuario(cpf):
-            return False, f"❌ Já existe usuário com esse CPF {formatar_cpf(cpf)}."
+        cpf = validar_cpf(cpf_digitado)
+        if not cpf:
+            return False, MSG_CPF_INVALIDO
 
-        # se não veio nome ainda, estamos no fluxo interativo → pedir dados
+        # os dados são pedidos pela CLI (menu inicial), nunca aqui
         if not nome:
-            print("\n=== Cadastro de Novo Usuário ===")
-            nome = input("Nome completo: ").strip()
-            data_nascimento = input("Data nascimento (DD/MM/AAAA): ").strip()
-            endereco = input("Endereço (logradouro, nº - bairro - cidade/UF): ").strip()
+            return False, "❌ Nome do usuário é obrigatório."
 
-        # cria usuário
-        usuario = Usuario(cpf, nome, data_nascimento, endereco)
-        self.usuarios.append(usuario)
+        armazenamento = ConfigBanco.armazenamento()
+        with self._lock, armazenamento.travar_usuarios():
+            # já existe? (inclusive cadastrado por outro processo)
+            if self.buscar_usuario(cpf):
+                return (
+                    False,
+                    f"❌ Já existe usuário com esse CPF {formatar_cpf(cpf)}.",
+                )
 
-        # salva no JSON
-        dados_json = self.carregar_bd_usuario()
-        dados_json[cpf] = {
-            "cpf": cpf,
-            "nome": nome,
-            "data_nascimento": data_nascimento,
-            "endereco": endereco,
-            "contas": [],
-        }
-        self.salvar_bd_usuario(dados_json)
+            # cria usuário
+            usuario = Usuario(cpf, nome, data_nascimento, endereco)
+            self._indexar_usuario(usuario)
+
+            # persiste apenas o usuário novo
+            self.salvar_bd_usuario({cpf: self._dados_usuario(usuario)})
+            self._versao_usuarios = armazenamento.versao_usuarios()
 
         return (
             True,
@@ -546,82 +3508,364 @@ class DadosBanco:
         )
 
     def criar_conta(self, cpf_digitado):
-        cpf = checar_limpar_cpf(cpf_digitado)
+        ok, conta = self.nova_conta(cpf_digitado)
+        if not ok:
+            return False, conta
+        return True, f"✔️ Nova conta criada: {conta}"
+
+    def nova_conta(self, cpf_digitado):
+        """Cria a conta e retorna (True, Conta) — a criada por esta chamada,
+        mesmo com outras criações simultâneas para o CPF — ou (False, msg)."""
+        cpf = validar_cpf(cpf_digitado)
+        if not cpf:
+            return False, MSG_CPF_INVALIDO
         usuario = self.buscar_usuario(cpf)
         if not usuario:
             return False, "❌ Usuário não encontrado."
 
-        # listar contas existentes do usuário
-        if usuario.contas:
-            print(
-                f"\nContas já existentes para {usuario.nome} (CPF {formatar_cpf(cpf)}):"
+        armazenamento = ConfigBanco.armazenamento()
+        with self._lock, armazenamento.travar_usuarios():
+            # 🔑 número sequencial global mantido pelo índice, já com as
+            # contas criadas por outros processos
+            self.atualizar_usuarios()
+            conta = Conta(
+                ConfigBanco.agencia_padrao(), self._proximo_numero, usuario.cpf
             )
-            print(usuario.listar_contas())
-        else:
-            print(f"\nUsuário {usuario.nome} ainda não possui contas.")
-
-        # confirmação
-        opcao = input("Deseja criar uma nova conta? [s/n]: ").lower().strip()
-        if opcao != "s":
-            limpar_tela()
-            return False, "❌ Operação cancelada pelo usuário."
-
-        # 🔑 gerar número sequencial global
-        todos_numeros = [c._nro_conta for u in self.usuarios for c in u.contas]
-        novo_numero = max(todos_numeros, default=0) + 1
+            usuario.adicionar_conta(conta)
+            self._indexar_conta(conta)
 
-        # cria a nova conta
-        conta = Conta(ConfigBanco.agencia_padrao(), novo_numero, usuario.cpf)
-        usuario.adicionar_conta(conta)
-
-        # atualizar JSON
-        dados_json = self.carregar_bd_usuario()
-        if cpf in dados_json:
-            dados_json[cpf]["contas"].append(
-                {"agencia": conta._agencia, "numero_conta": conta._nro_conta}
-            )
-            self.salvar_bd_usuario(dados_json)
+            # persiste o usuário com a lista de contas atualizada
+            self.salvar_bd_usuario({cpf: self._dados_usuario(usuario)})
+            self._versao_usuarios = armazenamento.versao_usuarios()
 
-        return True, f"✔️ Nova conta criada: {conta}"
+        return True, conta
 
     def listar_contas(self, cpf_digitado):
-        cpf = checar_limpar_cpf(cpf_digitado)
+        cpf = validar_cpf(cpf_digitado)
+        if not cpf:
+            return False, MSG_CPF_INVALIDO
+        self.atualizar_usuarios()
         usuario = self.buscar_usuario(cpf)
         if not usuario:
             return False, f"❌ Nenhum usuário encontrado com CPF {formatar_cpf(cpf)}."
         return True, usuario.listar_contas()
 
     def acessar_conta(self, cpf_digitado, agencia, nro_conta):
-        cpf = checar_limpar_cpf(cpf_digitado)
+        cpf = validar_cpf(cpf_digitado)
+        if not cpf:
+            return False, MSG_CPF_INVALIDO
         usuario = self.buscar_usuario(cpf)
         if not usuario:
             return False, f"❌ Usuário não encontrado com CPF {formatar_cpf(cpf)}."
 
-        for conta in usuario.contas:
-            if conta._agencia == agencia and conta._nro_conta == int(nro_conta):
-                return True, conta
+        try:
+            nro_conta = int(nro_conta)
+        except (TypeError, ValueError):
+            nro_conta = None
+        conta = self._contas_por_numero.get((agencia, nro_conta))
+        if conta is None:
+            # pode ter sido criada por outro processo
+            self.atualizar_usuarios()
+            conta = self._contas_por_numero.get((agencia, nro_conta))
+        if conta and conta._cpf == cpf:
+            with conta._lock:
+                if conta.esta_desatualizada():
+                    conta.carregar_bd_conta()
+                conta.atualizar_politica()
+            return True, conta
 
         return False, f"❌ Agência ou conta inválida para o CPF {formatar_cpf(cpf)}."
 
     def salvar_dados_conta(self):
-        dados_json = {}
-        for usuario in self.usuarios:
-            dados_json[usuario.cpf] = {
-                "cpf": usuario.cpf,
-                "nome": usuario.nome,
-                "data_nascimento": usuario.data_nascimento,
-                "endereco": usuario.endereco,
-                "contas": [
-                    {"agencia": c._agencia, "numero_conta": c._nro_conta}
-                    for c in usuario.contas
-                ],
+        armazenamento = ConfigBanco.armazenamento()
+        with self._lock, armazenamento.travar_usuarios():
+            # junta antes o que outros processos cadastraram, para não sobrescrever
+            self.atualizar_usuarios()
+            self.salvar_bd_usuario(
+                {usuario.cpf: self._dados_usuario(usuario) for usuario in self.usuarios}
+            )
+            self._versao_usuarios = armazenamento.versao_usuarios()
+
+
+# ========= Serviço sem interação =========
+class ServicoBanco:
+    """
+    Camada de serviço não interativa sobre DadosBanco/Conta/Transacao, para
+    drivers automáticos (servidores, geradores de carga). Nunca chama input():
+    as ofertas Plus chegam como parâmetros e tudo retorna (ok, resultado).
+    Cada operação roda em uma sessão da conta (travas entre threads e
+    processos) e o que ela alterou é persistido antes de liberar a conta.
+    """
+
+    def __init__(self, banco=None):
+        self.banco = banco if banco is not None else DadosBanco()
+
+    @staticmethod
+    def _ler_valor(valor):
+        texto = str(valor).strip().replace(",", ".")
+        if any(c.isalpha() for c in texto):
+            return None
+        try:
+            return Decimal(texto)
+        except InvalidOperation:
+            return None
+
+    @staticmethod
+    def _virar_dia(conta):
+        # virada de dia, como no menu da conta
+        mudou, _ = conta.resetar_contadores()
+        if mudou:
+            conta.salvar_bd_conta()
+
+    def criar_usuario(self, cpf, nome, data_nascimento="", endereco=""):
+        return self.banco.criar_usuario(cpf, nome, data_nascimento, endereco)
+
+    def criar_conta(self, cpf):
+        ok, conta = self.banco.nova_conta(cpf)
+        if not ok:
+            return False, conta
+        return True, {"agencia": conta._agencia, "numero_conta": conta._nro_conta}
+
+    def listar_contas(self, cpf):
+        self.banco.atualizar_usuarios()
+        usuario = self.banco.buscar_usuario(validar_cpf(cpf))
+        if not usuario:
+            return self.banco.listar_contas(cpf)
+        return True, [
+            {"agencia": c._agencia, "numero_conta": c._nro_conta}
+            for c in usuario.contas
+        ]
+
+    def _operar(self, cpf, agencia, nro_conta, transacao, **politicas):
+        ok, conta = self.banco.acessar_conta(cpf, agencia, nro_conta)
+        if not ok:
+            return False, conta
+        with self.banco.sessao_conta(conta):
+            self._virar_dia(conta)
+            estado_anterior = conta._contadores(), len(conta._extrato)
+            ok, msg = conta.operar(transacao, **politicas)
+            # operação recusada não deixa alterações (nem a taxa Plus)
+            if conta.possui_alteracoes() and not conta.salvar_bd_conta():
+                # como no lote: nada fica em memória sem chegar ao disco
+                conta._restaurar(*estado_anterior)
+                return False, "❌ Erro ao salvar a operação. Nada foi aplicado."
+        return ok, msg
+
+    def depositar(
+        self, cpf, agencia, nro_conta, valor, aceitar_transacao_plus=False
+    ):
+        valor = self._ler_valor(valor)
+        if valor is None:
+            return False, "❌ Valor inválido."
+        return self._operar(
+            cpf,
+            agencia,
+            nro_conta,
+            Deposito(valor),
+            aceitar_transacao_plus=aceitar_transacao_plus,
+        )
+
+    def sacar(
+        self,
+        cpf,
+        agencia,
+        nro_conta,
+        valor,
+        aceitar_saque_plus=False,
+        aceitar_transacao_plus=False,
+    ):
+        valor = self._ler_valor(valor)
+        if valor is None:
+            return False, "❌ Valor inválido."
+        return self._operar(
+            cpf,
+            agencia,
+            nro_conta,
+            Saque(valor),
+            aceitar_saque_plus=aceitar_saque_plus,
+            aceitar_transacao_plus=aceitar_transacao_plus,
+        )
+
+    def extrato(
+        self,
+        cpf,
+        agencia,
+        nro_conta,
+        desde=None,
+        ate=None,
+        tipos=None,
+        cursor=None,
+        limite=None,
+        decrescente=False,
+    ):
+        """
+        Extrato paginado e filtrado: datas ISO (`desde` <= data < `ate`; só a
+        data = meia-noite local), `tipos` em lista ou separados por vírgula.
+        Com `limite`, a resposta traz no máximo `limite` movimentos e o
+        `proximo_cursor` para a página seguinte (None quando acabou).
+        """
+        ok, filtros = self._ler_filtros(desde, ate, tipos, cursor, limite)
+        if not ok:
+            return False, filtros
+        ok, conta = self.banco.acessar_conta(cpf, agencia, nro_conta)
+        if not ok:
+            return False, conta
+        with self.banco.sessao_conta(conta):
+            self._virar_dia(conta)
+            return True, self._dados_extrato(
+                conta, decrescente=bool(decrescente), **filtros
+            )
+
+    def saldo_em(self, cpf, agencia, nro_conta, momento):
+        """Saldo logo antes de `momento` (ISO; só a data = meia-noite local)."""
+        try:
+            momento = datetime.fromisoformat(momento)
+        except (TypeError, ValueError):
+            return False, "❌ Data inválida (use AAAA-MM-DD ou ISO 8601)."
+        ok, conta = self.banco.acessar_conta(cpf, agencia, nro_conta)
+        if not ok:
+            return False, conta
+        with self.banco.sessao_conta(conta):
+            return True, {
+                "momento": momento.isoformat(),
+                "saldo": str(conta.saldo_em(momento)),
             }
-        self.salvar_bd_usuario(dados_json)
+
+    def resumo(self, cpf, agencia, nro_conta, desde=None, ate=None):
+        """Resumo dos dias `desde` a `ate` (AAAA-MM-DD, inclusive; vazio = aberto)."""
+        periodo = {}
+        try:
+            for nome, valor in (("desde", desde), ("ate", ate)):
+                periodo[nome] = date.fromisoformat(valor) if valor else None
+        except (TypeError, ValueError):
+            return False, "❌ Data inválida (use AAAA-MM-DD)."
+        ok, conta = self.banco.acessar_conta(cpf, agencia, nro_conta)
+        if not ok:
+            return False, conta
+        with self.banco.sessao_conta(conta):
+            self._virar_dia(conta)
+            resumo = conta.resumo_periodo(**periodo)
+        return True, {
+            chave: valor if chave == "quantidades" else str(valor)
+            for chave, valor in resumo.items()
+        }
+
+    def metricas(self, formato="json"):
+        """Métricas do processo: dict (`"json"`) ou texto (`"prometheus"`)."""
+        metricas = ConfigBanco.metricas()
+        if formato == "prometheus":
+            return True, metricas.prometheus()
+        if formato == "json":
+            return True, metricas.instantaneo()
+        return False, "❌ Formato inválido (use json ou prometheus)."
+
+    @staticmethod
+    def _ler_filtros(desde, ate, tipos, cursor, limite):
+        filtros = {}
+        try:
+            for nome, valor in (("desde", desde), ("ate", ate)):
+                filtros[nome] = datetime.fromisoformat(valor) if valor else None
+        except (TypeError, ValueError):
+            return False, "❌ Data inválida (use AAAA-MM-DD ou ISO 8601)."
+        try:
+            for nome, valor in (("cursor", cursor), ("limite", limite)):
+                filtros[nome] = None if valor in (None, "") else int(valor)
+        except (TypeError, ValueError):
+            return False, "❌ Cursor e limite devem ser números inteiros."
+        if filtros["limite"] is not None and filtros["limite"] <= 0:
+            return False, "❌ O limite deve ser positivo."
+        if isinstance(tipos, str):
+            tipos = [tipo.strip() for tipo in tipos.split(",") if tipo.strip()]
+        filtros["tipos"] = tipos or None
+        return True, filtros
+
+    @staticmethod
+    def _dados_extrato(conta, **filtros):
+        movimentos = []
+        ultima = None
+        for ultima, tipo, centavos, micros in conta._extrato.consultar(**filtros):
+            data = Extrato._EPOCA + timedelta(microseconds=micros)
+            movimentos.append(
+                {
+                    "tipo": tipo,
+                    "valor": str(de_centavos(centavos)),
+                    "data": data.isoformat(),
+                }
+            )
+        limite = filtros.get("limite")
+        proximo = None
+        if limite is not None and len(movimentos) == limite:
+            # página cheia: pode haver mais (a próxima vem vazia se não houver)
+            proximo = ultima if filtros.get("decrescente") else ultima + 1
+        return {
+            "saldo": str(conta.saldo_atual()),
+            "operacoes_hoje": conta._nro_operacoes,
+            "limite_operacoes": conta._politica.operacoes_diarias
+            + conta._transacao_plus,
+            "saques_hoje": conta._nro_saques,
+            "limite_saques": conta._politica.saques_diarios,
+            "movimentos": movimentos,
+            "proximo_cursor": proximo,
+        }
 
 
 # Menus
+def menu_novo_usuario(banco: DadosBanco):
+    cpf = checar_limpar_cpf(input("CPF: "))
+
+    # já existe? evita pedir os dados à toa
+    if banco.buscar_usuario(cpf):
+        return False, f"❌ Já existe usuário com esse CPF {formatar_cpf(cpf)}."
+
+    print("\n=== Cadastro de Novo Usuário ===")
+    nome = input("Nome completo: ").strip()
+    data_nascimento = input("Data nascimento (DD/MM/AAAA): ").strip()
+    endereco = input("Endereço (logradouro, nº - bairro - cidade/UF): ").strip()
+    return banco.criar_usuario(cpf, nome, data_nascimento, endereco)
+
+
+def menu_nova_conta(banco: DadosBanco):
+    cpf = checar_limpar_cpf(input("CPF do usuário: "))
+    usuario = banco.buscar_usuario(cpf)
+    if not usuario:
+        return False, "❌ Usuário não encontrado."
+
+    # listar contas existentes do usuário
+    if usuario.contas:
+        print(f"\nContas já existentes para {usuario.nome} (CPF {formatar_cpf(cpf)}):")
+        print(usuario.listar_contas())
+    else:
+        print(f"\nUsuário {usuario.nome} ainda não possui contas.")
+
+    # confirmação
+    opcao = input("Deseja criar uma nova conta? [s/n]: ").lower().strip()
+    if opcao != "s":
+        limpar_tela()
+        return False, "❌ Operação cancelada pelo usuário."
+
+    return banco.criar_conta(cpf)
+
+
+def menu_metricas():
+    metricas = ConfigBanco.metricas()
+    if not metricas.ativa:
+        resposta = input("Métricas desligadas. Ligar agora? (s/n): ")
+        if resposta.lower().strip() == "s":
+            metricas.ativa = True
+            print("✔️ Métricas ligadas: serão coletadas a partir de agora.")
+        return
+    formato = input("[p] Prometheus  [j] JSON: ").lower().strip()
+    if formato == "p":
+        print(metricas.prometheus())
+    elif formato == "j":
+        print(json.dumps(metricas.instantaneo(), indent=2, ensure_ascii=False))
+    else:
+        print("Opção inválida.")
+
+
 def menu_conta(conta: Conta):
     while True:
+        conta.atualizar_politica()
         mudou, msg = conta.resetar_contadores()
         if mudou:
             print(msg)
@@ -631,6 +3875,8 @@ def menu_conta(conta: Conta):
         print("[d] Depositar")
         print("[s] Sacar")
         print("[e] Exibir extrato")
+        print("[f] Filtrar extrato (período/tipo)")
+        print("[r] Resumo do período")
         print("[i] Imprimir extrato")
         print("[v] Voltar")
 
@@ -640,14 +3886,20 @@ def menu_conta(conta: Conta):
         match opcao:
             case "d":
                 valor = ValidadorValor.ler_valor("Informe o valor do depósito: ")
-                resultado = conta.registrar_transacao(Deposito(valor))
+                resultado = conta.registrar_transacao(
+                    Deposito(valor), aceitar_transacao_plus=ofertar_transacao_plus
+                )
                 print(resultado)
                 if "✔️" in resultado:  # só salva se deu certo
                     conta.salvar_bd_conta()
 
             case "s":
                 valor = ValidadorValor.ler_valor("Informe o valor do saque: ")
-                resultado = conta.registrar_transacao(Saque(valor))
+                resultado = conta.registrar_transacao(
+                    Saque(valor),
+                    aceitar_saque_plus=ofertar_saque_plus,
+                    aceitar_transacao_plus=ofertar_transacao_plus,
+                )
                 print(resultado)
                 if "✔️" in resultado:  # só salva se deu certo
                     conta.salvar_bd_conta()
@@ -655,6 +3907,15 @@ def menu_conta(conta: Conta):
             case "e":
                 conta.exibir_extrato()
 
+            case "f":
+                conta.exibir_extrato(**ler_filtro_extrato())
+
+            case "r":
+                conta.exibir_resumo(
+                    ler_data("Data inicial (dd/mm/aaaa, vazio = desde o início): "),
+                    ler_data("Data final (dd/mm/aaaa, vazio = até hoje): "),
+                )
+
             case "i":
                 conta.imprimir_extrato()
                 conta.salvar_bd_conta()  # sempre salva, pois consome operação
@@ -662,7 +3923,7 @@ def menu_conta(conta: Conta):
             case "v":
                 print("Voltando ao menu inicial...")
                 # só salva se houver diferença desde o último salvamento
-                if conta._extrato or conta._nro_operacoes > 0 or conta._nro_saques > 0:
+                if conta.possui_alteracoes():
                     conta.salvar_bd_conta()
                 break
 
@@ -679,6 +3940,7 @@ if __name__ == "__main__":
         print("[nc] Nova conta")
         print("[lc] Listar contas")
         print("[ac] Acessar conta")
+        print("[m] Métricas")
         print("[q] Sair")
 
         opcao = input("Escolha uma opção: ").lower().strip()
@@ -686,46 +3948,38 @@ if __name__ == "__main__":
 
         match opcao:
             case "nu":
-                cpf = input("CPF: ")
-                ok, msg = banco.criar_usuario(cpf)
+                ok, msg = menu_novo_usuario(banco)
                 print(msg)
 
             case "nc":
-                cpf = input("CPF do usuário: ")
-                ok, msg = banco.criar_conta(cpf)
+                ok, msg = menu_nova_conta(banco)
                 print(msg)
 
             case "lc":
-                cpf = input("CPF: ")
+                cpf = checar_limpar_cpf(input("CPF: "))
                 ok, msg = banco.listar_contas(cpf)
                 print(msg)
 
             case "ac":
-                cpf = input("CPF: ")
+                cpf = checar_limpar_cpf(input("CPF: "))
                 ag = input("Agência: ")
                 nro = input("Número da conta: ")
                 ok, conta = banco.acessar_conta(cpf, ag, nro)
                 if ok:
-                    menu_conta(conta)  # chamamos função do menu de operações
+                    # conta reservada para esta sessão até voltar ao menu inicial
+                    with banco.sessao_conta(conta):
+                        menu_conta(conta)  # chamamos função do menu de operações
                 else:
                     print(conta)  # aqui 'conta' contém a mensagem de erro
 
+            case "m":
+                menu_metricas()
+
             case "q":
                 print("aguarde enquanto encerramos o banco...")
                 # salvar os usuários e contas antes de sair
-                dados_json = banco.carregar_bd_usuario()
-                for usuario in banco.usuarios:
-                    dados_json[usuario.cpf] = {
-                        "cpf": usuario.cpf,
-                        "nome": usuario.nome,
-                        "data_nascimento": usuario.data_nascimento,
-                        "endereco": usuario.endereco,
-                        "contas": [
-                            {"agencia": c._agencia, "numero_conta": c._nro_conta}
-                            for c in usuario.contas
-                        ],
-                    }
-                banco.salvar_bd_usuario(dados_json)
+                banco.salvar_dados_conta()
+                ConfigBanco.armazenamento().fechar()
                 print("Obrigado por utilizar nosso sistema bancário!")
                 break
             case _:
@@ -0,0 +1,71 @@
+"""
+Benchmark de busca de usuário e acesso à conta no DadosBanco (v3_0).
+
+Mede a latência média de `buscar_usuario` e `acessar_conta` para bancos de
+1 mil a 1 milhão de usuários (uma conta cada). Com os índices por CPF e por
+(agência, conta) a latência deve ficar estável entre os tamanhos.
+
+Execução (na raiz do repositório):
+    python -m benchmarks.busca_usuario
+    python -m benchmarks.busca_usuario 1000 10000 100000
+"""
+
+import random
+import sys
+import tempfile
+import timeit
+
+from bank_app_v3_0 import ConfigBanco, DadosBanco, Usuario
+from benchmarks.comum import conta_em_memoria, configurar
+
+TAMANHOS_PADRAO = (1_000, 10_000, 100_000, 1_000_000)
+AMOSTRAS = 10_000
+
+
+def montar_banco(qtd_usuarios):
+    """Cria um DadosBanco em memória, sem tocar nos arquivos JSON reais."""
+    banco = DadosBanco()
+    for i in range(qtd_usuarios):
+        cpf = f"{i:011d}"
+        usuario = Usuario(cpf, f"Usuário {i}", "01/01/1990", "Rua A, 1")
+        usuario.adicionar_conta(conta_em_memoria(i + 1, cpf))
+        banco._indexar_usuario(usuario)
+    return banco
+
+
+def medir(qtd_usuarios):
+    banco = montar_banco(qtd_usuarios)
+    sorteio = random.Random(42)
+    indices = [sorteio.randrange(qtd_usuarios) for _ in range(AMOSTRAS)]
+    cpfs = [f"{i:011d}" for i in indices]
+    agencia = ConfigBanco.agencia_padrao()
+
+    def buscar():
+        for cpf in cpfs:
+            banco.buscar_usuario(cpf)
+
+    def acessar():
+        for i, cpf in zip(indices, cpfs):
+            banco.acessar_conta(cpf, agencia, i + 1)
+
+    t_busca = min(timeit.repeat(buscar, number=1, repeat=5)) / AMOSTRAS
+    t_acesso = min(timeit.repeat(acessar, number=1, repeat=5)) / AMOSTRAS
+    return t_busca, t_acesso
+
+
+def main(tamanhos):
+    with tempfile.TemporaryDirectory() as pasta:
+        # arquivos inexistentes → DadosBanco começa vazio
+        configurar(pasta)
+
+        print(f"{'usuários':>10} | {'buscar_usuario':>15} | {'acessar_conta':>15}")
+        for qtd in tamanhos:
+            t_busca, t_acesso = medir(qtd)
+            print(
+                f"{qtd:>10,} | {t_busca * 1e6:>12.2f} µs | {t_acesso * 1e6:>12.2f} µs"
+            )
+
+
+if __name__ == "__main__":
+    tamanhos = [int(n) for n in sys.argv[1:]] or TAMANHOS_PADRAO
+    main(tamanhos)
@@ -0,0 +1,190 @@
+"""
+Gerador de carga para o servidor HTTP/JSON do v3_0 (servidor_v3_0.py).
+
+Sobe o servidor em um diretório temporário (dados descartáveis), cria um
+usuário por conexão, cada um com sua conta, e dispara depósitos, saques e
+consultas de extrato em conexões keep-alive. Ao final mostra requisições
+por segundo e latências p50/p99 por rota.
+
+Execução (na raiz do repositório):
+    python -m benchmarks.carga_servidor
+    python -m benchmarks.carga_servidor --conexoes 50 --requisicoes 200
+    python -m benchmarks.carga_servidor --porta 8765   # porta fixa; ocupada, aborta
+    python -m benchmarks.carga_servidor --porta 8080 --externo   # já rodando
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+SERVIDOR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "servidor_v3_0.py"
+)
+
+
+class Cliente:
+    def __init__(self, host, porta):
+        self.host = host
+        self.porta = porta
+
+    async def conectar(self):
+        self._leitor, self._escritor = await asyncio.open_connection(
+            self.host, self.porta
+        )
+
+    async def requisitar(self, metodo, caminho, dados=None):
+        corpo = json.dumps(dados).encode("utf-8") if dados is not None else b""
+        self._escritor.write(
+            (
+                f"{metodo} {caminho} HTTP/1.1\r\n"
+                f"Host: {self.host}\r\n"
+                "Content-Type: application/json\r\n"
+                f"Content-Length: {len(corpo)}\r\n"
+                "\r\n"
+            ).encode("latin-1")
+            + corpo
+        )
+        await self._escritor.drain()
+
+        status = int((await self._leitor.readline()).split()[1])
+        tamanho = 0
+        while True:
+            cabecalho = await self._leitor.readline()
+            if cabecalho == b"\r\n":
+                break
+            nome, _, valor = cabecalho.decode("latin-1").partition(":")
+            if nome.lower() == "content-length":
+                tamanho = int(valor)
+        return status, json.loads(await self._leitor.readexactly(tamanho))
+
+    def fechar(self):
+        self._escritor.close()
+
+
+def percentil(amostras, p):
+    ordenadas = sorted(amostras)
+    return ordenadas[min(len(ordenadas) - 1, int(len(ordenadas) * p / 100))]
+
+
+async def trabalhador(indice, args, latencias):
+    cliente = Cliente(args.host, args.porta)
+    await cliente.conectar()
+    sorteio = random.Random(indice)
+
+    cpf = f"{90_000_000_000 + indice:011d}"
+    await cliente.requisitar(
+        "POST", "/usuarios", {"cpf": cpf, "nome": f"Carga {indice}"}
+    )
+    _, resposta = await cliente.requisitar("POST", "/contas", {"cpf": cpf})
+    conta = {"cpf": cpf, **resposta["resultado"]}
+
+    for _ in range(args.requisicoes):
+        sorteio_rota = sorteio.random()
+        inicio = time.perf_counter()
+        if sorteio_rota < 0.7:
+            rota = "depósito"
+            await cliente.requisitar(
+                "POST",
+                "/depositos",
+                {**conta, "valor": "25.00", "aceitar_transacao_plus": True},
+            )
+        elif sorteio_rota < 0.9:
+            rota = "saque"
+            await cliente.requisitar(
+                "POST",
+                "/saques",
+                {
+                    **conta,
+                    "valor": "5.00",
+                    "aceitar_saque_plus": True,
+                    "aceitar_transacao_plus": True,
+                },
+            )
+        else:
+            rota = "extrato"
+            consulta = "&".join(f"{k}={v}" for k, v in conta.items())
+            await cliente.requisitar("GET", f"/extrato?{consulta}")
+        latencias.setdefault(rota, []).append(time.perf_counter() - inicio)
+
+    cliente.fechar()
+
+
+async def gerar_carga(args):
+    latencias = {}
+    inicio = time.perf_counter()
+    await asyncio.gather(
+        *(trabalhador(i, args, latencias) for i in range(args.conexoes))
+    )
+    duracao = time.perf_counter() - inicio
+
+    total = sum(len(amostras) for amostras in latencias.values())
+    print(f"\n{total} requisições em {duracao:.2f}s → {total / duracao:,.0f} req/s")
+    print(f"{'rota':>10} | {'qtd':>7} | {'p50':>9} | {'p99':>9}")
+    todas = [amostra for amostras in latencias.values() for amostra in amostras]
+    for rota, amostras in sorted(latencias.items()) + [("total", todas)]:
+        print(
+            f"{rota:>10} | {len(amostras):>7} | "
+            f"{percentil(amostras, 50) * 1e3:>6.2f} ms | "
+            f"{percentil(amostras, 99) * 1e3:>6.2f} ms"
+        )
+
+
+def iniciar_servidor(args, pasta):
+    """
+    Sobe o servidor em `pasta` e espera o anúncio de que ele já escuta; a
+    porta anunciada (a escolhida pelo sistema, com --porta 0) vai para
+    `args.porta`. Se o processo terminar antes (porta ocupada, erro na
+    partida), aborta: nunca mede outro servidor que esteja na porta.
+    """
+    processo = subprocess.Popen(
+        [sys.executable, SERVIDOR, "--host", args.host, "--porta", str(args.porta)],
+        cwd=pasta,
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    anuncio = processo.stdout.readline()
+    if not anuncio:
+        processo.wait()
+        sys.exit(f"❌ O servidor não iniciou (código {processo.returncode}).")
+    args.porta = int(anuncio.rsplit(":", 1)[1])
+    return processo
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gerador de carga do servidor v3_0")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument(
+        "--porta", type=int, default=0, help="0 = porta livre (servidor próprio)"
+    )
+    parser.add_argument("--conexoes", type=int, default=20)
+    parser.add_argument("--requisicoes", type=int, default=100)
+    parser.add_argument(
+        "--externo", action="store_true", help="usar um servidor já em execução"
+    )
+    args = parser.parse_args()
+
+    if args.externo:
+        if not args.porta:
+            parser.error("--externo precisa da --porta do servidor em execução")
+        asyncio.run(gerar_carga(args))
+        return
+
+    with tempfile.TemporaryDirectory() as pasta:
+        processo = iniciar_servidor(args, pasta)
+        try:
+            asyncio.run(gerar_carga(args))
+        finally:
+            processo.send_signal(signal.SIGINT)
+            processo.wait()
+            processo.stdout.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Benchmark de serialização do arquivo de transações (v3_0).
+
+Gera um snapshot sintético de ~N MB (formato de `transacoes_bancarias.json`)
+e mede, para cada codec instalado (json, orjson, msgspec) e para os modos
+indentado e compacto:
+- salvar: codificar + gravar o arquivo;
+- carregar: ler o arquivo + decodificar.
+Por fim compara a montagem dos extratos: o caminho antigo (Decimal/datetime
+por movimento) x `Extrato.de_linhas` (direto para centavos/micros).
+
+Execução (na raiz do repositório):
+    python -m benchmarks.codec_persistencia
+    python -m benchmarks.codec_persistencia --mb 10
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from bank_app_v3_0 import CODECS, Extrato, texto_de_centavos
+from benchmarks.comum import TIPOS
+
+MOVIMENTOS_POR_CONTA = 200
+BYTES_POR_MOVIMENTO = 90  # aproximado, no modo indentado
+
+
+def gerar_snapshot(mb):
+    """{id: conta} com movimentos suficientes para ~`mb` MB indentados."""
+    sorteio = random.Random(42)
+    inicio = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    qtd_contas = max(1, mb * 1024 * 1024 // BYTES_POR_MOVIMENTO // MOVIMENTOS_POR_CONTA)
+    contas = {}
+    for n in range(qtd_contas):
+        id_conta = f"{n:011d}-0001-{n + 1}"
+        extrato = []
+        for i in range(MOVIMENTOS_POR_CONTA):
+            tipo = sorteio.choice(TIPOS)
+            centavos = sorteio.randrange(1, 50_000)
+            if tipo != "Depósito":
+                centavos = -centavos
+            data = inicio + timedelta(seconds=n * 7 + i * 37)
+            extrato.append((tipo, texto_de_centavos(centavos), data.isoformat()))
+        contas[id_conta] = {
+            "id": id_conta,
+            "ultimo_dia": "2025-01-01",
+            "saldo": "0.00",
+            "transacao_plus": 0,
+            "numero_operacoes": 0,
+            "numero_saques": 0,
+            "versao": 1,
+            "extrato": extrato,
+        }
+    return contas
+
+
+def cronometrar(funcao):
+    inicio = time.perf_counter()
+    resultado = funcao()
+    return time.perf_counter() - inicio, resultado
+
+
+def medir_codec(codec, contas, arquivo, compacto):
+    def salvar():
+        with open(arquivo, "wb") as f:
+            f.write(codec.codificar(contas, compacto))
+
+    def carregar():
+        with open(arquivo, "rb") as f:
+            return codec.decodificar(f.read())
+
+    t_salvar, _ = cronometrar(salvar)
+    tamanho = os.path.getsize(arquivo)
+    t_carregar, _ = cronometrar(carregar)
+    return t_salvar, t_carregar, tamanho
+
+
+def extratos_antigo(contas):
+    return [
+        Extrato(
+            (tipo, Decimal(valor), datetime.fromisoformat(data))
+            for tipo, valor, data in conta["extrato"]
+        )
+        for conta in contas.values()
+    ]
+
+
+def extratos_tipado(contas):
+    return [Extrato.de_linhas(conta["extrato"]) for conta in contas.values()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--mb", type=int, default=100)
+    args = parser.parse_args()
+
+    contas = gerar_snapshot(args.mb)
+    print(f"{len(contas):,} contas, {MOVIMENTOS_POR_CONTA} movimentos cada\n")
+    print(
+        f"{'codec':>8} | {'modo':>10} | {'tamanho':>10} | "
+        f"{'salvar':>9} | {'carregar':>9}"
+    )
+    with tempfile.TemporaryDirectory() as pasta:
+        arquivo = os.path.join(pasta, "transacoes.json")
+        for nome, classe in CODECS.items():
+            if classe is None:
+                print(f"{nome:>8} | não instalado")
+                continue
+            codec = classe()
+            for compacto in (False, True):
+                t_salvar, t_carregar, tamanho = medir_codec(
+                    codec, contas, arquivo, compacto
+                )
+                print(
+                    f"{nome:>8} | {'compacto' if compacto else 'indentado':>10} | "
+                    f"{tamanho / 2**20:>7.1f} MB | {t_salvar:>7.2f} s | "
+                    f"{t_carregar:>7.2f} s"
+                )
+
+    t_antigo, antigos = cronometrar(lambda: extratos_antigo(contas))
+    t_tipado, tipados = cronometrar(lambda: extratos_tipado(contas))
+    assert all(list(a) == list(b) for a, b in zip(antigos, tipados))
+    print("\nmontagem dos extratos (após decodificar)")
+    print(f"  Decimal/datetime por movimento: {t_antigo:.2f} s")
+    print(f"  Extrato.de_linhas:              {t_tipado:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
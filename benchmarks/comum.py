@@ -0,0 +1,92 @@
+"""
+Apoio comum dos benchmarks do v3_0: o ConfigBanco apontado para uma pasta
+temporária, limites diários altos e as fábricas de contas, em um só lugar
+(um ajuste aqui vale para todos os scripts).
+"""
+
+import multiprocessing
+import os
+import resource
+from concurrent.futures import ProcessPoolExecutor
+
+from bank_app_v3_0 import ConfigBanco, Conta
+
+# os nomes padrão do v3_0 (os mesmos de `gerar_banco_sintetico`), na pasta
+ARQUIVOS = {
+    "_ARQ_CONTAS": "contas_bancarias.json",
+    "_ARQ_TRANSACOES": "transacoes_bancarias.json",
+    "_ARQ_JOURNAL": "transacoes_bancarias.journal",
+    "_ARQ_TRAVA": "banco.lock",
+    "_ARQ_SQLITE": "banco.sqlite3",
+    "_ARQ_POLITICAS": "politicas_banco.json",
+}
+TIPOS = ("Depósito", "Saque", "Saque Plus", "Taxa Saque Plus", "Transação Plus")
+
+
+def configurar(
+    pasta,
+    armazenamento="json",
+    fsync_em_grupo=False,
+    commit_intervalo=0.0,
+    shards=1,
+    formato_snapshot="json",
+):
+    """ConfigBanco com todos os arquivos em `pasta`; backend e políticas são
+    recriados na próxima chamada."""
+    for atributo, nome in ARQUIVOS.items():
+        setattr(ConfigBanco, atributo, os.path.join(pasta, nome))
+    ConfigBanco._ARMAZENAMENTO = armazenamento
+    ConfigBanco._FSYNC_EM_GRUPO = fsync_em_grupo
+    ConfigBanco._COMMIT_INTERVALO = commit_intervalo
+    ConfigBanco._SHARDS_TRANSACOES = shards
+    ConfigBanco._FORMATO_SNAPSHOT = formato_snapshot
+    ConfigBanco._armazenamento = None
+    ConfigBanco._politicas = None
+
+
+def limites_altos(qtd, *contas):
+    """
+    Limites diários de 10 x `qtd` operações e saques: um laço de `qtd`
+    transações nunca cai nas ofertas Plus. As políticas mudam de geração
+    (as compiladas antes ficam para trás) e as `contas` já criadas passam a
+    usar as novas.
+    """
+    ConfigBanco._OPERACOES_DIARIAS = ConfigBanco._SAQUES_DIARIOS = qtd * 10
+    ConfigBanco.politicas().atualizar(forcar=True)
+    for conta in contas:
+        conta.atualizar_politica()
+
+
+def conta_em_memoria(numero=1, cpf="00000000000"):
+    """Conta da agência padrão, criada como no cadastro (sem ler o disco)."""
+    return Conta(ConfigBanco.agencia_padrao(), numero, cpf)
+
+
+def conta_do_id(id_conta):
+    """Conta de um id "<cpf>-<agência>-<número>" (estado lido sob demanda)."""
+    cpf, agencia, numero = id_conta.split("-")
+    return Conta(agencia, int(numero), cpf)
+
+
+def criar_contas(servico, qtd, cpf_base, nome="Estresse"):
+    """`qtd` usuários com uma conta cada → [(cpf, agência, número)]."""
+    contas = []
+    for i in range(qtd):
+        cpf = f"{cpf_base + i:011d}"
+        servico.criar_usuario(cpf, f"{nome} {i}")
+        _, conta = servico.criar_conta(cpf)
+        contas.append((cpf, conta["agencia"], conta["numero_conta"]))
+    return contas
+
+
+def pico_rss_mb():
+    # ru_maxrss em KB no Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def em_processo_novo(funcao, *args):
+    """`funcao(*args)` em um processo "spawn": limpo, sem módulos nem memória
+    herdados deste (tempos de partida e pico de RSS só da chamada)."""
+    contexto = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=contexto) as pool:
+        return pool.submit(funcao, *args).result()
@@ -0,0 +1,223 @@
+"""
+Teste de estresse de concorrência do v3_0: muitas threads, muitas contas.
+
+Cria usuários/contas em um diretório temporário e dispara depósitos e
+saques (com ofertas Plus aceitas) de um pool de threads via ServicoBanco.
+Com `--processos N`, N processos (cada um com seu pool de threads e seu
+ServicoBanco) operam sobre os mesmos arquivos.
+Ao final confere, para cada conta:
+- saldo == soma das movimentações do extrato;
+- movimentações de depósito/saque == operações confirmadas pelo serviço;
+- estado recarregado do armazenamento == estado em memória (um processo).
+Com o group commit ligado, também confere que `salvar_bd_conta(duravel=True)`
+dentro de `sessao_conta` (como no menu da conta) retorna sem travar.
+Termina com código 1 se qualquer conta não fechar.
+
+Execução (na raiz do repositório):
+    python -m benchmarks.concorrencia_contas
+    python -m benchmarks.concorrencia_contas --threads 32 --operacoes 20000
+    python -m benchmarks.concorrencia_contas --armazenamento sqlite
+    python -m benchmarks.concorrencia_contas --processos 4
+    python -m benchmarks.concorrencia_contas --fsync-em-grupo
+    python -m benchmarks.concorrencia_contas --commit-intervalo 0.05
+    python -m benchmarks.concorrencia_contas --shards 16
+    python -m benchmarks.concorrencia_contas --snapshot-binario
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from decimal import Decimal
+
+from bank_app_v3_0 import ConfigBanco, DadosBanco, Deposito, ServicoBanco
+from benchmarks.comum import configurar, criar_contas
+
+TIPOS_OPERACAO = {"Depósito", "Saque", "Saque Plus"}
+CPF_BASE = 80_000_000_000
+
+
+def executar(servico, contas, qtd_operacoes, threads, primeira_semente=0):
+    def operacao(semente):
+        sorteio = random.Random(semente)
+        cpf, agencia, numero = sorteio.choice(contas)
+        if sorteio.random() < 0.6:
+            ok, _ = servico.depositar(
+                cpf, agencia, numero, "20.00", aceitar_transacao_plus=True
+            )
+        else:
+            ok, _ = servico.sacar(
+                cpf,
+                agencia,
+                numero,
+                "7.50",
+                aceitar_saque_plus=True,
+                aceitar_transacao_plus=True,
+            )
+        return (cpf, agencia, numero) if ok else None
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        sementes = range(primeira_semente, primeira_semente + qtd_operacoes)
+        return Counter(chave for chave in pool.map(operacao, sementes) if chave)
+
+
+def executar_processo(args, contas, qtd_operacoes, n):
+    """Um dos processos de `--processos`: serviço próprio, mesmos arquivos."""
+    pasta, armazenamento, threads, *opcoes = args
+    configurar(pasta, armazenamento, *opcoes)
+    servico = ServicoBanco()
+    try:
+        return executar(servico, contas, qtd_operacoes, threads, n * qtd_operacoes)
+    finally:
+        ConfigBanco.armazenamento().fechar()
+
+
+def salvar_duravel_em_sessao(banco, chave, espera=10.0):
+    """
+    Depósito e `salvar_bd_conta(duravel=True)` com a sessão da conta aberta.
+    → (depósito ok, gravação ok), ou None se não voltou em `espera` segundos.
+    """
+    _, conta = banco.acessar_conta(*chave)
+    resultado = []
+
+    def sessao():
+        with banco.sessao_conta(conta):
+            ok, _ = conta.operar(
+                Deposito(Decimal("1.00")), aceitar_transacao_plus=True
+            )
+            resultado.append((ok, conta.salvar_bd_conta(duravel=True)))
+
+    thread = threading.Thread(target=sessao, daemon=True)
+    thread.start()
+    thread.join(espera)
+    return resultado[0] if resultado else None
+
+
+def conferir(banco, contas, confirmadas):
+    """`banco` é o estado em memória a comparar com o disco (None: só o disco)."""
+    ConfigBanco.armazenamento().fechar()
+    ConfigBanco._armazenamento = None
+    recarregado = DadosBanco()
+
+    divergencias = 0
+    for cpf, agencia, numero in contas:
+        _, disco = recarregado.acessar_conta(cpf, agencia, numero)
+        movimentos = list(disco._extrato)
+        soma = sum(valor for _, valor, _ in movimentos)
+        operacoes = sum(1 for tipo, _, _ in movimentos if tipo in TIPOS_OPERACAO)
+        problemas = []
+        if soma != disco.saldo_atual():
+            problemas.append(f"saldo {disco.saldo_atual()} != extrato {soma}")
+        if operacoes != confirmadas[(cpf, agencia, numero)]:
+            problemas.append(
+                f"{operacoes} movimentos != {confirmadas[(cpf, agencia, numero)]} ok"
+            )
+        if banco is not None:
+            _, conta = banco.acessar_conta(cpf, agencia, numero)
+            if (conta.saldo_atual(), list(conta._extrato)) != (
+                disco.saldo_atual(),
+                movimentos,
+            ):
+                problemas.append("estado persistido diferente do estado em memória")
+        if problemas:
+            divergencias += 1
+            print(f"❌ Conta {numero}: " + "; ".join(problemas))
+    return divergencias
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Estresse de concorrência do v3_0")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--contas", type=int, default=50)
+    parser.add_argument("--operacoes", type=int, default=5_000)
+    parser.add_argument("--armazenamento", choices=("json", "sqlite"), default="json")
+    parser.add_argument(
+        "--processos", type=int, default=1, help="processos sobre os mesmos dados"
+    )
+    parser.add_argument(
+        "--fsync-em-grupo", action="store_true", help="um fsync por grupo de linhas"
+    )
+    parser.add_argument(
+        "--commit-intervalo",
+        type=float,
+        default=0.0,
+        help="segundos entre gravações do group commit (0 = grava a cada operação)",
+    )
+    parser.add_argument("--shards", type=int, default=1, help="shards do journal")
+    parser.add_argument(
+        "--snapshot-binario", action="store_true", help="snapshot binário (mmap)"
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        formato_snapshot = "binario" if args.snapshot_binario else "json"
+        configurar(
+            pasta,
+            args.armazenamento,
+            args.fsync_em_grupo,
+            args.commit_intervalo,
+            args.shards,
+            formato_snapshot,
+        )
+        servico = ServicoBanco()
+        contas = criar_contas(servico, args.contas, CPF_BASE)
+
+        inicio = time.perf_counter()
+        if args.processos == 1:
+            confirmadas = executar(servico, contas, args.operacoes, args.threads)
+            banco = servico.banco
+        else:
+            # divide as operações; cada processo recebe a sua fatia de sementes
+            fatia = args.operacoes // args.processos
+            confirmadas = Counter()
+            with ProcessPoolExecutor(max_workers=args.processos) as pool:
+                ambiente = (
+                    pasta,
+                    args.armazenamento,
+                    args.threads,
+                    args.fsync_em_grupo,
+                    args.commit_intervalo,
+                    args.shards,
+                    formato_snapshot,
+                )
+                for parcial in pool.map(
+                    executar_processo,
+                    [ambiente] * args.processos,
+                    [contas] * args.processos,
+                    [fatia] * args.processos,
+                    range(args.processos),
+                ):
+                    confirmadas.update(parcial)
+            banco = None  # cada processo tinha o próprio estado em memória
+        duracao = time.perf_counter() - inicio
+        print(
+            f"{args.operacoes} operações, {args.processos} processo(s) x "
+            f"{args.threads} threads, {args.contas} contas: "
+            f"{args.operacoes / duracao:,.0f} ops/s"
+        )
+
+        if args.commit_intervalo > 0:
+            resultado = salvar_duravel_em_sessao(servico.banco, contas[0])
+            if resultado is None:
+                print("❌ salvar_bd_conta(duravel=True) travou dentro da sessão.")
+                sys.exit(1)
+            ok, salvo = resultado
+            if not salvo:
+                print("❌ salvar_bd_conta(duravel=True) falhou dentro da sessão.")
+                sys.exit(1)
+            confirmadas[contas[0]] += ok
+
+        divergencias = conferir(banco, contas, confirmadas)
+
+    if divergencias:
+        print(f"❌ {divergencias} contas não conferem.")
+        sys.exit(1)
+    print(f"✔️ Todas as {args.contas} contas conferem (memória, extrato e disco).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Benchmark de extrato mapeado: conta com milhões de movimentos (v3_0).
+
+Grava um snapshot binário com uma única conta de N movimentos e mede, em um
+processo novo, o tempo e o pico de memória (RSS) para carregar a conta e:
+- ler as últimas 20 linhas;
+- ler uma janela de um dia no meio do histórico (busca binária nas datas);
+- saldo em uma data no meio do histórico (busca binária + acumulados);
+- resumo de um ano (agregados por mês e dia).
+Compara o extrato mapeado (colunas sobre o mmap, sem cópia, com os agregados
+gravados no snapshot) com a cópia das colunas para arrays em memória
+(`Extrato.de_colunas`, como antes; a primeira consulta monta os agregados) e
+com o replay do histórico (somar os movimentos até a data / do período).
+
+Execução (na raiz do repositório):
+    python -m benchmarks.extrato_mapeado
+    python -m benchmarks.extrato_mapeado 20000000
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from bank_app_v3_0 import ConfigBanco, Extrato, JournalTransacoes, SnapshotBinario
+from benchmarks.comum import (
+    TIPOS,
+    configurar,
+    conta_do_id,
+    em_processo_novo,
+    pico_rss_mb,
+)
+
+MOVIMENTOS_PADRAO = 5_000_000
+ID_CONTA = "00000000001-0001-1"
+
+
+def gerar(pasta, qtd):
+    sorteio = random.Random(42)
+    extrato = Extrato()
+    micros = 1_600_000_000_000_000
+    for _ in range(qtd):
+        micros += sorteio.randrange(1, 60_000_000)
+        centavos = sorteio.randrange(-50_000, 50_000)
+        extrato.registrar(sorteio.choice(TIPOS), centavos, micros)
+    conta = {
+        "ultimo_dia": "2025-01-01",
+        "saldo": "0.00",
+        "transacao_plus": 0,
+        "numero_operacoes": 0,
+        "numero_saques": 0,
+        "versao": 1,
+        "extrato": extrato,
+    }
+    SnapshotBinario.gravar(arquivo_snapshot(pasta), {ID_CONTA: conta})
+
+
+def arquivo_snapshot(pasta):
+    configurar(pasta, formato_snapshot="binario")
+    return JournalTransacoes.caminho_snapshot(ConfigBanco.arquivo_transacoes())
+
+
+def carregar(pasta):
+    configurar(pasta, formato_snapshot="binario")
+    conta = conta_do_id(ID_CONTA)
+    conta.carregar_bd_conta()
+    return conta._extrato
+
+
+def um_ano(extrato):
+    """Instante do meio do histórico e o ano (dias locais) a partir dele."""
+    meio = extrato[len(extrato) // 2][2]
+    dia = meio.astimezone().date()
+    return meio, dia, dia + timedelta(days=364)
+
+
+def consultar(pasta, copiar):
+    inicio = time.perf_counter()
+    extrato = carregar(pasta)
+    if copiar:
+        extrato = Extrato.de_colunas(*extrato.colunas())
+    t_carga = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    ultimas = extrato[-20:]
+    t_ultimas = time.perf_counter() - inicio
+
+    meio, desde, ate = um_ano(extrato)
+    inicio = time.perf_counter()
+    janela = list(extrato.periodo(meio, meio + timedelta(days=1)))
+    t_janela = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    posicao = extrato.posicao_data(meio)
+    saldo = extrato.acumulado(posicao - 1)
+    t_saldo = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    resumo = extrato.resumo(desde, ate)
+    t_resumo = time.perf_counter() - inicio
+
+    assert len(ultimas) == 20 and janela
+    rss = pico_rss_mb()
+    tempos = t_carga, t_ultimas, t_janela, t_saldo, t_resumo
+    debitos = resumo["debitos"] + resumo["tarifas"]
+    return tempos, len(janela), rss, (saldo, resumo["creditos"], debitos)
+
+
+def replay(pasta):
+    """Saldo na data e resumo do ano somando os movimentos, sem os agregados."""
+    extrato = carregar(pasta)
+    meio, desde, ate = um_ano(extrato)
+
+    inicio = time.perf_counter()
+    saldo = sum(centavos for _, _, centavos, _ in extrato.consultar(ate=meio))
+    t_saldo = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    meia_noite = datetime.min.time()
+    creditos = debitos = 0
+    for _, _, centavos, _ in extrato.consultar(
+        datetime.combine(desde, meia_noite),
+        datetime.combine(ate + timedelta(days=1), meia_noite),
+    ):
+        if centavos >= 0:
+            creditos += centavos
+        else:
+            debitos -= centavos
+    t_resumo = time.perf_counter() - inicio
+    return t_saldo, t_resumo, (saldo, creditos, debitos)
+
+
+def main(qtd):
+    with tempfile.TemporaryDirectory() as pasta:
+        gerar(pasta, qtd)
+        tamanho = os.path.getsize(arquivo_snapshot(pasta))
+        print(f"{qtd:,} movimentos, snapshot de {tamanho / 2**20:,.1f} MB\n")
+        print(
+            f"{'extrato':>8} | {'carga':>10} | {'últimas 20':>10} | "
+            f"{'1 dia':>16} | {'saldo na data':>13} | {'resumo 1 ano':>12} | "
+            f"{'pico RSS':>8}"
+        )
+        for nome, copiar in (("mapeado", False), ("copiado", True)):
+            # processo novo: o pico de RSS é só desta consulta
+            tempos, linhas, rss, totais = em_processo_novo(consultar, pasta, copiar)
+            carga, ultimas, janela, saldo, resumo = (t * 1e3 for t in tempos)
+            print(
+                f"{nome:>8} | {carga:>7.1f} ms | {ultimas:>7.2f} ms | "
+                f"{janela:>6.2f} ms ({linhas:>3}) | {saldo:>10.3f} ms | "
+                f"{resumo:>9.2f} ms | {rss:>5.0f} MB"
+            )
+        t_saldo, t_resumo, totais_replay = em_processo_novo(replay, pasta)
+        assert totais_replay == totais
+        print(
+            f"\nreplay do histórico: saldo na data {t_saldo * 1e3:,.1f} ms, "
+            f"resumo de 1 ano {t_resumo * 1e3:,.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else MOVIMENTOS_PADRAO)
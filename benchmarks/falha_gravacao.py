@@ -0,0 +1,166 @@
+"""
+Injeção de falhas na gravação do v3_0: mata o processo gravador (SIGKILL)
+no meio dos salvamentos e confere a recuperação.
+
+A cada rodada um processo filho cadastra usuários (reescrita atômica de
+`contas_bancarias.json`) e faz depósitos (journal), avisando pelo stdout
+cada operação concluída. O pai o mata após um intervalo aleatório e
+recarrega os dados, conferindo:
+- o arquivo de usuários continua um JSON válido (nunca pela metade);
+- todo usuário, conta e depósito confirmado antes da morte está no disco;
+- o saldo de cada conta é a soma do seu extrato.
+O cadastro começa com `--usuarios` usuários, para cada reescrita demorar e
+a morte cair, na maioria das vezes, no meio de uma gravação.
+SIGKILL simula a queda do processo, não a do sistema operacional.
+Termina com código 1 na primeira divergência.
+
+Execução (na raiz do repositório):
+    python -m benchmarks.falha_gravacao
+    python -m benchmarks.falha_gravacao --rodadas 50 --usuarios 20000
+"""
+
+import argparse
+import json
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+
+from bank_app_v3_0 import ConfigBanco, DadosBanco, ServicoBanco, gravar_json_atomico
+from benchmarks.comum import configurar
+
+CPF_BASE = 70_000_000_000
+
+
+def popular(pasta, qtd_usuarios):
+    """Cadastro inicial grande, gravado direto no arquivo de usuários."""
+    configurar(pasta, "json")
+    usuarios = {}
+    for i in range(qtd_usuarios):
+        cpf = f"{CPF_BASE - 1 - i:011d}"
+        usuarios[cpf] = {
+            "cpf": cpf,
+            "nome": f"Carga {i}",
+            "data_nascimento": "01/01/1990",
+            "endereco": "Rua A, 1",
+            "contas": [],
+        }
+    gravar_json_atomico(ConfigBanco.arquivo_contas(), usuarios)
+
+
+def gravador(pasta, rodada):
+    """Processo filho: grava em laço até ser morto."""
+    configurar(pasta, "json")
+    servico = ServicoBanco()
+    i = 0
+    while True:
+        cpf = f"{CPF_BASE + rodada * 100_000 + i:011d}"
+        i += 1
+        ok, _ = servico.criar_usuario(cpf, f"Falha {rodada}-{i}")
+        if not ok:
+            continue
+        print("usuario", cpf, flush=True)
+        ok, conta = servico.criar_conta(cpf)
+        if not ok:
+            continue
+        numero = conta["numero_conta"]
+        print("conta", cpf, numero, flush=True)
+        for _ in range(3):
+            ok, _ = servico.depositar(cpf, conta["agencia"], numero, "10.00")
+            if ok:
+                print("deposito", cpf, numero, flush=True)
+
+
+def rodar(pasta, rodada, espera):
+    filho = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.falha_gravacao", "--filho", pasta]
+        + ["--rodada", str(rodada)],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    time.sleep(espera)
+    filho.send_signal(signal.SIGKILL)
+    saida, _ = filho.communicate()
+    # só linhas completas: a última pode ter sido cortada pela morte
+    return [
+        linha.split()
+        for linha in saida.splitlines(keepends=True)
+        if linha.endswith("\n")
+    ]
+
+
+def conferir(pasta, eventos):
+    problemas = []
+    configurar(pasta, "json")
+    try:
+        with open(ConfigBanco.arquivo_contas(), encoding="utf-8") as f:
+            json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        return [f"arquivo de usuários ilegível: {e}"]
+
+    banco = DadosBanco()
+    depositos = Counter(
+        (evento[1], int(evento[2])) for evento in eventos if evento[0] == "deposito"
+    )
+    for tipo, cpf, *resto in eventos:
+        if tipo == "usuario" and not banco.buscar_usuario(cpf):
+            problemas.append(f"usuário confirmado {cpf} não está no disco")
+        if tipo == "conta":
+            ok, _ = banco.acessar_conta(cpf, ConfigBanco.agencia_padrao(), resto[0])
+            if not ok:
+                problemas.append(f"conta confirmada {resto[0]} não está no disco")
+    for (cpf, numero), confirmados in depositos.items():
+        ok, conta = banco.acessar_conta(cpf, ConfigBanco.agencia_padrao(), numero)
+        if not ok:
+            continue  # já reportada acima
+        movimentos = list(conta._extrato)
+        gravados = sum(1 for tipo, _, _ in movimentos if tipo == "Depósito")
+        if gravados < confirmados:
+            problemas.append(
+                f"conta {numero}: {confirmados} depósitos confirmados, "
+                f"{gravados} no disco"
+            )
+        if sum(valor for _, valor, _ in movimentos) != conta.saldo_atual():
+            problemas.append(f"conta {numero}: saldo diferente da soma do extrato")
+    ConfigBanco.armazenamento().fechar()
+    ConfigBanco._armazenamento = None
+    return problemas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Injeção de falhas na gravação")
+    parser.add_argument("--rodadas", type=int, default=20)
+    parser.add_argument("--usuarios", type=int, default=10_000)
+    parser.add_argument("--filho", help=argparse.SUPPRESS)
+    parser.add_argument("--rodada", type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.filho:
+        gravador(args.filho, args.rodada)
+        return
+
+    sorteio = random.Random(42)
+    with tempfile.TemporaryDirectory() as pasta:
+        popular(pasta, args.usuarios)
+        eventos = []
+        for rodada in range(args.rodadas):
+            novos = rodar(pasta, rodada, sorteio.uniform(0.3, 1.5))
+            eventos.extend(novos)
+            problemas = conferir(pasta, eventos)
+            print(
+                f"rodada {rodada + 1}/{args.rodadas}: "
+                f"{len(novos)} operações confirmadas antes do SIGKILL"
+            )
+            if problemas:
+                for problema in problemas:
+                    print("❌", problema)
+                sys.exit(1)
+
+    print(f"✔️ {args.rodadas} quedas simuladas, nenhum dado confirmado perdido.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Benchmark de memória do extrato: lista de tuplas x Extrato em colunas.
+
+Cada movimento na lista de tuplas guarda (str, Decimal, datetime); no
+Extrato são 1 + 8 + 8 + 8 bytes em arrays (tipo, centavos, micros e o saldo
+acumulado), cerca de 25 B. A memória é medida com tracemalloc.
+
+Execução (na raiz do repositório):
+    python -m benchmarks.memoria_extrato
+    python -m benchmarks.memoria_extrato 1000 100000
+"""
+
+import random
+import sys
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from bank_app_v3_0 import Extrato
+from benchmarks.comum import TIPOS
+
+TAMANHOS_PADRAO = (1_000, 10_000, 100_000, 1_000_000)
+
+
+def gerar_movimentos(qtd):
+    sorteio = random.Random(42)
+    inicio = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    for i in range(qtd):
+        tipo = sorteio.choice(TIPOS)
+        valor = Decimal(sorteio.randrange(1, 50_000)).scaleb(-2)
+        if tipo != "Depósito":
+            valor = -valor
+        yield tipo, valor, inicio + timedelta(seconds=i * 37)
+
+
+def medir(construir):
+    tracemalloc.start()
+    estrutura = construir()
+    atual, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del estrutura
+    return atual
+
+
+def main(tamanhos):
+    print(f"{'movimentos':>10} | {'lista de tuplas':>15} | {'Extrato':>12} | redução")
+    for qtd in tamanhos:
+        movimentos = list(gerar_movimentos(qtd))
+        # conta apenas o que a estrutura acrescenta além dos objetos de origem
+        em_tuplas = medir(
+            lambda: [(t, Decimal(str(v)), d + timedelta(0)) for t, v, d in movimentos]
+        )
+        em_colunas = medir(lambda: Extrato(movimentos))
+        print(
+            f"{qtd:>10,} | {em_tuplas / 2**20:>12.2f} MB | "
+            f"{em_colunas / 2**20:>9.2f} MB | {em_tuplas / em_colunas:>6.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    tamanhos = [int(n) for n in sys.argv[1:]] or TAMANHOS_PADRAO
+    main(tamanhos)
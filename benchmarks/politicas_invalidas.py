@@ -0,0 +1,107 @@
+"""
+Verificação do carregador de políticas do v3_0 contra arquivos inválidos.
+
+Cada caso é um JSON bem formado com o formato errado (seção que não é
+objeto, faixa que não é texto, limite NaN ou Infinity, ...). O arquivo é
+trocado como numa edição com o processo rodando e confere-se que:
+- `MotorPoliticas._ler` recusa o arquivo com ValueError;
+- `atualizar` não derruba o processo e mantém as políticas anteriores;
+- uma releitura que falhou é tentada de novo na verificação seguinte.
+Termina com código 1 na primeira divergência.
+
+Execução (na raiz do repositório):
+    python -m benchmarks.politicas_invalidas
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+from decimal import Decimal
+
+from bank_app_v3_0 import ConfigBanco, MotorPoliticas
+
+ID_CONTA = "12345678909-0001-1"
+VALIDO = '{"padrao": {"limite_saque": "700.00"}}'
+INVALIDOS = {
+    "seção agencias como lista": '{"agencias": []}',
+    "seção faixas como texto": '{"faixas": "premium"}',
+    "seção contas como número": '{"contas": 5}',
+    "seção padrao como lista": '{"padrao": []}',
+    "faixa como número": '{"faixas": {"premium": 5}}',
+    "faixa da conta como número": '{"contas": {"%s": 5}}' % ID_CONTA,
+    "faixa da conta como lista": '{"contas": {"%s": ["premium"]}}' % ID_CONTA,
+    "limite NaN (texto)": '{"padrao": {"limite_saque": "NaN"}}',
+    "limite NaN (literal)": '{"padrao": {"limite_saque": NaN}}',
+    "limite Infinity": '{"padrao": {"limite_saque": "Infinity"}}',
+    "limite -Infinity (literal)": '{"padrao": {"valor_sacar_plus": -Infinity}}',
+    "arquivo como lista": "[]",
+}
+
+
+def trocar(arq, texto):
+    """Troca o arquivo por outro (novo inode), como um editor faria."""
+    with open(arq + ".tmp", "w", encoding="utf-8") as f:
+        f.write(texto)
+    os.replace(arq + ".tmp", arq)
+
+
+def limite(motor):
+    return motor.politica(ConfigBanco.agencia_padrao(), ID_CONTA).limite_saque
+
+
+def main():
+    falhas = []
+    with tempfile.TemporaryDirectory() as pasta:
+        arq = os.path.join(pasta, "politicas_banco.json")
+        ConfigBanco._INTERVALO_POLITICAS = 0.0
+        trocar(arq, VALIDO)
+        motor = MotorPoliticas(arq)
+        if limite(motor) != Decimal("700.00"):
+            falhas.append("política válida não carregada")
+
+        for caso, texto in INVALIDOS.items():
+            trocar(arq, texto)
+            try:
+                motor._ler()
+                falhas.append(f"{caso}: aceito")
+            except ValueError:
+                pass
+            except Exception as e:
+                falhas.append(f"{caso}: {type(e).__name__} em vez de ValueError")
+            saida = io.StringIO()
+            try:
+                with contextlib.redirect_stdout(saida):
+                    motor.atualizar()
+            except Exception as e:
+                falhas.append(f"{caso}: atualizar levantou {type(e).__name__}")
+                continue
+            if "❌" not in saida.getvalue():
+                falhas.append(f"{caso}: erro não informado")
+            if limite(motor) != Decimal("700.00"):
+                falhas.append(f"{caso}: política anterior perdida")
+
+        # falha passageira na leitura: o mesmo arquivo é relido depois
+        trocar(arq, '{"padrao": {"limite_saque": "800.00"}}')
+
+        def ler_interrompido():
+            raise OSError("leitura interrompida")
+
+        motor._ler = ler_interrompido
+        with contextlib.redirect_stdout(io.StringIO()):
+            motor.atualizar()
+        del motor._ler  # volta o método da classe
+        motor.atualizar()
+        if limite(motor) != Decimal("800.00"):
+            falhas.append("releitura após falha não foi tentada de novo")
+
+    for falha in falhas:
+        print(f"❌ {falha}")
+    if falhas:
+        sys.exit(1)
+    print(f"✔️ {len(INVALIDOS)} arquivos inválidos recusados, políticas mantidas")
+
+
+if __name__ == "__main__":
+    main()
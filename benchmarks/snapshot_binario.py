@@ -0,0 +1,69 @@
+"""
+Benchmark de partida a frio: snapshot JSON x snapshot binário (v3_0).
+
+Gera um arquivo de transações sintético de ~N MB e mede, cada um em um
+processo novo (sem caches do interpretador):
+- json: abrir o armazenamento e carregar a primeira conta (parse completo);
+- conversão: JSON → `.bin` (feita uma única vez, na primeira abertura);
+- binario: abrir o armazenamento (mmap) e carregar a primeira conta.
+Também informa o pico de memória (RSS) de cada processo.
+
+Execução (na raiz do repositório):
+    python -m benchmarks.snapshot_binario
+    python -m benchmarks.snapshot_binario --mb 1000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from bank_app_v3_0 import ConfigBanco, gravar_json_atomico
+
+from benchmarks.codec_persistencia import gerar_snapshot
+from benchmarks.comum import configurar, conta_do_id, em_processo_novo, pico_rss_mb
+
+
+def partida(pasta, formato, id_conta):
+    """Abre o armazenamento e carrega uma conta → (segundos, pico de RSS em MB)."""
+    configurar(pasta, formato_snapshot=formato)
+    inicio = time.perf_counter()
+    conta = conta_do_id(id_conta)
+    conta.carregar_bd_conta()
+    duracao = time.perf_counter() - inicio
+    assert len(conta._extrato) > 0
+    return duracao, pico_rss_mb()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--mb", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        contas = gerar_snapshot(args.mb)
+        ultima = max(contas)
+        configurar(pasta)
+        arq_json = ConfigBanco.arquivo_transacoes()
+        gravar_json_atomico(arq_json, contas)
+        del contas
+
+        t_json, rss_json = em_processo_novo(partida, pasta, "json", ultima)
+        t_conversao, rss_conversao = em_processo_novo(partida, pasta, "binario", ultima)
+        t_binario, rss_binario = em_processo_novo(partida, pasta, "binario", ultima)
+
+        tamanho_json = os.path.getsize(arq_json)
+        tamanho_bin = os.path.getsize(os.path.splitext(arq_json)[0] + ".bin")
+        print(f"snapshot JSON: {tamanho_json / 2**20:,.1f} MB")
+        print(f"snapshot binário: {tamanho_bin / 2**20:,.1f} MB\n")
+        print(f"{'partida + 1ª conta':>26} | {'tempo':>10} | {'pico RSS':>10}")
+        for nome, tempo, rss in (
+            ("json", t_json, rss_json),
+            ("conversão para binário", t_conversao, rss_conversao),
+            ("binario", t_binario, rss_binario),
+        ):
+            print(f"{nome:>26} | {tempo * 1e3:>7.1f} ms | {rss:>7.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+"""
+Suíte de benchmarks dos motores do banco (v2_2, v3_0, ...).
+
+Gera um banco sintético (`gerar_banco_sintetico`: N usuários, M contas por
+usuário, K movimentos por conta, no formato JSON dos arquivos de dados)
+e mede cada motor, cada cenário em um processo novo sobre uma cópia dos
+dados:
+- partida: carregar o cadastro e a primeira conta (partida a frio);
+- operacoes: depósitos e saques em memória (ops/s);
+- salvar: latência de gravação após cada depósito (p50/p99);
+- extrato: exibir o extrato da conta (saída descartada).
+Cada cenário também informa o pico de memória (RSS) do processo.
+
+Os resultados saem em tabela e, com `--saida`, em JSON (parâmetros,
+ambiente e métricas por motor/cenário). `--comparar anterior.json` marca as
+métricas que pioraram mais que `--tolerancia` em relação a outra execução.
+Para medir um motor novo, registre um adaptador em `MOTORES`.
+
+Execução (na raiz do repositório):
+    python -m benchmarks.suite
+    python -m benchmarks.suite --usuarios 5000 --movimentos 500 --saida v3.json
+    python -m benchmarks.suite --motores v3_0 --comparar v3.json
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from benchmarks.comum import em_processo_novo, pico_rss_mb
+from gerar_banco_sintetico import gerar_banco
+
+VALOR = Decimal("10.50")
+# métricas em que maior é melhor (as demais: menor é melhor)
+MAIOR_MELHOR = {"ops_s"}
+
+
+class MotorV22:
+    """Funções do v2_2: listas e tuplas, arquivo reescrito a cada gravação."""
+
+    def __init__(self, pasta, conta):
+        import bank_app_v2_2 as v2
+
+        self.v2 = v2
+        self.arq_contas = os.path.join(pasta, "contas_bancarias.json")
+        self.arq_transacoes = os.path.join(pasta, "transacoes_bancarias.json")
+        self.conta = conta
+
+    def partida(self):
+        self.v2.carregar_dados_bancarios(self.arq_contas)
+        self.estado = list(
+            self.v2.carregar_dados_transacoes(*self.conta, self.arq_transacoes)
+        )
+
+    def operacoes(self, qtd):
+        ultimo_dia, saldo, plus, operacoes, saques, extrato = self.estado
+        saldo += VALOR * qtd
+        for i in range(qtd):
+            if i % 2:
+                saldo, extrato, saques, operacoes, _ = self.v2.sacar(
+                    valor=VALOR,
+                    saldo=saldo,
+                    limite_saque=self.v2.limite_saque,
+                    numero_saques=saques,
+                    extrato=extrato,
+                    numero_operacoes=operacoes,
+                    saques_diarios=qtd,
+                    valor_sacar_plus=self.v2.valor_sacar_plus,
+                )
+            else:
+                saldo, extrato, operacoes, _ = self.v2.depositar(
+                    VALOR, saldo, extrato, operacoes
+                )
+        self.estado = [ultimo_dia, saldo, plus, operacoes, saques, extrato]
+
+    def salvar(self):
+        ultimo_dia, saldo, plus, operacoes, saques, extrato = self.estado
+        saldo, extrato, operacoes, _ = self.v2.depositar(
+            VALOR, saldo, extrato, operacoes
+        )
+        self.estado = [ultimo_dia, saldo, plus, operacoes, saques, extrato]
+        inicio = time.perf_counter()
+        self.v2.armazenar_dados_transacoes(
+            *self.conta, *self.estado, self.arq_transacoes
+        )
+        return time.perf_counter() - inicio
+
+    def extrato(self):
+        _, saldo, _, operacoes, saques, extrato = self.estado
+        self.v2.exibir_extrato(
+            extrato,
+            saldo,
+            operacoes,
+            self.v2.operacoes_diarias,
+            saques,
+            self.v2.saques_diarios,
+        )
+
+
+class MotorV30:
+    """Motor v3_0 (backend JSON com journal), pela API usada pela CLI."""
+
+    def __init__(self, pasta, conta):
+        from benchmarks.comum import configurar
+
+        configurar(pasta)
+        self.conta = conta
+
+    def partida(self):
+        from bank_app_v3_0 import DadosBanco
+
+        self.banco = DadosBanco()
+        _, self.objeto = self.banco.acessar_conta(*self.conta)
+
+    def operacoes(self, qtd):
+        from bank_app_v3_0 import Deposito, Saque
+        from benchmarks.comum import limites_altos
+
+        conta = self.objeto
+        limites_altos(qtd, conta)
+        saldo, linhas = conta.saldo_atual(), len(conta._extrato)
+        conta.registrar_transacao(Deposito(VALOR * qtd))
+        for i in range(qtd):
+            conta.registrar_transacao(Saque(VALOR) if i % 2 else Deposito(VALOR))
+        # toda operação cronometrada precisa ter acontecido
+        esperado = saldo + VALOR * (qtd + qtd % 2)
+        if (conta.saldo_atual(), len(conta._extrato)) != (esperado, linhas + qtd + 1):
+            raise RuntimeError(
+                f"❌ v3_0 recusou operações: saldo {conta.saldo_atual()} "
+                f"(esperado {esperado}), {len(conta._extrato) - linhas - 1} "
+                f"de {qtd} movimentos"
+            )
+
+    def salvar(self):
+        from bank_app_v3_0 import Deposito
+
+        self.objeto.operar(Deposito(VALOR))
+        inicio = time.perf_counter()
+        self.objeto.salvar_bd_conta()
+        return time.perf_counter() - inicio
+
+    def extrato(self):
+        self.objeto.exibir_extrato()
+
+
+MOTORES = {"v2_2": MotorV22, "v3_0": MotorV30}
+
+
+def medir(motor, pasta, conta, cenario, qtd):
+    """Roda um cenário em um processo novo → {métrica: valor}."""
+    inicio = time.perf_counter()
+    instancia = MOTORES[motor](pasta, conta)
+    instancia.partida()
+    t_partida = time.perf_counter() - inicio
+    if cenario == "partida":
+        return {"segundos": t_partida, "pico_rss_mb": pico_rss_mb()}
+    if cenario == "operacoes":
+        inicio = time.perf_counter()
+        instancia.operacoes(qtd)
+        duracao = time.perf_counter() - inicio
+        return {"ops_s": qtd / duracao, "pico_rss_mb": pico_rss_mb()}
+    if cenario == "salvar":
+        latencias = sorted(instancia.salvar() for _ in range(qtd))
+        return {
+            "p50_ms": latencias[len(latencias) // 2] * 1e3,
+            "p99_ms": latencias[min(len(latencias) - 1, len(latencias) * 99 // 100)]
+            * 1e3,
+            "pico_rss_mb": pico_rss_mb(),
+        }
+    with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+        inicio = time.perf_counter()
+        instancia.extrato()
+        duracao = time.perf_counter() - inicio
+    return {"segundos": duracao, "pico_rss_mb": pico_rss_mb()}
+
+
+def comparar(resultados, anteriores, tolerancia):
+    """Linhas (motor, cenário, métrica, antes, agora, variação, piorou)."""
+    linhas = []
+    for motor, cenarios in resultados.items():
+        for cenario, metricas in cenarios.items():
+            for metrica, valor in metricas.items():
+                antes = anteriores.get(motor, {}).get(cenario, {}).get(metrica)
+                if not antes:
+                    continue
+                variacao = valor / antes - 1
+                piorou = (
+                    variacao < -tolerancia
+                    if metrica in MAIOR_MELHOR
+                    else variacao > tolerancia
+                )
+                linhas.append((motor, cenario, metrica, antes, valor, variacao, piorou))
+    return linhas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--usuarios", type=int, default=1000)
+    parser.add_argument("--contas", type=int, default=2, help="contas por usuário")
+    parser.add_argument("--movimentos", type=int, default=200, help="por conta")
+    parser.add_argument("--operacoes", type=int, default=20_000)
+    parser.add_argument("--gravacoes", type=int, default=50)
+    parser.add_argument("--motores", nargs="+", choices=MOTORES, default=list(MOTORES))
+    parser.add_argument("--saida", help="arquivo JSON com os resultados")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior")
+    parser.add_argument("--tolerancia", type=float, default=0.10)
+    args = parser.parse_args()
+
+    cenarios = {
+        "partida": 0,
+        "operacoes": args.operacoes,
+        "salvar": args.gravacoes,
+        "extrato": 0,
+    }
+    resultados = {}
+    with tempfile.TemporaryDirectory() as base:
+        origem = os.path.join(base, "origem")
+        totais = gerar_banco(origem, args.usuarios, args.contas, args.movimentos)
+        conta = totais["primeira"]
+        tamanho = os.path.getsize(os.path.join(origem, "transacoes_bancarias.json"))
+        print(
+            f"{args.usuarios:,} usuários, {totais['contas']:,} contas, "
+            f"{args.movimentos} movimentos por conta "
+            f"(transações: {tamanho / 2**20:,.1f} MB)\n"
+        )
+        print(f"{'motor':>6} | {'cenário':>10} | métricas")
+        for motor in args.motores:
+            resultados[motor] = {}
+            for cenario, qtd in cenarios.items():
+                pasta = os.path.join(base, f"{motor}-{cenario}")
+                shutil.copytree(origem, pasta)
+                metricas = em_processo_novo(medir, motor, pasta, conta, cenario, qtd)
+                shutil.rmtree(pasta)
+                resultados[motor][cenario] = metricas
+                texto = ", ".join(f"{m}={v:,.3f}" for m, v in metricas.items())
+                print(f"{motor:>6} | {cenario:>10} | {texto}")
+
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "data": datetime.now(timezone.utc).isoformat(),
+                    "ambiente": {
+                        "python": platform.python_version(),
+                        "plataforma": platform.platform(),
+                        "cpus": os.cpu_count(),
+                    },
+                    "parametros": {
+                        chave: valor
+                        for chave, valor in vars(args).items()
+                        if chave not in ("saida", "comparar")
+                    },
+                    "resultados": resultados,
+                },
+                f,
+                indent=2,
+                ensure_ascii=False,
+            )
+        print(f"\n✔️ Resultados gravados em {args.saida}.")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            anteriores = json.load(f)["resultados"]
+        linhas = comparar(resultados, anteriores, args.tolerancia)
+        print(f"\ncomparação com {args.comparar} (tolerância {args.tolerancia:.0%})")
+        for motor, cenario, metrica, antes, agora, variacao, piorou in linhas:
+            marca = "❌" if piorou else "✔️"
+            print(
+                f"{marca} {motor:>6} | {cenario:>10} | {metrica:>12} | "
+                f"{antes:>12,.3f} → {agora:>12,.3f} ({variacao:+.1%})"
+            )
+        if any(linha[-1] for linha in linhas):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Microbenchmark do caminho quente das transações do v3_0.
+
+Mede operações por segundo de `Conta.registrar_transacao` em laços de
+depósito e de saque, em memória (sem persistência). Os limites diários são
+elevados para que o laço nunca caia nas ofertas Plus. Mede com as métricas
+desligadas (padrão) e ligadas (`ConfigBanco._METRICAS`), para conferir o
+custo da instrumentação.
+
+Execução (na raiz do repositório):
+    python -m benchmarks.transacoes
+    python -m benchmarks.transacoes 500000
+"""
+
+import sys
+import time
+from decimal import Decimal
+
+from bank_app_v3_0 import ConfigBanco, Deposito, Saque
+from benchmarks.comum import conta_em_memoria, limites_altos
+
+OPERACOES_PADRAO = 200_000
+
+
+def medir(qtd, transacao, valor):
+    conta = conta_em_memoria()
+    conta.registrar_transacao(Deposito(Decimal(qtd) * 100))
+    inicio = time.perf_counter()
+    for _ in range(qtd):
+        conta.registrar_transacao(transacao(valor))
+    return qtd / (time.perf_counter() - inicio)
+
+
+def main(qtd):
+    limites_altos(qtd)
+    valor = Decimal("10.50")
+    metricas = ConfigBanco.metricas()
+    print(f"{'operação':>10} | {'ops/s':>12} | {'com métricas':>12}")
+    for nome, transacao in (("depósito", Deposito), ("saque", Saque)):
+        metricas.ativa = False
+        sem = medir(qtd, transacao, valor)
+        metricas.ativa = True
+        com = medir(qtd, transacao, valor)
+        print(f"{nome:>10} | {sem:>12,.0f} | {com:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else OPERACOES_PADRAO)
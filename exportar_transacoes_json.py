@@ -0,0 +1,68 @@
+"""
+Exporta as transações do v3_0 para o formato JSON clássico.
+
+Lê o snapshot (JSON ou binário, conforme `ConfigBanco._FORMATO_SNAPSHOT`) e
+a cauda do journal de cada shard e grava um único arquivo no formato de
+`transacoes_bancarias.json`, uma conta por linha, sem montar o dict inteiro
+em memória. A troca do destino é atômica.
+
+Execução:
+    python exportar_transacoes_json.py [destino.json]
+
+Para voltar ao snapshot JSON, exporte para `transacoes_bancarias.json` e
+use `ConfigBanco._FORMATO_SNAPSHOT = "json"` (sem shards).
+"""
+
+import os
+import sys
+import tempfile
+
+from bank_app_v3_0 import ArmazenamentoJSON, ConfigBanco, Extrato, fsync_diretorio
+
+
+def exportar(destino):
+    origem = ArmazenamentoJSON(
+        ConfigBanco.arquivo_contas(),
+        ConfigBanco.arquivo_transacoes(),
+        ConfigBanco.arquivo_journal(),
+        ConfigBanco.arquivo_trava(),
+        ConfigBanco.shards_transacoes(),
+    )
+    codec = ConfigBanco.codec()
+    pasta = os.path.dirname(os.path.abspath(destino))
+    fd, temp = tempfile.mkstemp(
+        prefix=os.path.basename(destino) + ".", suffix=".tmp", dir=pasta
+    )
+    total_contas = total_movimentos = 0
+    try:
+        with os.fdopen(fd, "wb") as f:
+            separador = b"{\n"
+            for indice in range(origem.quantidade_shards()):
+                contas = origem.carregar_shard(indice)
+                ler = getattr(contas, "consultar", contas.__getitem__)
+                for id_conta in contas:
+                    conta = ler(id_conta)
+                    if isinstance(conta["extrato"], Extrato):
+                        conta = {**conta, "extrato": conta["extrato"].linhas()}
+                    f.write(separador + codec.codificar(id_conta) + b": ")
+                    f.write(codec.codificar(conta, compacto=True))
+                    separador = b",\n"
+                    total_contas += 1
+                    total_movimentos += len(conta["extrato"])
+            f.write(b"{}\n" if separador == b"{\n" else b"\n}\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(temp, 0o644)
+        os.replace(temp, destino)
+    except BaseException:
+        os.remove(temp)
+        raise
+    fsync_diretorio(pasta)
+    print(
+        f"✔️ Exportadas {total_contas} contas e {total_movimentos} "
+        f"movimentações para {destino}."
+    )
+
+
+if __name__ == "__main__":
+    exportar(sys.argv[1] if len(sys.argv) > 1 else "transacoes_exportadas.json")
@@ -0,0 +1,153 @@
+"""
+Fechamento diário do v3_0: vira o dia de todas as contas de uma vez.
+
+Os contadores diários (operações, saques, transação plus) só são zerados
+quando a conta é acessada; contas paradas ficam com contadores e
+`ultimo_dia` antigos no disco. Este lote percorre todas as contas
+cadastradas em processos paralelos e:
+- zera os contadores de quem ainda não virou o dia, gravando os registros
+  em lote (um anexo e um fsync por lote de contas, por shard);
+- compacta os shards tocados, o que grava no snapshot o saldo acumulado e
+  os agregados diários do extrato (snapshot binário);
+- informa a vazão em contas por segundo.
+Os ids saem do cadastro em fluxo, em lotes de uma só partição
+(`Armazenamento.particao`, o shard da conta): cada lote grava em um único
+journal, e só alguns lotes ficam na fila dos processos por vez. Pode rodar
+com a CLI e o servidor no ar: cada lote segura as travas das suas contas,
+pedidas sempre na mesma ordem (a do byte travado), e quem tiver a conta em
+memória a recarrega pela versão.
+
+Execução:
+    python fechamento_diario.py [--processos 4] [--lote 1000]
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import ExitStack
+from datetime import date
+
+from bank_app_v3_0 import ArmazenamentoJSON, ConfigBanco, TravaArquivo
+
+
+def registro_virada(id_conta, conta, hoje):
+    """Registro do journal que vira o dia da conta persistida, ou None."""
+    if not conta or date.fromisoformat(conta["ultimo_dia"]) >= hoje:
+        return None
+    return {
+        "id": id_conta,
+        "ultimo_dia": hoje.isoformat(),
+        "saldo": conta["saldo"],
+        "transacao_plus": 0,
+        "numero_operacoes": 0,
+        "numero_saques": 0,
+        "versao": conta.get("versao", 0) + 1,
+        "inicio": len(conta["extrato"]),
+        "extrato": [],
+    }
+
+
+def iniciar_processo():
+    # backend próprio do processo, aberto uma vez: as travas `fcntl` não
+    # excluem duas instâncias do mesmo processo
+    ConfigBanco._armazenamento = None
+
+
+def ordem_travas(id_conta):
+    return TravaArquivo.chave_conta(id_conta), id_conta
+
+
+def fechar_contas(ids, hoje):
+    """Vira o dia de um lote de contas → (contas lidas, contas viradas)."""
+    armazenamento = ConfigBanco.armazenamento()
+    # travas na ordem dos bytes travados, a mesma em todo processo do
+    # fechamento: dois lotes nunca esperam um pelo outro em ciclo
+    ids = sorted(ids, key=ordem_travas)
+    with ExitStack() as travas:
+        for id_conta in ids:
+            travas.enter_context(armazenamento.travar_conta(id_conta))
+        registros = []
+        for id_conta, conta in armazenamento.carregar_lote(ids).items():
+            registro = registro_virada(id_conta, conta, hoje)
+            if registro is not None:
+                registros.append(registro)
+        if registros:
+            armazenamento.salvar_contas(registros)
+    return len(ids), len(registros)
+
+
+def compactar(particoes):
+    ConfigBanco.armazenamento().compactar(esperar=True, shards=set(particoes))
+
+
+def ids_contas(usuarios):
+    for cpf, usuario in usuarios.items():
+        for conta in usuario.get("contas", []):
+            yield f"{cpf}-{conta['agencia']}-{conta['numero_conta']}"
+
+
+def lotes(armazenamento, usuarios, lote):
+    """
+    Lotes (partição, ids) em fluxo: cada lote fica em uma só partição e sai
+    assim que enche, sem montar antes a lista de todas as contas.
+    """
+    abertos = {}
+    for id_conta in ids_contas(usuarios):
+        particao = armazenamento.particao(id_conta)
+        ids = abertos.setdefault(particao, [])
+        ids.append(id_conta)
+        if len(ids) >= lote:
+            yield particao, abertos.pop(particao)
+    yield from abertos.items()
+
+
+def fechar_dia(processos, lote):
+    armazenamento = ConfigBanco.armazenamento()
+    usuarios = armazenamento.carregar_usuarios()
+    hoje = date.today()
+
+    inicio = time.perf_counter()
+    resultados = []
+    particoes = set()
+    with ProcessPoolExecutor(processos, initializer=iniciar_processo) as pool:
+        # poucos lotes na fila: a memória não cresce com o número de contas
+        pendentes = set()
+        for particao, ids in lotes(armazenamento, usuarios, lote):
+            particoes.add(particao)
+            if len(pendentes) >= 2 * processos:
+                prontos, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+                resultados += [futuro.result() for futuro in prontos]
+            pendentes.add(pool.submit(fechar_contas, ids, hoje))
+        resultados += [futuro.result() for futuro in pendentes]
+        t_virada = time.perf_counter() - inicio
+        if isinstance(armazenamento, ArmazenamentoJSON):
+            particoes = sorted(particoes)
+            grupos = [particoes[i::processos] for i in range(processos)]
+            list(pool.map(compactar, [grupo for grupo in grupos if grupo]))
+    duracao = time.perf_counter() - inicio
+
+    lidas = sum(lidas for lidas, _ in resultados)
+    viradas = sum(viradas for _, viradas in resultados)
+    print(
+        f"✔️ Fechamento de {hoje.strftime('%d/%m/%Y')}: {lidas} contas, "
+        f"{viradas} com contadores zerados, em {duracao:.2f} s "
+        f"({processos} processos)."
+    )
+    print(
+        f"Virada: {t_virada:.2f} s ({lidas / max(t_virada, 1e-9):,.0f} contas/s); "
+        f"compactação: {duracao - t_virada:.2f} s."
+    )
+    return lidas, viradas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--processos", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--lote", type=int, default=1000, help="contas por gravação")
+    args = parser.parse_args()
+    fechar_dia(max(1, args.processos), max(1, args.lote))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,322 @@
+"""
+Banco sintético em escala (milhões de usuários) para testes locais.
+
+Gera N usuários com CPFs válidos (dígitos verificadores, aceitos por
+`checar_limpar_cpf`), M contas por usuário numeradas em sequência na agência
+padrão e K movimentos por conta: depósitos, saques, tarifas Plus e
+impressões de extrato em datas crescentes, com o saldo igual à soma do
+extrato. Mesma semente, mesmos dados.
+
+Destinos (`--destino`), nos nomes de arquivo que o v3_0 abre:
+- json: `contas_bancarias.json` e `transacoes_bancarias.json` (o layout do
+  v2_2 e do v3_0) ou, com `--shards N`, os snapshots da pasta
+  `transacoes_bancarias/` (com o manifesto `shards.json`);
+- binario: o mesmo cadastro e o snapshot binário `transacoes_bancarias.bin`
+  (ou um `.bin` por shard), já com acumulados e agregados;
+- sqlite: `banco.sqlite3`, uma transação a cada `--lote` usuários.
+Tudo é gravado em fluxo, usuário a usuário, sem montar os dicts: a memória
+do gerador não cresce com o banco (o índice do snapshot binário vai para
+disco quando cresce). Ao fim, informa o tempo, a vazão e o pico de memória.
+
+Execução:
+    python gerar_banco_sintetico.py pasta --usuarios 1000000 --movimentos 100
+    python gerar_banco_sintetico.py pasta --destino binario --shards 16
+    python gerar_banco_sintetico.py pasta --destino sqlite --contas 2
+
+Para abrir o banco gerado, rode o v3_0 dentro da pasta com a mesma
+configuração (`ConfigBanco._FORMATO_SNAPSHOT = "binario"`,
+`_SHARDS_TRANSACOES = N` ou `_ARMAZENAMENTO = "sqlite"`).
+"""
+
+import argparse
+import os
+import random
+import resource
+import time
+from contextlib import ExitStack
+from datetime import date, datetime, timedelta, timezone
+
+from bank_app_v3_0 import (
+    ArmazenamentoJSON,
+    ArmazenamentoSQLite,
+    ConfigBanco,
+    SnapshotBinario,
+    fsync_diretorio,
+)
+
+# tipo, peso no sorteio e faixa de valor em centavos (tarifas: valor fixo)
+MOVIMENTOS = (
+    ("Depósito", 45, (1_000, 300_000)),
+    ("Saque", 40, (1_000, 50_000)),
+    ("Saque Plus", 4, (1_000, 50_000)),
+    ("Transação Plus", 4, (25, 25)),
+    ("Imprimir Extrato", 7, (0, 0)),
+)
+DESTINOS = ("json", "binario", "sqlite")
+
+
+def cpf_valido(base):
+    """CPF de 11 dígitos a partir de um número de até 9 dígitos."""
+    digitos = [int(c) for c in f"{base:09d}"]
+    for tamanho in (9, 10):
+        soma = sum(d * peso for d, peso in zip(digitos, range(tamanho + 1, 1, -1)))
+        digitos.append(soma * 10 % 11 % 10)
+    return "".join(map(str, digitos))
+
+
+def texto_valor(centavos):
+    sinal = "-" if centavos < 0 else ""
+    return f"{sinal}{abs(centavos) // 100}.{abs(centavos) % 100:02d}"
+
+
+def gerar_extrato(sorteio, movimentos, fim):
+    """(linhas do extrato, saldo em centavos), terminando antes de `fim`."""
+    tipos = [tipo for tipo, _, _ in MOVIMENTOS]
+    pesos = [peso for _, peso, _ in MOVIMENTOS]
+    faixas = {tipo: faixa for tipo, _, faixa in MOVIMENTOS}
+    # um movimento a cada ~8 h em média, do mais antigo ao mais recente
+    instante = fim - timedelta(hours=8 * movimentos)
+    saldo = 0
+    linhas = []
+    for _ in range(movimentos):
+        instante += timedelta(seconds=sorteio.randrange(1, 16 * 3600))
+        tipo = sorteio.choices(tipos, pesos)[0]
+        centavos = sorteio.randint(*faixas[tipo])
+        if tipo != "Depósito":
+            if centavos > saldo:  # sem saldo: vira depósito
+                tipo = "Depósito"
+            else:
+                centavos = -centavos
+        saldo += centavos
+        data = instante.isoformat()
+        linhas.append((tipo, texto_valor(centavos), data))
+        if tipo == "Saque Plus":
+            saldo -= 50
+            linhas.append(("Taxa Saque Plus", texto_valor(-50), data))
+    return linhas, saldo
+
+
+def gerar_usuarios(
+    usuarios, contas_por_usuario=1, movimentos=100, semente=42, primeiro=1
+):
+    """
+    Usuários em fluxo → (usuário, [(id da conta, dados da conta)]), em ordem
+    crescente de CPF e, dentro do usuário, de id (a ordem do snapshot
+    binário). Até 100 milhões de usuários por semente.
+    """
+    sorteio = random.Random(semente)
+    fim = datetime.now(timezone.utc).replace(microsecond=0)
+    ontem = (date.today() - timedelta(days=1)).isoformat()
+    agencia = ConfigBanco.agencia_padrao()
+    base = 100_000_000 + semente % 800 * 1_000_000
+    numero = primeiro
+    for i in range(usuarios):
+        cpf = cpf_valido(base + i)
+        numeros = range(numero, numero + contas_por_usuario)
+        numero += contas_por_usuario
+        contas = []
+        for nro_conta in numeros:
+            extrato, saldo = gerar_extrato(sorteio, movimentos, fim)
+            dados = {
+                "ultimo_dia": ontem,
+                "saldo": texto_valor(saldo),
+                "transacao_plus": 0,
+                "numero_operacoes": 0,
+                "numero_saques": 0,
+                "extrato": extrato,
+            }
+            contas.append((f"{cpf}-{agencia}-{nro_conta}", dados))
+        usuario = {
+            "cpf": cpf,
+            "nome": f"Cliente Sintético {i + 1}",
+            "data_nascimento": "01/01/1990",
+            "endereco": f"Rua {i % 500 + 1}, {i % 97 + 1} - Centro - Cidade/UF",
+            "contas": [
+                {"agencia": agencia, "numero_conta": nro_conta} for nro_conta in numeros
+            ],
+        }
+        contas.sort()  # "…-10" antes de "…-9"
+        yield usuario, contas
+
+
+class EscritorJSON:
+    """Objeto JSON gravado entrada a entrada, no layout dos arquivos de dados
+    (indentado ou compacto, conforme `ConfigBanco._JSON_COMPACTO`)."""
+
+    def __init__(self, arq):
+        self._f = open(arq, "wb")
+        self._codec = ConfigBanco.codec()
+        self._compacto = ConfigBanco.json_compacto()
+        self._quebra = b"" if self._compacto else b"\n"
+        self._vazio = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, *_):
+        if tipo is None:
+            self.fechar()
+        else:
+            self._f.close()
+
+    def escrever(self, chave, valor):
+        dados = self._codec.codificar({chave: valor}, self._compacto)
+        # sem as chaves externas: a entrada vai para dentro do objeto aberto
+        self._f.write(b"{" if self._vazio else b",")
+        self._f.write(self._quebra + dados.strip()[1:-1].strip(b"\n"))
+        self._vazio = False
+
+    def fechar(self):
+        self._f.write(b"{}\n" if self._vazio else self._quebra + b"}\n")
+        self._f.flush()
+        os.fsync(self._f.fileno())
+        self._f.close()
+
+
+class DestinoArquivos:
+    """Cadastro JSON e snapshots (JSON ou binários, únicos ou em shards)."""
+
+    def __init__(self, pasta, binario=False, shards=1):
+        self._pilha = ExitStack()
+        self._usuarios = self._pilha.enter_context(
+            EscritorJSON(
+                os.path.join(pasta, os.path.basename(ConfigBanco.arquivo_contas()))
+            )
+        )
+        arq = os.path.join(pasta, os.path.basename(ConfigBanco.arquivo_transacoes()))
+        if shards > 1:
+            pasta_shards = os.path.splitext(arq)[0]
+            os.makedirs(pasta_shards, exist_ok=True)
+            # o v3_0 recusa abrir a pasta com outra quantidade de shards
+            ArmazenamentoJSON.gravar_manifesto(pasta_shards, shards)
+            arquivos = [
+                os.path.join(pasta_shards, f"shard_{i:03d}.json") for i in range(shards)
+            ]
+        else:
+            arquivos = [arq]
+        # função que grava uma conta em cada snapshot
+        if binario:
+            self._snapshots = [
+                self._pilha.enter_context(
+                    SnapshotBinario.escritor(os.path.splitext(arq)[0] + ".bin")
+                )
+                for arq in arquivos
+            ]
+        else:
+            self._snapshots = [
+                self._pilha.enter_context(EscritorJSON(arq)).escrever
+                for arq in arquivos
+            ]
+
+    def adicionar(self, usuario, contas):
+        self._usuarios.escrever(usuario["cpf"], usuario)
+        for id_conta, dados in contas:
+            shard = ArmazenamentoJSON._indice_shard(id_conta, len(self._snapshots))
+            self._snapshots[shard](id_conta, dados)
+
+    def fechar(self):
+        self._pilha.close()
+
+
+class DestinoSQLite:
+    """`ArmazenamentoSQLite.importar` a cada `lote` usuários (uma transação)."""
+
+    def __init__(self, pasta, lote=10_000):
+        arq = os.path.join(pasta, os.path.basename(ConfigBanco.arquivo_sqlite()))
+        self._sqlite = ArmazenamentoSQLite(arq)
+        self._lote = lote
+        self._usuarios = {}
+        self._contas = {}
+
+    def adicionar(self, usuario, contas):
+        self._usuarios[usuario["cpf"]] = usuario
+        self._contas.update(contas)
+        if len(self._usuarios) >= self._lote:
+            self._gravar()
+
+    def _gravar(self):
+        if self._usuarios:
+            self._sqlite.importar(self._usuarios, self._contas)
+        self._usuarios, self._contas = {}, {}
+
+    def fechar(self):
+        self._gravar()
+        self._sqlite.fechar()
+
+
+def gerar_banco(
+    pasta,
+    usuarios,
+    contas_por_usuario=1,
+    movimentos=100,
+    semente=42,
+    destino="json",
+    shards=1,
+    lote=10_000,
+):
+    """Grava o banco em `pasta` → totais (usuários, contas, movimentos) e a
+    primeira conta (cpf, agência, número)."""
+    os.makedirs(pasta, exist_ok=True)
+    if destino == "sqlite":
+        saida = DestinoSQLite(pasta, lote)
+    else:
+        saida = DestinoArquivos(pasta, destino == "binario", shards)
+    totais = {"usuarios": 0, "contas": 0, "movimentos": 0, "primeira": None}
+    for usuario, contas in gerar_usuarios(
+        usuarios, contas_por_usuario, movimentos, semente
+    ):
+        saida.adicionar(usuario, contas)
+        totais["usuarios"] += 1
+        totais["contas"] += len(contas)
+        totais["movimentos"] += sum(len(dados["extrato"]) for _, dados in contas)
+        if totais["primeira"] is None and contas:
+            primeira = usuario["contas"][0]
+            totais["primeira"] = (
+                usuario["cpf"],
+                primeira["agencia"],
+                primeira["numero_conta"],
+            )
+    saida.fechar()
+    fsync_diretorio(pasta)
+    return totais
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("pasta")
+    parser.add_argument("--usuarios", type=int, default=1000)
+    parser.add_argument("--contas", type=int, default=1, help="contas por usuário")
+    parser.add_argument("--movimentos", type=int, default=100, help="por conta")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--destino", choices=DESTINOS, default="json")
+    parser.add_argument("--shards", type=int, default=1, help="json/binario")
+    parser.add_argument("--lote", type=int, default=10_000, help="sqlite")
+    args = parser.parse_args()
+    if args.destino == "sqlite" and args.shards > 1:
+        parser.error("--shards vale só para os destinos json e binario")
+
+    inicio = time.perf_counter()
+    totais = gerar_banco(
+        args.pasta,
+        args.usuarios,
+        args.contas,
+        args.movimentos,
+        args.semente,
+        args.destino,
+        max(1, args.shards),
+        max(1, args.lote),
+    )
+    duracao = time.perf_counter() - inicio
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(
+        f"✔️ {totais['usuarios']:,} usuários, {totais['contas']:,} contas e "
+        f"{totais['movimentos']:,} movimentos em {args.pasta} ({args.destino})."
+    )
+    print(
+        f"{duracao:.1f} s ({totais['contas'] / max(duracao, 1e-9):,.0f} contas/s), "
+        f"pico de memória {pico:.0f} MB."
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Migra os dados do v3_0 dos arquivos JSON para o backend SQLite.
+
+Lê `contas_bancarias.json`, `transacoes_bancarias.json` e a cauda do journal
+(`transacoes_bancarias.journal`) e importa tudo em uma única transação no
+arquivo SQLite configurado em `ConfigBanco` (padrão `banco.sqlite3`).
+
+Execução:
+    python migrar_json_sqlite.py [destino.sqlite3]
+
+Depois da migração, use `ConfigBanco._ARMAZENAMENTO = "sqlite"`.
+"""
+
+import sys
+
+from bank_app_v3_0 import ArmazenamentoJSON, ArmazenamentoSQLite, ConfigBanco
+
+
+def migrar(destino):
+    origem = ArmazenamentoJSON(
+        ConfigBanco.arquivo_contas(),
+        ConfigBanco.arquivo_transacoes(),
+        ConfigBanco.arquivo_journal(),
+        ConfigBanco.arquivo_trava(),
+        ConfigBanco.shards_transacoes(),
+    )
+    usuarios = origem.carregar_usuarios()
+    contas = origem.carregar_contas()
+
+    sqlite = ArmazenamentoSQLite(destino)
+    try:
+        sqlite.importar(usuarios, contas)
+    finally:
+        sqlite.fechar()
+
+    total_contas = sum(len(u["contas"]) for u in usuarios.values())
+    total_movimentos = sum(len(c["extrato"]) for c in contas.values())
+    print(
+        f"✔️ Migrados {len(usuarios)} usuários, {total_contas} contas e "
+        f"{total_movimentos} movimentações para {destino}."
+    )
+
+
+if __name__ == "__main__":
+    migrar(sys.argv[1] if len(sys.argv) > 1 else ConfigBanco.arquivo_sqlite())
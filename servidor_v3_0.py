@@ -0,0 +1,260 @@
+"""
+Servidor HTTP/JSON (asyncio) sobre o motor do v3_0.
+
+Expõe o `ServicoBanco` em localhost, sem dependências externas:
+    POST /usuarios   {"cpf", "nome", "data_nascimento", "endereco"}
+    POST /contas     {"cpf"}
+    POST /depositos  {"cpf", "agencia", "numero_conta", "valor",
+                      "aceitar_transacao_plus"}
+    POST /saques     {"cpf", "agencia", "numero_conta", "valor",
+                      "aceitar_saque_plus", "aceitar_transacao_plus"}
+    GET  /extrato?cpf=...&agencia=...&numero_conta=...
+         [&desde=AAAA-MM-DD&ate=AAAA-MM-DD&tipos=Depósito,Saque
+          &limite=50&cursor=...&decrescente=1]
+    GET  /saldo?cpf=...&agencia=...&numero_conta=...&momento=AAAA-MM-DD
+    GET  /resumo?cpf=...&agencia=...&numero_conta=...
+         [&desde=AAAA-MM-DD&ate=AAAA-MM-DD]
+    GET  /metricas[?formato=json]   (texto do Prometheus; com --metricas)
+
+As ofertas `aceitar_*` são booleanos JSON (ausente = false; outro tipo,
+como o texto "false", é recusado com 400).
+Resposta: {"ok": bool, "resultado": ...} (200 se ok, 422 se recusado);
+/metricas no formato Prometheus responde em text/plain.
+As chamadas ao serviço (incluindo a persistência) rodam em um pool de
+threads, então o event loop nunca bloqueia em `json.dump` ou fsync; o lock
+por conta permite atender contas diferentes em paralelo.
+
+Execução:
+    python servidor_v3_0.py [--host 127.0.0.1] [--porta 8080] [--trabalhadores 8]
+                            [--metricas]
+"""
+
+import argparse
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl, urlsplit
+
+from bank_app_v3_0 import ConfigBanco, ServicoBanco
+
+STATUS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    422: "Unprocessable Entity",
+    500: "Internal Server Error",
+}
+
+OFERTAS_PLUS = ("aceitar_saque_plus", "aceitar_transacao_plus")
+
+
+class ServidorBanco:
+    def __init__(self, servico=None, trabalhadores=8):
+        self.servico = servico if servico is not None else ServicoBanco()
+        self._executor = ThreadPoolExecutor(max_workers=trabalhadores)
+        self._rotas = {
+            ("POST", "/usuarios"): self._criar_usuario,
+            ("POST", "/contas"): self._criar_conta,
+            ("POST", "/depositos"): self._depositar,
+            ("POST", "/saques"): self._sacar,
+            ("GET", "/extrato"): self._extrato,
+            ("GET", "/saldo"): self._saldo,
+            ("GET", "/resumo"): self._resumo,
+            ("GET", "/metricas"): self._metricas,
+        }
+
+    # ---- rotas: dados da requisição → chamada ao serviço ----
+    def _criar_usuario(self, d):
+        return self.servico.criar_usuario(
+            d.get("cpf"),
+            d.get("nome"),
+            d.get("data_nascimento", ""),
+            d.get("endereco", ""),
+        )
+
+    def _criar_conta(self, d):
+        return self.servico.criar_conta(d.get("cpf"))
+
+    def _depositar(self, d):
+        return self.servico.depositar(
+            d.get("cpf"),
+            d.get("agencia"),
+            d.get("numero_conta"),
+            d.get("valor"),
+            aceitar_transacao_plus=d.get("aceitar_transacao_plus") is True,
+        )
+
+    def _sacar(self, d):
+        return self.servico.sacar(
+            d.get("cpf"),
+            d.get("agencia"),
+            d.get("numero_conta"),
+            d.get("valor"),
+            aceitar_saque_plus=d.get("aceitar_saque_plus") is True,
+            aceitar_transacao_plus=d.get("aceitar_transacao_plus") is True,
+        )
+
+    def _extrato(self, d):
+        return self.servico.extrato(
+            d.get("cpf"),
+            d.get("agencia"),
+            d.get("numero_conta"),
+            desde=d.get("desde"),
+            ate=d.get("ate"),
+            tipos=d.get("tipos"),
+            cursor=d.get("cursor"),
+            limite=d.get("limite"),
+            decrescente=d.get("decrescente") in ("1", "true", "sim"),
+        )
+
+    def _saldo(self, d):
+        return self.servico.saldo_em(
+            d.get("cpf"), d.get("agencia"), d.get("numero_conta"), d.get("momento")
+        )
+
+    def _resumo(self, d):
+        return self.servico.resumo(
+            d.get("cpf"),
+            d.get("agencia"),
+            d.get("numero_conta"),
+            desde=d.get("desde"),
+            ate=d.get("ate"),
+        )
+
+    def _metricas(self, d):
+        return self.servico.metricas(d.get("formato", "prometheus"))
+
+    # ---- HTTP ----
+    async def _atender(self, metodo, alvo, corpo):
+        url = urlsplit(alvo)
+        rota = self._rotas.get((metodo, url.path))
+        if rota is None:
+            caminhos = {caminho for _, caminho in self._rotas}
+            status = 405 if url.path in caminhos else 404
+            return status, {"ok": False, "resultado": STATUS[status]}
+
+        if metodo == "GET":
+            dados = dict(parse_qsl(url.query))
+        else:
+            try:
+                dados = json.loads(corpo or b"{}")
+            except json.JSONDecodeError:
+                return 400, {"ok": False, "resultado": "❌ JSON inválido."}
+            if not isinstance(dados, dict):
+                return 400, {"ok": False, "resultado": "❌ JSON deve ser um objeto."}
+            # aceitar uma oferta paga só com true de verdade ("false" é texto)
+            for oferta in OFERTAS_PLUS:
+                if not isinstance(dados.get(oferta, False), bool):
+                    erro = f"❌ {oferta} deve ser true ou false."
+                    return 400, {"ok": False, "resultado": erro}
+
+        loop = asyncio.get_running_loop()
+        ok, resultado = await loop.run_in_executor(self._executor, rota, dados)
+        if ok and isinstance(resultado, str) and url.path == "/metricas":
+            return 200, resultado  # texto do Prometheus, sem o envelope JSON
+        return (200 if ok else 422), {"ok": ok, "resultado": resultado}
+
+    async def conexao(self, leitor, escritor):
+        try:
+            while True:
+                linha = await leitor.readline()
+                if not linha:
+                    break
+                try:
+                    metodo, alvo, versao = linha.decode("latin-1").split()
+                except ValueError:
+                    break
+
+                cabecalhos = {}
+                while True:
+                    cabecalho = await leitor.readline()
+                    if cabecalho in (b"\r\n", b"\n", b""):
+                        break
+                    nome, _, valor = cabecalho.decode("latin-1").partition(":")
+                    cabecalhos[nome.strip().lower()] = valor.strip()
+
+                tamanho = cabecalhos.get("content-length", "0")
+                # sem um tamanho válido não se sabe onde o corpo termina:
+                # responde 400 e fecha a conexão
+                valido = tamanho.isascii() and tamanho.isdigit()
+                if not valido:
+                    status = 400
+                    resposta = {
+                        "ok": False,
+                        "resultado": "❌ Content-Length inválido.",
+                    }
+                else:
+                    tamanho = int(tamanho)
+                    corpo = await leitor.readexactly(tamanho) if tamanho else b""
+                    try:
+                        status, resposta = await self._atender(metodo, alvo, corpo)
+                    except Exception as e:
+                        status, resposta = 500, {"ok": False, "resultado": str(e)}
+
+                if isinstance(resposta, str):
+                    conteudo = resposta.encode("utf-8")
+                    tipo = "text/plain; version=0.0.4; charset=utf-8"
+                else:
+                    conteudo = json.dumps(resposta, ensure_ascii=False).encode("utf-8")
+                    tipo = "application/json; charset=utf-8"
+                manter = (
+                    valido
+                    and versao == "HTTP/1.1"
+                    and cabecalhos.get("connection", "").lower() != "close"
+                )
+                escritor.write(
+                    (
+                        f"HTTP/1.1 {status} {STATUS[status]}\r\n"
+                        f"Content-Type: {tipo}\r\n"
+                        f"Content-Length: {len(conteudo)}\r\n"
+                        f"Connection: {'keep-alive' if manter else 'close'}\r\n"
+                        "\r\n"
+                    ).encode("latin-1")
+                    + conteudo
+                )
+                await escritor.drain()
+                if not manter:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            escritor.close()
+
+    async def servir(self, host, porta):
+        servidor = await asyncio.start_server(self.conexao, host, porta)
+        # a porta de fato (com --porta 0 o sistema escolhe uma livre)
+        porta = servidor.sockets[0].getsockname()[1]
+        print(f"Servidor do banco em http://{host}:{porta}", flush=True)
+        async with servidor:
+            await servidor.serve_forever()
+
+    def fechar(self):
+        self._executor.shutdown(wait=True)
+        self.servico.banco.salvar_dados_conta()
+        ConfigBanco.armazenamento().fechar()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor HTTP/JSON do banco v3_0")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8080)
+    parser.add_argument("--trabalhadores", type=int, default=8)
+    parser.add_argument(
+        "--metricas", action="store_true", help="coleta métricas (GET /metricas)"
+    )
+    args = parser.parse_args()
+    if args.metricas:  # sem a flag vale o ConfigBanco._METRICAS
+        ConfigBanco.metricas().ativa = True
+
+    servidor = ServidorBanco(trabalhadores=args.trabalhadores)
+    try:
+        asyncio.run(servidor.servir(args.host, args.porta))
+    except KeyboardInterrupt:
+        print("aguarde enquanto encerramos o banco...")
+    finally:
+        servidor.fechar()
+
+
+if __name__ == "__main__":
+    main()